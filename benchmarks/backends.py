@@ -0,0 +1,216 @@
+"""
+Throughput and latency percentiles of basic operations on TTLDict,
+InMemoryCacheBackend and RedisCacheBackend over RESP2 and RESP3.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from fastapi_cache.backends.memory import InMemoryCacheBackend
+from fastapi_cache.backends.redis import RedisCacheBackend
+from fastapi_cache.backends.utils.ttldict import TTLDict
+
+OPERATIONS = ('get', 'set', 'add', 'exists', 'expire', 'delete')
+TARGETS = ('ttldict', 'memory', 'redis', 'redis-resp3')
+
+BENCH_PREFIX = 'fastapi_cache_bench'
+POPULATE_BATCH = 1000
+EXPIRE_TTL = 60
+
+
+class Scenario:
+    __slots__ = ('key_count', 'value_size', 'concurrency', 'hit_ratio')
+
+    def __init__(
+        self,
+        key_count: int = 10000,
+        value_size: int = 100,
+        concurrency: int = 1,
+        hit_ratio: float = 0.9,
+    ) -> None:
+        self.key_count = key_count
+        self.value_size = value_size
+        self.concurrency = concurrency
+        self.hit_ratio = hit_ratio
+
+    @property
+    def name(self) -> str:
+        return 'keys={},size={},concurrency={},hit={}'.format(
+            self.key_count, self.value_size, self.concurrency, self.hit_ratio,
+        )
+
+
+def default_scenarios() -> List[Scenario]:
+    """
+    Baseline scenario plus variations of one parameter at a time.
+    """
+
+    scenarios = [Scenario()]
+    scenarios += [Scenario(key_count=count) for count in (1000, 100000)]
+    scenarios += [Scenario(value_size=size) for size in (10, 10000)]
+    scenarios += [Scenario(concurrency=count) for count in (32,)]
+    scenarios += [Scenario(hit_ratio=ratio) for ratio in (0.0, 0.5, 1.0)]
+
+    return scenarios
+
+
+def start_redis_stand_in() -> str:
+    """
+    Starts in-process fakeredis server on a free port, returns its address.
+    """
+
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer(('127.0.0.1', 0), server_type='redis')
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    host, port = server.server_address
+    return 'redis://{}:{}'.format(host, port)
+
+
+def percentile(latencies: Sequence[float], fraction: float) -> float:
+    index = min(int(len(latencies) * fraction), len(latencies) - 1)
+    return latencies[index]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    latencies.sort()
+
+    return {
+        'ops_per_sec': len(latencies) / elapsed,
+        'p50_us': percentile(latencies, 0.50) * 1e6,
+        'p95_us': percentile(latencies, 0.95) * 1e6,
+        'p99_us': percentile(latencies, 0.99) * 1e6,
+    }
+
+
+def make_operation(cache: Any, name: str, value: bytes) -> Callable:
+    if name in ('set', 'add'):
+        method = getattr(cache, name)
+        return lambda key: method(key, value)
+
+    if name == 'expire':
+        return lambda key: cache.expire(key, EXPIRE_TTL)
+
+    return getattr(cache, name)
+
+
+def run_sync(
+    operation: Callable[[str], Any],
+    keys: Sequence[str],
+) -> Dict[str, float]:
+    clock = time.perf_counter
+    latencies = []
+
+    started = clock()
+    for key in keys:
+        op_started = clock()
+        operation(key)
+        latencies.append(clock() - op_started)
+
+    return summarize(latencies, clock() - started)
+
+
+async def run_async(
+    operation: Callable[[str], Awaitable[Any]],
+    keys: Sequence[str],
+    concurrency: int,
+) -> Dict[str, float]:
+    clock = time.perf_counter
+    latencies = []
+
+    async def worker(worker_keys: Sequence[str]) -> None:
+        for key in worker_keys:
+            op_started = clock()
+            await operation(key)
+            latencies.append(clock() - op_started)
+
+    started = clock()
+    await asyncio.gather(*(
+        worker(keys[offset::concurrency]) for offset in range(concurrency)
+    ))
+
+    return summarize(latencies, clock() - started)
+
+
+async def run_scenario(
+    target: str,
+    scenario: Scenario,
+    operations: Sequence[str],
+    ops: int,
+    redis_address: Optional[str] = None,
+    repeat: int = 1,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Every operation is measured `repeat` times on a freshly populated
+    cache, the fastest run is kept as the least disturbed one.
+    """
+
+    rng = random.Random(seed)
+    key_space = ['bench:{}'.format(i) for i in range(scenario.key_count)]
+    populated = key_space[:int(scenario.key_count * scenario.hit_ratio)]
+    value = b'x' * scenario.value_size
+
+    keys = [rng.choice(key_space) for _ in range(ops)]
+
+    results = {}
+    for name in operations:
+        for _ in range(repeat):
+            cache = create_target(target, redis_address)
+            await populate(cache, populated, value)
+            operation = make_operation(cache, name, value)
+
+            if isinstance(cache, TTLDict):
+                result = run_sync(operation, keys)
+            else:
+                result = await run_async(
+                    operation, keys, scenario.concurrency,
+                )
+
+            await dispose(cache)
+
+            best = results.get(name)
+            if best is None or result['ops_per_sec'] > best['ops_per_sec']:
+                results[name] = result
+
+    return results
+
+
+def create_target(target: str, redis_address: Optional[str]) -> Any:
+    if target == 'ttldict':
+        return TTLDict()
+
+    if target == 'memory':
+        return InMemoryCacheBackend()
+
+    if target == 'redis':
+        # namespaced, so a real Redis instance is never flushed
+        return RedisCacheBackend(redis_address, prefix=BENCH_PREFIX)
+
+    if target == 'redis-resp3':
+        return RedisCacheBackend(redis_address, prefix=BENCH_PREFIX, protocol=3)
+
+    raise ValueError('Unknown benchmark target: {}'.format(target))
+
+
+async def populate(cache: Any, keys: Sequence[str], value: bytes) -> None:
+    for start in range(0, len(keys), POPULATE_BATCH):
+        mapping = dict.fromkeys(keys[start:start + POPULATE_BATCH], value)
+        if isinstance(cache, TTLDict):
+            cache.set_many(mapping)
+        else:
+            await cache.set_many(mapping)
+
+
+async def dispose(cache: Any) -> None:
+    if isinstance(cache, TTLDict):
+        return
+
+    if isinstance(cache, RedisCacheBackend):
+        await cache.clear_namespace()
+
+    await cache.close()
@@ -0,0 +1,169 @@
+"""
+Runs backend benchmarks, stores baselines and flags regressions.
+
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+Without `--redis-address` Redis benchmarks run against an in-process
+fakeredis server, compare such results only with baselines taken the
+same way on the same machine.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from typing import Dict, List, Optional
+
+from .backends import (
+    OPERATIONS,
+    TARGETS,
+    Scenario,
+    default_scenarios,
+    run_scenario,
+    start_redis_stand_in,
+)
+
+DEFAULT_OPS = 20000
+QUICK_OPS = 2000
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_REPEAT = 3
+
+Results = Dict[str, Dict[str, float]]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--targets', default=','.join(TARGETS),
+        help='comma separated list of {}'.format(', '.join(TARGETS)),
+    )
+    parser.add_argument(
+        '--operations', default=','.join(OPERATIONS),
+        help='comma separated list of {}'.format(', '.join(OPERATIONS)),
+    )
+    parser.add_argument('--ops', type=int, default=None)
+    parser.add_argument(
+        '--quick', action='store_true',
+        help='baseline scenario only with fewer operations',
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=DEFAULT_REPEAT,
+        help='runs per benchmark, the fastest one is reported',
+    )
+    parser.add_argument('--redis-address', default=None)
+    parser.add_argument('--baseline', help='compare against baseline file')
+    parser.add_argument('--save', help='store results as baseline file')
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='relative slowdown flagged as regression',
+    )
+
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> Results:
+    targets = args.targets.split(',')
+    operations = args.operations.split(',')
+    scenarios = [Scenario()] if args.quick else default_scenarios()
+    ops = args.ops or (QUICK_OPS if args.quick else DEFAULT_OPS)
+
+    redis_address = args.redis_address
+    if redis_address is None and any(
+        target.startswith('redis') for target in targets
+    ):
+        redis_address = start_redis_stand_in()
+
+    results = {}
+    for target in targets:
+        for scenario in scenarios:
+            if target == 'ttldict' and scenario.concurrency > 1:
+                continue
+
+            scenario_results = await run_scenario(
+                target, scenario, operations, ops, redis_address,
+                repeat=args.repeat,
+            )
+            for operation, result in scenario_results.items():
+                name = '{}.{}[{}]'.format(target, operation, scenario.name)
+                results[name] = result
+                print_result(name, result)
+
+    return results
+
+
+def compare(
+    results: Results,
+    baseline: Results,
+    threshold: float,
+) -> List[str]:
+    """
+    Returns names of benchmarks whose throughput dropped or median
+    latency grew by more than `threshold` against the baseline.
+    """
+
+    regressions = []
+    for name, result in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+
+        throughput = result['ops_per_sec'] / previous['ops_per_sec'] - 1
+        latency = result['p50_us'] / previous['p50_us'] - 1
+        regressed = throughput < -threshold or latency > threshold
+
+        print('{:<8} {:<70} ops/s {:+7.1%}  p50 {:+7.1%}'.format(
+            'REGRESS' if regressed else 'ok', name, throughput, latency,
+        ))
+        if regressed:
+            regressions.append(name)
+
+    return regressions
+
+
+def print_result(name: str, result: Dict[str, float]) -> None:
+    print(
+        '{:<78} {:>10.0f} ops/s  p50 {:>8.1f}us  '
+        'p95 {:>8.1f}us  p99 {:>8.1f}us'.format(
+            name,
+            result['ops_per_sec'],
+            result['p50_us'],
+            result['p95_us'],
+            result['p99_us'],
+        )
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump({
+                'meta': {
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'redis_address': args.redis_address or 'fakeredis',
+                },
+                'results': results,
+            }, baseline_file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print('{} regression(s) above {:.0%}'.format(
+                len(regressions), args.threshold,
+            ))
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
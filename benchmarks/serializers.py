@@ -0,0 +1,80 @@
+"""
+Compares encode/decode time and payload size of available serializers.
+
+    python -m benchmarks.serializers [--number 1000]
+"""
+import argparse
+import timeit
+
+from fastapi_cache.serializers import (
+    CompressedSerializer,
+    JsonSerializer,
+    MsgpackSerializer,
+    PickleSerializer,
+)
+
+PAYLOADS = {
+    'small': {'id': 1, 'name': 'item', 'price': 9.99, 'tags': ['a', 'b']},
+    'large': [
+        {'id': i, 'name': 'item {}'.format(i), 'description': 'lorem ipsum ' * 8}
+        for i in range(500)
+    ],
+}
+
+
+def get_serializers():
+    serializers = {
+        'pickle': PickleSerializer(),
+        'json': JsonSerializer(),
+        'json+zlib': CompressedSerializer(JsonSerializer(), codec='zlib'),
+    }
+
+    try:
+        serializers['msgpack'] = MsgpackSerializer()
+    except ImportError:
+        pass
+
+    try:
+        import lz4  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        serializers['json+lz4'] = CompressedSerializer(
+            JsonSerializer(), codec='lz4', level=0,
+        )
+        if 'msgpack' in serializers:
+            serializers['msgpack+lz4'] = CompressedSerializer(
+                serializers['msgpack'], codec='lz4', level=0,
+            )
+
+    return serializers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=1000)
+    args = parser.parse_args()
+
+    print('{:<8} {:<12} {:>10} {:>10} {:>10}'.format(
+        'payload', 'serializer', 'dumps us', 'loads us', 'bytes',
+    ))
+    for payload_name, payload in PAYLOADS.items():
+        for name, serializer in get_serializers().items():
+            data = serializer.dumps(payload)
+            dumps = timeit.timeit(
+                lambda: serializer.dumps(payload), number=args.number,
+            )
+            loads = timeit.timeit(
+                lambda: serializer.loads(data), number=args.number,
+            )
+            print('{:<8} {:<12} {:>10.2f} {:>10.2f} {:>10}'.format(
+                payload_name,
+                name,
+                dumps / args.number * 1e6,
+                loads / args.number * 1e6,
+                len(data),
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,51 @@
-from typing import TypeVar, Generic, Tuple
+import asyncio
+import functools
+import logging
+import math
+import random
+from collections import OrderedDict
+from typing import (
+    Any, Awaitable, Callable, Dict, TypeVar, Generic, List, Mapping,
+    Optional, Sequence, Set, Tuple
+)
+
+from ..metrics import INSTRUMENTED_OPERATIONS, CacheMetrics, instrument
+
+logger = logging.getLogger(__name__)
 
 KT = TypeVar('KT')
 VT = TypeVar('VT')
 
+Loader = Callable[[], Awaitable[Any]]
+KeyLoader = Callable[[Any], Awaitable[Any]]
+
+MISSING = object()
+MAX_TRACKED_DELTAS = 4096
+DEFAULT_CLEAR_BATCH = 1000
+
 
 class BaseCacheBackend(Generic[KT, VT]):
+    """
+    Subclasses must call `super().__init__()`, it sets up metrics and
+    wraps public operations.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[KT, asyncio.Future] = {}
+        # Recompute durations of recently loaded keys for early refresh
+        self._deltas: OrderedDict = OrderedDict()
+        # the loop keeps only weak references to tasks
+        self._refreshes: Set[asyncio.Future] = set()
+
+        # Operations are wrapped on the instance, so calls going through
+        # super() in subclasses are recorded only once.
+        self.metrics = CacheMetrics()
+        for name in INSTRUMENTED_OPERATIONS:
+            method = getattr(self, name, None)
+            if method is not None:
+                method = self._wrap_operation(name, method)
+                setattr(self, name, instrument(self.metrics, name, method))
+
     async def add(
         self,
         key: KT,
@@ -29,11 +70,125 @@ class BaseCacheBackend(Generic[KT, VT]):
     ) -> bool:
         raise NotImplementedError
 
+    async def get_many(
+        self,
+        *keys: KT,
+        default: VT = None,
+        **kwargs
+    ) -> List[VT]:
+        return [await self.get(key, default, **kwargs) for key in keys]
+
+    async def set_many(
+        self,
+        mapping: Mapping[KT, VT],
+        ttl: Optional[float] = None,
+        ttls: Optional[Mapping[KT, float]] = None,
+    ) -> bool:
+        """
+        Stores all values from `mapping`, `ttl` applies to every key
+        unless overridden for particular keys in `ttls`.
+        """
+
+        ttls = ttls or {}
+        results = [
+            await self.set(key, value, ttl=ttls.get(key, ttl))
+            for key, value in mapping.items()
+        ]
+
+        return all(results)
+
+    async def delete_many(self, *keys: KT) -> int:
+        deleted = 0
+        for key in keys:
+            deleted += bool(await self.delete(key))
+
+        return deleted
+
+    async def get_with_ttl(
+        self,
+        key: KT,
+        default: VT = None,
+        **kwargs
+    ) -> Tuple[VT, Optional[float]]:
+        """
+        Returns value along with its remaining time to live in seconds,
+        None when key has no expiration.
+        """
+
+        raise NotImplementedError
+
+    async def get_many_with_ttl(
+        self,
+        *keys: KT,
+        default: VT = None,
+        **kwargs
+    ) -> List[Tuple[VT, Optional[float]]]:
+        """
+        Batched `get_with_ttl`, returns (value, ttl) for every key.
+        """
+
+        return [await self.get_with_ttl(key, default, **kwargs) for key in keys]
+
+    async def get_or_set(
+        self,
+        key: KT,
+        loader: Loader,
+        stale_ttl: Optional[float] = None,
+        beta: Optional[float] = None,
+        **kwargs
+    ) -> VT:
+        """
+        Returns cached value or computes it with `loader` and stores it,
+        `kwargs` are passed to `set`. Concurrent calls for the same key
+        share a single `loader` call.
+
+        With `stale_ttl` values are kept for that many seconds past `ttl`
+        and served stale while being refreshed in background. With `beta`
+        values are refreshed before expiration with probability growing
+        as expiration approaches (XFetch), larger `beta` refreshes earlier.
+        """
+
+        if stale_ttl is None and beta is None:
+            value = await self.get(key, MISSING)
+            if value is not MISSING:
+                return value
+
+            return await self._load(key, loader, **kwargs)
+
+        ttl = kwargs.get('ttl')
+        if ttl is None:
+            raise ValueError('stale_ttl and beta require ttl')
+
+        stale_ttl = stale_ttl or 0
+        kwargs['ttl'] = ttl + stale_ttl
+
+        value, remaining = await self.get_with_ttl(key, MISSING)
+        if value is MISSING:
+            return await self._load(key, loader, **kwargs)
+
+        if remaining is None:
+            return value
+
+        fresh_for = remaining - stale_ttl
+        if fresh_for > 0 and not self._should_refresh_early(key, fresh_for, beta):
+            return value
+
+        if stale_ttl:
+            self._refresh_in_background(key, loader, **kwargs)
+            return value
+
+        return await self._load(key, loader, **kwargs)
+
     async def expire(
         self,
         key: KT,
-        ttl: int
+        ttl: Optional[float] = None
     ) -> bool:
+        """
+        Sets TTL of an existing key, `None` makes the key persistent.
+        Returns whether the key exists.
+        """
+
         raise NotImplementedError
 
     async def exists(self, *keys: KT) -> bool:
@@ -45,5 +200,187 @@ class BaseCacheBackend(Generic[KT, VT]):
     async def flush(self) -> None:
         raise NotImplementedError
 
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Deletes every key stored with any of `tags` via `set(..., tags=...)`,
+        returns number of deleted keys.
+        """
+
+        raise NotImplementedError
+
+    async def bump_version(self) -> int:
+        """
+        Invalidates every key of the backend namespace in O(1) by moving
+        it to a new version, returns that version.
+        """
+
+        raise NotImplementedError
+
+    async def clear_namespace(
+        self,
+        batch_size: int = DEFAULT_CLEAR_BATCH,
+    ) -> int:
+        """
+        Bumps namespace version and incrementally removes keys of older
+        versions, `batch_size` keys at a time. Returns number of removed keys.
+        """
+
+        raise NotImplementedError
+
+    async def connect(self) -> None:
+        """
+        Opens connections ahead of first use, so the first request does
+        not pay connect latency. Backends without connections do nothing.
+        """
+
+    async def warmup(
+        self,
+        keys: Sequence[KT] = (),
+        loader: Optional[KeyLoader] = None,
+        ttl: Optional[float] = None,
+    ) -> int:
+        """
+        Connects and, with `loader`, stores `loader(key)` for every key
+        of `keys` not cached yet. Returns number of loaded keys.
+        """
+
+        await self.connect()
+        if not keys or loader is None:
+            return 0
+
+        values = await self.get_many(*keys, default=MISSING)
+        missing = [key for key, value in zip(keys, values) if value is MISSING]
+        if not missing:
+            return 0
+
+        loaded = await asyncio.gather(*(loader(key) for key in missing))
+        await self.set_many(dict(zip(missing, loaded)), ttl=ttl)
+
+        return len(missing)
+
     async def close(self) -> None:
         raise NotImplementedError
+
+    def get_stats(self) -> dict:
+        return self.metrics.snapshot()
+
+    def as_stored(self, key: KT, value: VT) -> VT:
+        """
+        Value a read of `key` returns after `value` was stored, e.g. after
+        a serializer round-trip. Backends keeping objects return `value`.
+        """
+
+        return value
+
+    def _wrap_operation(
+        self,
+        name: str,
+        method: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Any]]:
+        """
+        Lets backends add their own layer (timeouts, retries) to public
+        operations, it runs inside metrics instrumentation.
+        """
+
+        return method
+
+    async def _load(
+        self,
+        key: KT,
+        loader: Loader,
+        **kwargs
+    ) -> VT:
+        # Callers await the shared task shielded, cancelling one of them
+        # leaves the load running for the others.
+        return await asyncio.shield(self._start_load(key, loader, **kwargs))
+
+    def _start_load(
+        self,
+        key: KT,
+        loader: Loader,
+        **kwargs
+    ) -> asyncio.Future:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, loader, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._finish_load, key))
+
+        return task
+
+    def _finish_load(self, key: KT, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+        if not task.cancelled():
+            # Mark exception as retrieved when nobody awaits it
+            task.exception()
+
+    async def _compute(
+        self,
+        key: KT,
+        loader: Loader,
+        **kwargs
+    ) -> VT:
+        loop = asyncio.get_event_loop()
+        started_at = loop.time()
+        value = await loader()
+        self._track_delta(key, loop.time() - started_at)
+
+        await self.set(key, value, **kwargs)
+
+        return value
+
+    def _refresh_in_background(
+        self,
+        key: KT,
+        loader: Loader,
+        **kwargs
+    ) -> None:
+        if key in self._inflight:
+            return
+
+        task = self._start_load(key, loader, **kwargs)
+        self._refreshes.add(task)
+        task.add_done_callback(self._finish_refresh)
+
+    def _finish_refresh(self, task: asyncio.Future) -> None:
+        self._refreshes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                'Background cache refresh failed',
+                exc_info=task.exception(),
+            )
+
+    async def _cancel_refreshes(self) -> None:
+        """
+        Cancels background refreshes, backends call it first in `close`.
+        """
+
+        tasks = list(self._refreshes)
+        for task in tasks:
+            task.cancel()
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _should_refresh_early(
+        self,
+        key: KT,
+        fresh_for: float,
+        beta: Optional[float],
+    ) -> bool:
+        if not beta:
+            return False
+
+        delta = self._deltas.get(key)
+        if delta is None:
+            return False
+
+        return -delta * beta * math.log(1.0 - random.random()) >= fresh_for
+
+    def _track_delta(self, key: KT, delta: float) -> None:
+        self._deltas[key] = delta
+        self._deltas.move_to_end(key)
+        if len(self._deltas) > MAX_TRACKED_DELTAS:
+            self._deltas.popitem(last=False)
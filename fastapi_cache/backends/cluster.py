@@ -0,0 +1,178 @@
+import asyncio
+from typing import AnyStr, List, Mapping, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+from redis.asyncio.cluster import ClusterNode, RedisCluster
+
+from .base import DEFAULT_CLEAR_BATCH
+from .redis import (
+    VERSION_KEY,
+    RedisCacheBackend,
+    RedisKey,
+    RedisValue,
+    _decode,
+    _escape_pattern,
+)
+from .utils.scripts import GET_WITH_PTTL
+
+CACHE_KEY = 'REDIS_CLUSTER'
+DEFAULT_CLUSTER_PORT = 6379
+
+Address = Union[str, Tuple[str, int]]
+
+
+def _parse_address(address: Address) -> Tuple[str, int]:
+    if isinstance(address, tuple):
+        return address
+
+    url = urlparse(address)
+    return url.hostname, url.port or DEFAULT_CLUSTER_PORT
+
+
+class RedisClusterCacheBackend(RedisCacheBackend):
+    """
+    Redis Cluster client built on `redis.asyncio.RedisCluster`, which
+    loads the slot map from the first reachable of `startup_nodes`,
+    follows MOVED and ASK redirects and reloads the map after MOVED.
+
+    Multi-key operations are split by slot. Tags are not supported, their
+    sets would span slots of tagged keys. `pool_maxsize` applies to every
+    node, whose connections are opened on first use. Other options are
+    the same as of `RedisCacheBackend`.
+    """
+
+    def __init__(
+        self,
+        startup_nodes: Sequence[Address],
+        **kwargs,
+    ) -> None:
+        if not startup_nodes:
+            raise ValueError('At least one startup node is required')
+
+        super().__init__(startup_nodes[0], **kwargs)
+
+        self._startup_nodes = [_parse_address(address) for address in startup_nodes]
+
+    async def get_with_ttl(
+        self,
+        key: RedisKey,
+        default: RedisValue = None,
+        **kwargs,
+    ) -> Tuple[AnyStr, Optional[float]]:
+        # a script is routed by its key like any single key command
+        key = await self._make_key(key)
+
+        client = await self._client_for(key)
+        cached_value, pttl = await GET_WITH_PTTL(
+            client, keys=[key], encoding=self._get_encoding(kwargs),
+        )
+
+        if cached_value is None:
+            return default, None
+
+        return self._deserialize(cached_value), pttl / 1000 if pttl >= 0 else None
+
+    async def get_many_with_ttl(
+        self,
+        *keys: RedisKey,
+        default: RedisValue = None,
+        **kwargs,
+    ) -> List[Tuple[AnyStr, Optional[float]]]:
+        if not keys:
+            return []
+
+        keys = await self._make_keys(keys)
+        encoding = self._get_encoding(kwargs)
+
+        # cluster pipelines send the commands of every node in one batch
+        client = await self._client
+        pipeline = client.pipeline()
+        for key in keys:
+            pipeline.get(key)
+            pipeline.pttl(key)
+        results = await pipeline.execute()
+
+        return [
+            self._with_ttl(cached_value, pttl, default, encoding)
+            for cached_value, pttl in zip(results[::2], results[1::2])
+        ]
+
+    async def set_many(
+        self,
+        mapping: Mapping[RedisKey, RedisValue],
+        ttl: Optional[float] = None,
+        ttls: Optional[Mapping[RedisKey, float]] = None,
+    ) -> bool:
+        if not mapping or ttl is not None or ttls:
+            # cluster pipelines already split commands by slot
+            return await super().set_many(mapping, ttl, ttls)
+
+        keys = await self._make_keys(list(mapping))
+        values = [self._serialize(value) for value in mapping.values()]
+
+        client = await self._client
+        return all(await client.mset_nonatomic(dict(zip(keys, values))))
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        raise NotImplementedError('Tags are not supported in cluster mode')
+
+    async def clear_namespace(
+        self,
+        batch_size: int = DEFAULT_CLEAR_BATCH,
+    ) -> int:
+        version = await self.bump_version()
+        current_prefix = b'%s%d:' % (self._prefix, version)
+        version_key = self._prefix + VERSION_KEY
+        pattern = _escape_pattern(self._prefix) + b'*'
+
+        # scans every primary, UNLINK is split by slot
+        client = await self._client
+        removed = 0
+        stale_keys: List[bytes] = []
+        async for key in client.scan_iter(match=pattern, count=batch_size):
+            if key != version_key and not key.startswith(current_prefix):
+                stale_keys.append(key)
+
+            if len(stale_keys) >= batch_size:
+                removed += await client.unlink(*stale_keys)
+                stale_keys = []
+                await asyncio.sleep(0)
+
+        if stale_keys:
+            removed += await client.unlink(*stale_keys)
+
+        return removed
+
+    async def _create_connection(self) -> RedisCluster:
+        options = self._pool_options()
+        client = RedisCluster(
+            startup_nodes=[
+                ClusterNode(host, port) for host, port in self._startup_nodes
+            ],
+            **options,
+        )
+
+        try:
+            await client.initialize()
+        except BaseException:
+            await client.aclose()
+            raise
+
+        return client
+
+    async def _disconnect_idle(self) -> None:
+        for node in self._pool.get_nodes():
+            await node.disconnect_free_connections()
+
+    async def _mget(
+        self,
+        keys: Sequence[RedisKey],
+        encoding: Optional[str],
+    ) -> List[Optional[AnyStr]]:
+        client = await self._client
+        cached_values = await client.mget_nonatomic(keys)
+
+        return [_decode(cached_value, encoding) for cached_value in cached_values]
+
+    async def _set_with_tags(self, *args, **kwargs) -> bool:
+        raise NotImplementedError('Tags are not supported in cluster mode')
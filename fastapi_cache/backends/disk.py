@@ -0,0 +1,562 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import (
+    Any, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional,
+    Sequence, Tuple
+)
+
+from ..serializers import BaseSerializer, PickleSerializer
+from .base import DEFAULT_CLEAR_BATCH, BaseCacheBackend
+from .utils.hashring import key_to_bytes
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'DISK'
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_BUSY_TIMEOUT = 5.0
+DEFAULT_COMPACT_BATCH = 1000
+DEFAULT_VERSION_TTL = 1.0
+# SQLite before 3.32 accepts at most 999 parameters per statement
+MAX_PARAMETERS = 900
+
+# auto_vacuum only applies when set before the first table is created
+SCHEMA = '''
+PRAGMA auto_vacuum = INCREMENTAL;
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS entries_expires_at
+    ON entries (expires_at) WHERE expires_at IS NOT NULL;
+CREATE TABLE IF NOT EXISTS tags (
+    tag BLOB NOT NULL,
+    key BLOB NOT NULL,
+    PRIMARY KEY (tag, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_key ON tags (key);
+CREATE TABLE IF NOT EXISTS versions (
+    namespace BLOB PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+'''
+
+Entry = Tuple[bytes, Optional[float]]
+
+
+def _chunks(items: Sequence[Any]) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), MAX_PARAMETERS):
+        yield items[start:start + MAX_PARAMETERS]
+
+
+def _placeholders(items: Sequence[Any]) -> str:
+    return ', '.join('?' * len(items))
+
+
+def _get_ttl(kwargs: dict) -> Optional[float]:
+    pttl = kwargs.get('pttl')
+    if pttl is not None:
+        return pttl / 1000
+
+    return kwargs.get('ttl')
+
+
+class DiskCacheBackend(BaseCacheBackend[Hashable, Any]):
+    """
+    Persistent cache in a SQLite database in WAL mode, so reads never
+    wait for writes. Up to `mmap_size` bytes of the file are memory
+    mapped and large values are read from the mapping instead of with
+    read calls. All file I/O runs on `max_workers` threads with one
+    connection each, requests never block on disk.
+
+    Expiration times are wall clock timestamps, so they stay valid over
+    restarts. Expired entries are removed when read and by `compact`,
+    which also returns free pages to the file system and runs every
+    `compact_interval` seconds when given.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mmap_size: int = DEFAULT_MMAP_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        busy_timeout: float = DEFAULT_BUSY_TIMEOUT,
+        compact_interval: Optional[float] = None,
+        compact_batch: int = DEFAULT_COMPACT_BATCH,
+        serializer: Optional[BaseSerializer] = None,
+        prefix: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__()
+
+        self._path = path
+        self._mmap_size = mmap_size
+        self._busy_timeout = busy_timeout
+        self._serializer = serializer or PickleSerializer()
+        self._clock = clock
+
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix='fastapi_cache_disk',
+        )
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        self._compact_interval = compact_interval
+        self._compact_batch = compact_batch
+        self._compactor: Optional[asyncio.Future] = None
+
+        self._prefix = prefix.encode('utf-8') if prefix is not None else None
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+
+    async def add(self, key: Hashable, value: Any, **kwargs) -> bool:
+        self._start_background_tasks()
+        return await self._run(
+            self._add_entry,
+            await self._make_key(key),
+            self._serializer.dumps(value),
+            self._get_expires_at(_get_ttl(kwargs)),
+            kwargs.get('tags'),
+        )
+
+    async def get(self, key: Hashable, default: Any = None, **kwargs) -> Any:
+        return (await self._get_with_ttl(key, default))[0]
+
+    async def get_many(
+        self,
+        *keys: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> List[Any]:
+        keys = await self._make_keys(keys)
+        entries = await self._run(self._get_entries, keys)
+
+        return [
+            self._serializer.loads(entries[key][0]) if key in entries else default
+            for key in keys
+        ]
+
+    async def get_with_ttl(
+        self,
+        key: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> Tuple[Any, Optional[float]]:
+        return await self._get_with_ttl(key, default)
+
+    async def set(self, key: Hashable, value: Any, **kwargs) -> bool:
+        self._start_background_tasks()
+        key = await self._make_key(key)
+        await self._run(
+            self._set_entries,
+            [(key, self._serializer.dumps(value))],
+            self._get_expires_at(_get_ttl(kwargs)),
+            kwargs.get('tags'),
+        )
+
+        return True
+
+    async def set_many(
+        self,
+        mapping: Mapping[Hashable, Any],
+        ttl: Optional[float] = None,
+        ttls: Optional[Mapping[Hashable, float]] = None,
+    ) -> bool:
+        if ttls:
+            return await super().set_many(mapping, ttl, ttls)
+
+        self._start_background_tasks()
+        keys = await self._make_keys(list(mapping))
+        values = [self._serializer.dumps(value) for value in mapping.values()]
+        await self._run(
+            self._set_entries, list(zip(keys, values)), self._get_expires_at(ttl),
+        )
+
+        return True
+
+    async def expire(
+        self,
+        key: Hashable,
+        ttl: Optional[float] = None,
+        **kwargs,
+    ) -> bool:
+        return await self._run(
+            self._expire_entry,
+            await self._make_key(key),
+            self._get_expires_at(_get_ttl(dict(kwargs, ttl=ttl))),
+        )
+
+    async def exists(self, *keys: Hashable) -> bool:
+        return await self._run(self._exists, await self._make_keys(keys))
+
+    async def delete(self, key: Hashable) -> bool:
+        key = await self._make_key(key)
+        return bool(await self._run(self._delete_entries, [key]))
+
+    async def delete_many(self, *keys: Hashable) -> int:
+        return await self._run(self._delete_entries, await self._make_keys(keys))
+
+    async def flush(self) -> None:
+        await self._run(self._flush)
+
+    async def invalidate_tags(self, *tags: Hashable) -> int:
+        return await self._run(
+            self._invalidate_tags, [key_to_bytes(tag) for tag in tags],
+        )
+
+    async def bump_version(self) -> int:
+        if self._prefix is None:
+            raise ValueError('Namespace operations require prefix')
+
+        self._version = await self._run(self._bump_version, self._prefix)
+        self._version_checked_at = time.monotonic()
+
+        return self._version
+
+    async def clear_namespace(
+        self,
+        batch_size: int = DEFAULT_CLEAR_BATCH,
+    ) -> int:
+        version = await self.bump_version()
+
+        removed = 0
+        while True:
+            batch_removed = await self._run(
+                self._delete_stale_versions, version, batch_size,
+            )
+            removed += batch_removed
+            if batch_removed < batch_size:
+                return removed
+
+    async def compact(self) -> int:
+        """
+        Removes expired entries `compact_batch` at a time, releases free
+        pages and truncates the WAL. Returns number of removed entries.
+        """
+
+        removed = 0
+        while True:
+            batch_removed = await self._run(self._delete_expired)
+            removed += batch_removed
+            if batch_removed < self._compact_batch:
+                break
+
+        await self._run(self._release_space)
+
+        return removed
+
+    async def connect(self) -> None:
+        await self._run(self._connection)
+
+    async def close(self) -> None:
+        await self._cancel_refreshes()
+        if self._compactor is not None:
+            self._compactor.cancel()
+            self._compactor = None
+
+        # waits for running operations, so it must not block the loop
+        await asyncio.get_event_loop().run_in_executor(None, self._shutdown)
+
+    def as_stored(self, key: Hashable, value: Any) -> Any:
+        return self._serializer.loads(self._serializer.dumps(value))
+
+    async def _get_with_ttl(
+        self,
+        key: Hashable,
+        default: Any,
+    ) -> Tuple[Any, Optional[float]]:
+        key = await self._make_key(key)
+        entry = (await self._run(self._get_entries, [key])).get(key)
+        if entry is None:
+            return default, None
+
+        value, expires_at = entry
+        if expires_at is None:
+            return self._serializer.loads(value), None
+
+        return self._serializer.loads(value), max(expires_at - self._clock(), 0.0)
+
+    async def _run(self, function: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_event_loop().run_in_executor(
+            self._executor, partial(function, *args),
+        )
+
+    def _shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            return connection
+
+        # closed by _shutdown once worker threads are done
+        connection = sqlite3.connect(
+            self._path,
+            timeout=self._busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.executescript(SCHEMA)
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+        connection.execute('PRAGMA mmap_size = {:d}'.format(self._mmap_size))
+
+        self._local.connection = connection
+        with self._connections_lock:
+            self._connections.append(connection)
+
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        else:
+            connection.execute('COMMIT')
+
+    def _get_entries(self, keys: Sequence[bytes]) -> Dict[bytes, Entry]:
+        connection = self._connection()
+        now = self._clock()
+
+        entries = {}
+        expired = []
+        for chunk in _chunks(keys):
+            rows = connection.execute(
+                'SELECT key, value, expires_at FROM entries '
+                'WHERE key IN ({})'.format(_placeholders(chunk)),
+                chunk,
+            )
+            for key, value, expires_at in rows:
+                if expires_at is not None and expires_at <= now:
+                    expired.append(key)
+                else:
+                    entries[key] = (value, expires_at)
+
+        if expired:
+            # entries rewritten meanwhile are not expired anymore
+            with self._transaction() as connection:
+                for chunk in _chunks(expired):
+                    connection.execute(
+                        'DELETE FROM entries WHERE key IN ({}) '
+                        'AND expires_at <= ?'.format(_placeholders(chunk)),
+                        (*chunk, now),
+                    )
+
+        return entries
+
+    def _add_entry(
+        self,
+        key: bytes,
+        value: bytes,
+        expires_at: Optional[float],
+        tags: Optional[Iterable[Hashable]],
+    ) -> bool:
+        with self._transaction() as connection:
+            row = connection.execute(
+                'SELECT expires_at FROM entries WHERE key = ?', (key,),
+            ).fetchone()
+            if row is not None and (row[0] is None or row[0] > self._clock()):
+                return False
+
+            self._write(connection, [(key, value)], expires_at, tags)
+
+        return True
+
+    def _set_entries(
+        self,
+        items: Sequence[Tuple[bytes, bytes]],
+        expires_at: Optional[float],
+        tags: Optional[Iterable[Hashable]] = None,
+    ) -> None:
+        with self._transaction() as connection:
+            self._write(connection, items, expires_at, tags)
+
+    @staticmethod
+    def _write(
+        connection: sqlite3.Connection,
+        items: Sequence[Tuple[bytes, bytes]],
+        expires_at: Optional[float],
+        tags: Optional[Iterable[Hashable]],
+    ) -> None:
+        connection.executemany(
+            'REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)',
+            [(key, value, expires_at) for key, value in items],
+        )
+        # rewritten keys lose their previous tags
+        connection.executemany(
+            'DELETE FROM tags WHERE key = ?', [(key,) for key, _ in items],
+        )
+        if tags:
+            connection.executemany(
+                'INSERT OR IGNORE INTO tags (tag, key) VALUES (?, ?)',
+                [(key_to_bytes(tag), key) for tag in tags for key, _ in items],
+            )
+
+    def _expire_entry(self, key: bytes, expires_at: Optional[float]) -> bool:
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                'UPDATE entries SET expires_at = ? WHERE key = ? '
+                'AND (expires_at IS NULL OR expires_at > ?)',
+                (expires_at, key, self._clock()),
+            )
+
+        return cursor.rowcount > 0
+
+    def _exists(self, keys: Sequence[bytes]) -> bool:
+        connection = self._connection()
+        now = self._clock()
+
+        for chunk in _chunks(keys):
+            row = connection.execute(
+                'SELECT 1 FROM entries WHERE key IN ({}) '
+                'AND (expires_at IS NULL OR expires_at > ?) '
+                'LIMIT 1'.format(_placeholders(chunk)),
+                (*chunk, now),
+            ).fetchone()
+            if row is not None:
+                return True
+
+        return False
+
+    def _delete_entries(self, keys: Sequence[bytes]) -> int:
+        deleted = 0
+        with self._transaction() as connection:
+            for chunk in _chunks(keys):
+                deleted += connection.execute(
+                    'DELETE FROM entries WHERE key IN ({})'.format(
+                        _placeholders(chunk),
+                    ),
+                    chunk,
+                ).rowcount
+
+        return deleted
+
+    def _flush(self) -> None:
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM entries')
+            connection.execute('DELETE FROM tags')
+
+    def _invalidate_tags(self, tags: Sequence[bytes]) -> int:
+        deleted = 0
+        with self._transaction() as connection:
+            for chunk in _chunks(tags):
+                deleted += connection.execute(
+                    'DELETE FROM entries WHERE key IN '
+                    '(SELECT key FROM tags WHERE tag IN ({}))'.format(
+                        _placeholders(chunk),
+                    ),
+                    chunk,
+                ).rowcount
+                connection.execute(
+                    'DELETE FROM tags WHERE tag IN ({})'.format(
+                        _placeholders(chunk),
+                    ),
+                    chunk,
+                )
+
+        return deleted
+
+    def _get_stored_version(self, namespace: bytes) -> int:
+        row = self._connection().execute(
+            'SELECT version FROM versions WHERE namespace = ?', (namespace,),
+        ).fetchone()
+
+        return row[0] if row is not None else 0
+
+    def _bump_version(self, namespace: bytes) -> int:
+        with self._transaction() as connection:
+            version = self._get_stored_version(namespace) + 1
+            connection.execute(
+                'REPLACE INTO versions (namespace, version) VALUES (?, ?)',
+                (namespace, version),
+            )
+
+        return version
+
+    def _delete_stale_versions(self, version: int, limit: int) -> int:
+        # keys of the namespace sort between `prefix:` and `prefix;`
+        namespace_start = self._prefix + b':'
+        namespace_end = self._prefix + b';'
+        current_start = b'%s:%d:' % (self._prefix, version)
+        current_end = b'%s:%d;' % (self._prefix, version)
+
+        with self._transaction() as connection:
+            return connection.execute(
+                'DELETE FROM entries WHERE key IN ('
+                'SELECT key FROM entries WHERE key >= ? AND key < ? '
+                'AND NOT (key >= ? AND key < ?) LIMIT ?)',
+                (namespace_start, namespace_end, current_start, current_end, limit),
+            ).rowcount
+
+    def _delete_expired(self) -> int:
+        with self._transaction() as connection:
+            return connection.execute(
+                'DELETE FROM entries WHERE key IN ('
+                'SELECT key FROM entries WHERE expires_at <= ? LIMIT ?)',
+                (self._clock(), self._compact_batch),
+            ).rowcount
+
+    def _release_space(self) -> None:
+        with self._transaction() as connection:
+            connection.execute(
+                'DELETE FROM tags WHERE key NOT IN (SELECT key FROM entries)'
+            )
+
+        connection = self._connection()
+        # execute would free one page per step, executescript runs to the end
+        connection.executescript('PRAGMA incremental_vacuum')
+        connection.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+
+    async def _get_version(self) -> int:
+        now = time.monotonic()
+        if (
+            self._version is None
+            or now - self._version_checked_at >= DEFAULT_VERSION_TTL
+        ):
+            self._version = await self._run(self._get_stored_version, self._prefix)
+            self._version_checked_at = now
+
+        return self._version
+
+    async def _make_key(self, key: Hashable) -> bytes:
+        return (await self._make_keys([key]))[0]
+
+    async def _make_keys(self, keys: Sequence[Hashable]) -> List[bytes]:
+        if self._prefix is None:
+            return [key_to_bytes(key) for key in keys]
+
+        prefix = b'%s:%d:' % (self._prefix, await self._get_version())
+        return [prefix + key_to_bytes(key) for key in keys]
+
+    def _get_expires_at(self, ttl: Optional[float]) -> Optional[float]:
+        return self._clock() + ttl if ttl is not None else None
+
+    def _start_background_tasks(self) -> None:
+        if self._compact_interval is not None and self._compactor is None:
+            self._compactor = asyncio.ensure_future(self._compact_periodically())
+
+    async def _compact_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._compact_interval)
+            try:
+                await self.compact()
+            except sqlite3.Error:
+                # the next round tries again, e.g. after a busy timeout
+                logger.exception('Failed to compact disk cache')
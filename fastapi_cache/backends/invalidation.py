@@ -0,0 +1,211 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Hashable, List, Optional, Sequence, Set
+
+from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from redis.exceptions import RedisError
+
+from .base import BaseCacheBackend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = 'fastapi_cache:invalidation'
+DEFAULT_RECONNECT_INTERVAL = 1.0
+
+
+class RedisInvalidationBus:
+    """
+    Broadcasts invalidated keys over Redis pub/sub, so process local caches
+    attached on every node drop their copies. Keys published within
+    `batch_window` seconds are sent in a single message, keys have to be
+    JSON serializable.
+
+    Messages published while a node was disconnected are lost, so attached
+    caches are flushed after every reconnect.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        channel: str = DEFAULT_CHANNEL,
+        batch_window: float = 0.0,
+        reconnect_interval: float = DEFAULT_RECONNECT_INTERVAL,
+    ) -> None:
+        self._address = address
+        self._channel = channel
+        self._batch_window = batch_window
+        self._reconnect_interval = reconnect_interval
+
+        self.node_id = uuid.uuid4().hex
+
+        self._caches: List[BaseCacheBackend] = []
+        self._pending: List[Hashable] = []
+        self._handle: Optional[asyncio.Handle] = None
+        # the loop keeps only weak references to tasks
+        self._tasks: Set[asyncio.Future] = set()
+
+        self._publisher: Optional[Redis] = None
+        self._subscriber: Optional[PubSub] = None
+        self._listener: Optional[asyncio.Future] = None
+        self._subscribed: Optional[asyncio.Event] = None
+
+    def attach(self, cache: BaseCacheBackend) -> None:
+        self._caches.append(cache)
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._subscribed = asyncio.Event()
+            self._listener = asyncio.ensure_future(self._listen())
+
+        await self._subscribed.wait()
+
+    def publish(self, *keys: Hashable) -> None:
+        self._pending.extend(keys)
+        if self._handle is not None:
+            return
+
+        loop = asyncio.get_event_loop()
+        if self._batch_window > 0:
+            self._handle = loop.call_later(self._batch_window, self._dispatch)
+        else:
+            self._handle = loop.call_soon(self._dispatch)
+
+    def publish_tags(self, *tags: str) -> None:
+        self._send_in_background({'tags': list(tags)})
+
+    def publish_flush(self) -> None:
+        self._pending.clear()
+        self._send_in_background({'flush': True})
+
+    async def close(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        keys, self._pending = self._pending, []
+        if keys:
+            await self._send({'keys': keys})
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+        if self._subscriber is not None:
+            await self._close_subscriber()
+
+        if self._publisher is not None:
+            await self._publisher.aclose()
+
+        self._subscriber = self._publisher = None
+
+    def _dispatch(self) -> None:
+        self._handle = None
+        keys, self._pending = self._pending, []
+        if keys:
+            self._send_in_background({'keys': keys})
+
+    def _send_in_background(self, message: dict) -> None:
+        task = asyncio.ensure_future(self._send(message))
+        self._tasks.add(task)
+        task.add_done_callback(self._finish_send)
+
+    def _finish_send(self, task: asyncio.Future) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                'Failed to publish cache invalidation',
+                exc_info=task.exception(),
+            )
+
+    async def _send(self, message: dict) -> None:
+        message['node'] = self.node_id
+        try:
+            if self._publisher is None:
+                self._publisher = self._connect()
+
+            await self._publisher.publish(self._channel, json.dumps(message))
+        except (OSError, RedisError):
+            logger.exception('Failed to publish cache invalidation')
+
+    async def _listen(self) -> None:
+        connected_before = False
+        while True:
+            self._subscriber = self._connect().pubsub()
+            try:
+                await self._subscriber.subscribe(self._channel)
+            except (OSError, RedisError):
+                logger.exception('Failed to subscribe to cache invalidations')
+                await self._close_subscriber()
+                await asyncio.sleep(self._reconnect_interval)
+                continue
+
+            if connected_before:
+                await self._invalidate(flush=True)
+
+            connected_before = True
+            self._subscribed.set()
+
+            try:
+                async for message in self._subscriber.listen():
+                    if message['type'] == 'message':
+                        await self._handle_message(message['data'].decode('utf-8'))
+            except (OSError, RedisError):
+                logger.warning('Cache invalidations connection lost', exc_info=True)
+
+            self._subscribed.clear()
+            await self._close_subscriber()
+            await asyncio.sleep(self._reconnect_interval)
+
+    async def _close_subscriber(self) -> None:
+        # pub/sub only releases its connection, the pool is its own
+        await self._subscriber.aclose()
+        await self._subscriber.connection_pool.disconnect()
+
+    def _connect(self) -> Redis:
+        # a broken connection is recovered by _listen, not by the client
+        return Redis.from_url(self._address, retry=Retry(NoBackoff(), 0))
+
+    async def _handle_message(self, raw_message: str) -> None:
+        try:
+            message = json.loads(raw_message)
+        except ValueError:
+            logger.warning('Malformed cache invalidation: %r', raw_message)
+            return
+
+        if message.get('node') == self.node_id:
+            return
+
+        # JSON turns tuple keys into lists
+        keys = [
+            tuple(key) if isinstance(key, list) else key
+            for key in message.get('keys', ())
+        ]
+        await self._invalidate(
+            keys=keys,
+            tags=message.get('tags', ()),
+            flush=message.get('flush', False),
+        )
+
+    async def _invalidate(
+        self,
+        keys: Sequence[Hashable] = (),
+        tags: Sequence[str] = (),
+        flush: bool = False,
+    ) -> None:
+        for cache in self._caches:
+            if flush:
+                await cache.flush()
+                continue
+
+            if keys:
+                await cache.delete_many(*keys)
+            if tags:
+                await cache.invalidate_tags(*tags)
@@ -1,14 +1,62 @@
-from typing import Any, Hashable
+import asyncio
+import time
+from typing import Any, Hashable, List, Mapping, Optional, Tuple, Union
 
-from .base import BaseCacheBackend
-from .utils.ttldict import TTLDict
+from ..serializers import Buffer
+from .base import DEFAULT_CLEAR_BATCH, BaseCacheBackend
+from .utils.clock import CoarseClock
+from .utils.eviction import EvictionPolicy
+from .utils.ttldict import TTLDict, TTLDictStats, Tracer
 
 CACHE_KEY = 'IN_MEMORY'
+DEFAULT_SWEEP_BATCH = 1000
+
+
+def _compact(value: Any) -> Any:
+    # bytearray over-allocates and a memoryview pins its whole base
+    # object while reporting a constant size, so both are kept as bytes
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+
+    return value
 
 
 class InMemoryCacheBackend(BaseCacheBackend[Hashable, Any]):
-    def __init__(self):
-        self._cache = TTLDict()
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        eviction_policy: EvictionPolicy = 'lru',
+        sweep_interval: Optional[float] = None,
+        sweep_batch: int = DEFAULT_SWEEP_BATCH,
+        tracer: Optional[Tracer] = None,
+        coarse_clock_resolution: Optional[float] = None,
+        prefix: Optional[str] = None,
+    ):
+        super().__init__()
+
+        self._prefix = prefix
+        self._version = 0
+
+        self._clock: Optional[CoarseClock] = None
+        if coarse_clock_resolution is not None:
+            self._clock = CoarseClock(coarse_clock_resolution)
+
+        self._cache = TTLDict(
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            eviction_policy=eviction_policy,
+            tracer=tracer,
+            clock=self._clock if self._clock is not None else time.monotonic,
+        )
+
+        self._sweep_interval = sweep_interval
+        self._sweep_batch = sweep_batch
+        self._sweeper: Optional[asyncio.Future] = None
+
+    @property
+    def stats(self) -> TTLDictStats:
+        return self._cache.stats
 
     async def add(
         self,
@@ -16,7 +64,8 @@ class InMemoryCacheBackend(BaseCacheBackend[Hashable, Any]):
         value: Any,
         **kwargs,
     ) -> bool:
-        return self._cache.add(key, value, **kwargs)
+        self._start_background_tasks()
+        return self._cache.add(self._make_key(key), _compact(value), **kwargs)
 
     async def get(
         self,
@@ -24,7 +73,60 @@ class InMemoryCacheBackend(BaseCacheBackend[Hashable, Any]):
         default: Any = None,
         **kwargs
     ) -> Any:
-        return self._cache.get(key, default)
+        return self._cache.get(self._make_key(key), default)
+
+    async def get_raw(
+        self,
+        key: Hashable,
+        default: Any = None,
+    ) -> Union[Buffer, Any]:
+        """
+        Returns bytes values as read-only memoryview, without copying.
+        """
+
+        value = self._cache.get(self._make_key(key), default)
+        if isinstance(value, bytes):
+            return memoryview(value)
+
+        return value
+
+    async def get_many(
+        self,
+        *keys: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> List[Any]:
+        return self._cache.get_many(map(self._make_key, keys), default)
+
+    async def set_many(
+        self,
+        mapping: Mapping[Hashable, Any],
+        ttl: Optional[float] = None,
+        ttls: Optional[Mapping[Hashable, float]] = None,
+    ) -> bool:
+        self._start_background_tasks()
+        mapping = {
+            self._make_key(key): _compact(value)
+            for key, value in mapping.items()
+        }
+        if ttls:
+            ttls = {
+                self._make_key(key): key_ttl
+                for key, key_ttl in ttls.items()
+            }
+
+        return self._cache.set_many(mapping, ttl, ttls)
+
+    async def delete_many(self, *keys: Hashable) -> int:
+        return self._cache.delete_many(map(self._make_key, keys))
+
+    async def get_with_ttl(
+        self,
+        key: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> Tuple[Any, Optional[float]]:
+        return self._cache.get_with_ttl(self._make_key(key), default)
 
     async def set(
         self,
@@ -32,23 +134,90 @@ class InMemoryCacheBackend(BaseCacheBackend[Hashable, Any]):
         value: Any,
         **kwargs,
     ) -> bool:
-        return self._cache.set(key, value, **kwargs)
+        self._start_background_tasks()
+        return self._cache.set(self._make_key(key), _compact(value), **kwargs)
 
     async def expire(
         self,
         key: Hashable,
-        ttl: int
+        ttl: Optional[float] = None,
+        **kwargs,
     ) -> bool:
-        return self._cache.expire(key, ttl)
+        self._start_background_tasks()
+        return self._cache.expire(self._make_key(key), ttl, **kwargs)
 
     async def exists(self, *keys: Hashable) -> bool:
-        return self._cache.exists(*keys)
+        return self._cache.exists(*map(self._make_key, keys))
 
     async def delete(self, key: Hashable) -> bool:
-        return self._cache.delete(key)
+        return self._cache.delete(self._make_key(key))
 
     async def flush(self) -> None:
         return self._cache.flush()
 
-    async def close(self) -> None:  # pragma: no cover
-        return None
+    async def invalidate_tags(self, *tags: Hashable) -> int:
+        return self._cache.invalidate_tags(*tags)
+
+    async def bump_version(self) -> int:
+        if self._prefix is None:
+            raise ValueError('Namespace operations require prefix')
+
+        self._version += 1
+        return self._version
+
+    async def clear_namespace(
+        self,
+        batch_size: int = DEFAULT_CLEAR_BATCH,
+    ) -> int:
+        version = await self.bump_version()
+        stale_keys = [key for key in self._cache.keys() if key[1] != version]
+
+        removed = 0
+        for start in range(0, len(stale_keys), batch_size):
+            removed += self._cache.delete_many(
+                stale_keys[start:start + batch_size]
+            )
+            await asyncio.sleep(0)
+
+        return removed
+
+    async def close(self) -> None:
+        await self._cancel_refreshes()
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+        if self._clock is not None:
+            self._clock.stop()
+
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        stats.update(
+            evictions=self.stats.evictions,
+            expirations=self.stats.expirations,
+            entries=len(self._cache),
+            bytes=self._cache.total_bytes,
+        )
+
+        return stats
+
+    def _make_key(self, key: Hashable) -> Hashable:
+        if self._prefix is None:
+            return key
+
+        return self._prefix, self._version, key
+
+    def _start_background_tasks(self) -> None:
+        if self._clock is not None and not self._clock.is_running:
+            self._clock.start()
+
+        if self._sweep_interval is not None and self._sweeper is None:
+            self._sweeper = asyncio.ensure_future(self._sweep_periodically())
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            # Yield to the loop between slices so a large backlog of
+            # expired keys never blocks request handling.
+            while self._cache.sweep(self._sweep_batch) >= self._sweep_batch:
+                await asyncio.sleep(0)
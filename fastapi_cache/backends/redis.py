@@ -1,122 +1,981 @@
-from typing import Union, Optional, AnyStr
+import asyncio
+import logging
+import math
+import time
+import uuid
+from functools import wraps
+from typing import (
+    Any, Awaitable, Callable, Union, Optional, AnyStr, Dict, List, Mapping,
+    Sequence, Tuple
+)
 
-import aioredis
-from aioredis import Redis
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.connection import Encoder
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
-from .base import BaseCacheBackend
+from ..metrics import DEFAULT_POSITIONS
+from ..serializers import BaseSerializer, Buffer
+from .base import DEFAULT_CLEAR_BATCH, MISSING, BaseCacheBackend, Loader
+from .utils.batching import DEFAULT_MAX_BATCH_SIZE, AutoBatcher
+from .utils.circuit import CircuitBreaker, CircuitOpenError
+from .utils.scripts import (
+    COMPARE_AND_SET,
+    GET_AND_TOUCH,
+    INCR_WITH_TTL,
+    INVALIDATE_TAGS,
+    RELEASE_LOCK,
+    SET_WITH_TAGS,
+)
 
 DEFAULT_ENCODING = 'utf-8'
 DEFAULT_POOL_MIN_SIZE = 5
+DEFAULT_POOL_MAX_SIZE = 10
+DEFAULT_POOL_FILL_TIMEOUT = 10.0
+DEFAULT_RETRY_BACKOFF = 0.05
+DEFAULT_LOCK_POLL_INTERVAL = 0.05
+DEFAULT_VERSION_TTL = 1.0
+DEFAULT_PROTOCOL = 2
 CACHE_KEY = 'REDIS'
+LOCK_PREFIX = b'fastapi_cache:lock:'
+VERSION_KEY = b'__version__'
+TAG_PREFIX = b'fastapi_cache:tag:'
+NAMESPACE_TAG_PREFIX = b'__tag__:'
+
+# Errors meaning Redis is unreachable, PoolClosedError is not one of them
+CONNECTION_ERRORS = (
+    OSError, asyncio.TimeoutError, RedisConnectionError, RedisTimeoutError,
+)
+
+# Operations that must not be repeated when their outcome is unknown
+NON_RETRYABLE_OPERATIONS = ('add', 'compare_and_set', 'incr')
+
+logger = logging.getLogger(__name__)
 
 # expected to be of bytearray, bytes, float, int, or str type
 
 RedisKey = Union[AnyStr, float, int]
-RedisValue = Union[AnyStr, float, int]
+RedisValue = Union[AnyStr, bytearray, memoryview, float, int]
+
+
+def _translate_ttl(kwargs: dict) -> dict:
+    """
+    Maps backend agnostic `ttl` (seconds) and `pttl` (milliseconds)
+    arguments, as well as aioredis style `expire`/`pexpire`, onto
+    redis-py `ex`/`px`. Fractions of a millisecond are rounded up, zero
+    or negative values are kept, see `_expires_immediately`.
+    """
+
+    ttl = kwargs.pop('ttl', kwargs.pop('expire', None))
+    pttl = kwargs.pop('pttl', kwargs.pop('pexpire', None))
+
+    if ttl is not None:
+        if isinstance(ttl, float) and not ttl.is_integer():
+            pttl = ttl * 1000
+        else:
+            kwargs['ex'] = int(ttl)
+
+    if pttl is not None:
+        kwargs['px'] = math.ceil(pttl)
+
+    return kwargs
+
+
+def _expires_immediately(options: dict) -> bool:
+    """
+    Redis rejects zero or negative expire times, entries written with
+    them are dropped right away instead, like by the memory backend.
+    """
+
+    return options.get('ex', 1) <= 0 or options.get('px', 1) <= 0
+
+
+def _decode(value: Any, encoding: Optional[str]) -> Any:
+    if encoding is None or not isinstance(value, bytes):
+        return value
+
+    return value.decode(encoding)
+
+
+def _to_milliseconds(ttl: Optional[float]) -> int:
+    return math.ceil(ttl * 1000) if ttl is not None else 0
+
+
+def _get_default(name: str, args: tuple, kwargs: dict) -> Any:
+    position = DEFAULT_POSITIONS[name]
+    return args[position] if len(args) > position else kwargs.get('default')
+
+
+# Results of operations rejected while the circuit is open, operations
+# without fallback raise CircuitOpenError instead
+FALLBACKS: Dict[str, Callable[[str, tuple, dict], Any]] = {
+    'get': _get_default,
+    'get_raw': _get_default,
+    'get_and_touch': _get_default,
+    'get_with_ttl': lambda *call: (_get_default(*call), None),
+    'get_many': lambda name, args, kwargs: (
+        [kwargs.get('default')] * len(args)
+    ),
+    'get_many_with_ttl': lambda name, args, kwargs: (
+        [(kwargs.get('default'), None)] * len(args)
+    ),
+    'add': lambda *call: False,
+    'set': lambda *call: False,
+    'set_many': lambda *call: False,
+    'compare_and_set': lambda *call: False,
+    'expire': lambda *call: False,
+    'exists': lambda *call: False,
+    'delete': lambda *call: False,
+    'delete_many': lambda *call: 0,
+    'invalidate_tags': lambda *call: 0,
+}
+
+
+class PoolClosedError(Exception):
+    pass
+
+
+def _escape_pattern(pattern: bytes) -> bytes:
+    for char in (b'\\', b'*', b'?', b'[', b']'):
+        pattern = pattern.replace(char, b'\\' + char)
+
+    return pattern
 
 
 class RedisCacheBackend(BaseCacheBackend[RedisKey, RedisValue]):
+    """
+    With `prefix` keys are stored as `{prefix}:{version}:{key}`, so the
+    whole namespace is invalidated in O(1) by `bump_version`. The current
+    version is cached locally and re-read at most every `version_ttl`
+    seconds, which bounds how long other processes keep using an old one.
+
+    Every operation is bounded by `command_timeout` and retried up to
+    `retries` times with exponential backoff on connection errors. With
+    `circuit_breaker` operations fail fast while Redis is unhealthy:
+    reads return `default`, writes report nothing was stored.
+    """
+
     def __init__(
         self,
         address: str,
         pool_minsize: Optional[int] = DEFAULT_POOL_MIN_SIZE,
         encoding: Optional[str] = DEFAULT_ENCODING,
+        autobatch: bool = False,
+        autobatch_window: float = 0.0,
+        autobatch_max_size: int = DEFAULT_MAX_BATCH_SIZE,
+        serializer: Optional[BaseSerializer] = None,
+        prefix: Optional[str] = None,
+        version_ttl: float = DEFAULT_VERSION_TTL,
+        pool_maxsize: int = DEFAULT_POOL_MAX_SIZE,
+        connect_timeout: Optional[float] = None,
+        command_timeout: Optional[float] = None,
+        retries: int = 0,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        health_check_interval: Optional[float] = None,
+        protocol: int = DEFAULT_PROTOCOL,
+        pool_fill_timeout: float = DEFAULT_POOL_FILL_TIMEOUT,
     ) -> None:
+        if (pool_minsize or 0) > pool_maxsize:
+            raise ValueError('pool_minsize must not exceed pool_maxsize')
+
+        # used by _wrap_operation, which is called from base constructor
+        self._command_timeout = command_timeout
+        self._retries = retries
+        self._retry_backoff = retry_backoff
+        self._circuit_breaker = circuit_breaker
+
+        super().__init__()
+
+        self._redis_pool_maxsize = pool_maxsize
+        self._protocol = protocol
+        self._connect_timeout = connect_timeout
+        self._health_check_interval = health_check_interval
+        self._health_checker: Optional[asyncio.Future] = None
+
+        self._prefix: Optional[bytes] = None
+        if prefix is not None:
+            self._prefix = prefix.encode(DEFAULT_ENCODING) + b':'
+
+        self._version_ttl = version_ttl
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+
         self._redis_address = address
         self._redis_pool_minsize = pool_minsize
+        self._pool_fill_timeout = pool_fill_timeout
         self._encoding = encoding
+        self._serializer = serializer
+
+        self._autobatch = autobatch
+        self._autobatch_window = autobatch_window
+        self._autobatch_max_size = autobatch_max_size
+        self._batchers: Dict[Optional[str], AutoBatcher] = {}
 
         self._pool: Optional[Redis] = None
+        self._connecting: Optional[asyncio.Future] = None
+        self._closed = False
 
     @property
     async def _client(self) -> Redis:
         if self._pool is None:
-            self._pool = await self._create_connection()
+            await self.connect()
 
         return self._pool
 
+    async def connect(self) -> None:
+        """
+        Opens the pool with `pool_minsize` connections, concurrent callers
+        share a single attempt, so a burst of first requests creates one pool.
+        """
+
+        if self._pool is not None:
+            return
+
+        if self._closed:
+            raise PoolClosedError('Redis backend is closed')
+
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._open())
+
+        # a cancelled caller must not cancel the attempt others wait for
+        await asyncio.shield(self._connecting)
+
+    async def _open(self) -> None:
+        try:
+            pool = await self._create_connection()
+        finally:
+            self._connecting = None
+
+        self._pool = pool
+        if self._health_check_interval is not None:
+            self._health_checker = asyncio.ensure_future(
+                self._check_health_periodically()
+            )
+
+    async def _client_for(self, key: RedisKey) -> Redis:
+        """
+        Client to run commands on `key` with, the same for every key here.
+        """
+
+        return await self._client
+
     async def _create_connection(self) -> Redis:
-        return await aioredis.create_redis_pool(
-            self._redis_address,
-            minsize=self._redis_pool_minsize,
-        )
+        return await self._create_pool(self._redis_address)
+
+    async def _create_pool(self, address: Any) -> Redis:
+        # callers wait for a free connection instead of failing at pool_maxsize
+        if isinstance(address, tuple):
+            host, port = address
+            pool = BlockingConnectionPool(
+                host=host, port=port, timeout=None, **self._pool_options()
+            )
+        else:
+            pool = BlockingConnectionPool.from_url(
+                address, timeout=None, **self._pool_options()
+            )
+
+        client = Redis.from_pool(pool)
+        await self._fill_pool(client)
+
+        return client
+
+    def _pool_options(self) -> dict:
+        # responses are decoded per call, retries are done by _wrap_operation
+        return {
+            'max_connections': self._redis_pool_maxsize,
+            'socket_connect_timeout': self._connect_timeout,
+            'socket_timeout': None,
+            'retry': Retry(NoBackoff(), 0),
+            'protocol': self._protocol,
+        }
+
+    async def _fill_pool(self, client: Redis) -> None:
+        """
+        Opens `pool_minsize` connections up front, redis-py connects lazily.
+        Raises asyncio.TimeoutError after `pool_fill_timeout` seconds.
+        """
+
+        pool = client.connection_pool
+        tasks = [
+            asyncio.ensure_future(pool.get_connection())
+            for _ in range(self._redis_pool_minsize or 0)
+        ]
+        if not tasks:
+            return
+
+        done, pending = await asyncio.wait(tasks, timeout=self._pool_fill_timeout)
+        for task in pending:
+            task.cancel()
+
+        # connections opened so far go back to the pool in any case
+        for task in done:
+            if not task.cancelled() and task.exception() is None:
+                await pool.release(task.result())
+
+        if pending:
+            raise asyncio.TimeoutError('Timed out filling Redis pool')
+
+        for task in done:
+            task.result()
 
     async def add(
         self,
         key: RedisKey,
         value: RedisValue,
+        tags: Optional[Sequence[str]] = None,
         **kwargs
     ) -> bool:
-        """
-        Bad temporary solution, this approach prone to
-        race condition error.
+        key = await self._make_key(key)
+        if tags:
+            return await self._set_with_tags(key, value, tags, nx=True, **kwargs)
 
-        # TODO: Implement via Lua
+        client = await self._client_for(key)
+        options = _translate_ttl(kwargs)
+        if _expires_immediately(options):
+            return not await client.exists(key)
 
-        if redis.call("GET", KEYS[1]) then
-            return 0
-        else
-            redis.call("SET", KEYS[1], ARGV[1])
-            return 1
-        end
+        is_added = await client.set(
+            key, self._serialize(value), nx=True, **options,
+        )
+
+        return bool(is_added)
+
+    async def get(
+        self,
+        key: RedisKey,
+        default: RedisValue = None,
+        **kwargs,
+    ) -> AnyStr:
+        key = await self._make_key(key)
+        encoding = self._get_encoding(kwargs)
+
+        if self._autobatch:
+            cached_value = await self._get_batcher(encoding).load(key)
+        else:
+            client = await self._client_for(key)
+            cached_value = _decode(await client.get(key), encoding)
+
+        if cached_value is None:
+            return default
+
+        return self._deserialize(cached_value)
+
+    async def get_raw(
+        self,
+        key: RedisKey,
+        default: Optional[Buffer] = None,
+    ) -> Optional[Buffer]:
+        """
+        Returns stored bytes as received, skipping decoding and serializer.
         """
 
+        key = await self._make_key(key)
+        if self._autobatch:
+            cached_value = await self._get_batcher(None).load(key)
+        else:
+            client = await self._client_for(key)
+            cached_value = await client.get(key)
+
+        return cached_value if cached_value is not None else default
+
+    async def get_many(
+        self,
+        *keys: RedisKey,
+        default: RedisValue = None,
+        **kwargs,
+    ) -> List[AnyStr]:
+        if not keys:
+            return []
+
+        keys = await self._make_keys(keys)
+        encoding = self._get_encoding(kwargs)
+
+        cached_values = await self._mget(keys, encoding)
+
+        return [
+            self._deserialize(cached_value) if cached_value is not None else default
+            for cached_value in cached_values
+        ]
+
+    async def set_many(
+        self,
+        mapping: Mapping[RedisKey, RedisValue],
+        ttl: Optional[float] = None,
+        ttls: Optional[Mapping[RedisKey, float]] = None,
+    ) -> bool:
+        if not mapping:
+            return True
+
+        keys = await self._make_keys(list(mapping))
+        values = [self._serialize(value) for value in mapping.values()]
+
         client = await self._client
-        in_cache = await client.get(key)
+        if ttl is None and not ttls:
+            return await client.mset(dict(zip(keys, values)))
 
-        if in_cache is not None:
-            return False
+        ttls = ttls or {}
+        pipeline = client.pipeline(transaction=False)
+        deleted = []
+        for key, redis_key, value in zip(mapping, keys, values):
+            options = _translate_ttl({'ttl': ttls.get(key, ttl)})
+            deleted.append(_expires_immediately(options))
+            if deleted[-1]:
+                pipeline.delete(redis_key)
+            else:
+                pipeline.set(redis_key, value, **options)
 
-        return await client.set(key, value, **kwargs)
+        results = await pipeline.execute()
+        return all(
+            is_deleted or result for is_deleted, result in zip(deleted, results)
+        )
 
-    async def get(
+    async def delete_many(self, *keys: RedisKey) -> int:
+        if not keys:
+            return 0
+
+        keys = await self._make_keys(keys)
+        client = await self._client
+
+        return await client.delete(*keys)
+
+    async def get_with_ttl(
         self,
         key: RedisKey,
         default: RedisValue = None,
         **kwargs,
-    ) -> AnyStr:
-        kwargs.setdefault('encoding', self._encoding)
+    ) -> Tuple[AnyStr, Optional[float]]:
+        key = await self._make_key(key)
+        encoding = self._get_encoding(kwargs)
+
+        client = await self._client_for(key)
+        transaction = client.pipeline(transaction=True)
+        transaction.get(key)
+        transaction.pttl(key)
+        cached_value, pttl = await transaction.execute()
+
+        return self._with_ttl(cached_value, pttl, default, encoding)
+
+    async def get_many_with_ttl(
+        self,
+        *keys: RedisKey,
+        default: RedisValue = None,
+        **kwargs,
+    ) -> List[Tuple[AnyStr, Optional[float]]]:
+        if not keys:
+            return []
+
+        keys = await self._make_keys(keys)
+        encoding = self._get_encoding(kwargs)
 
         client = await self._client
-        cached_value = await client.get(key, **kwargs)
+        transaction = client.pipeline(transaction=True)
+        transaction.mget(keys)
+        for key in keys:
+            transaction.pttl(key)
+        cached_values, *pttls = await transaction.execute()
 
-        return cached_value if cached_value is not None else default
+        return [
+            self._with_ttl(cached_value, pttl, default, encoding)
+            for cached_value, pttl in zip(cached_values, pttls)
+        ]
 
     async def set(
         self,
         key: RedisKey,
         value: RedisValue,
+        tags: Optional[Sequence[str]] = None,
         **kwargs,
     ) -> bool:
-        client = await self._client
+        key = await self._make_key(key)
+        if tags:
+            return await self._set_with_tags(key, value, tags, **kwargs)
+
+        client = await self._client_for(key)
+        options = _translate_ttl(kwargs)
+        if _expires_immediately(options):
+            await client.delete(key)
+            return True
 
-        return await client.set(key, value, **kwargs)
+        is_set = await client.set(key, self._serialize(value), **options)
+
+        return bool(is_set)
+
+    async def get_or_set(
+        self,
+        key: RedisKey,
+        loader: Loader,
+        lock_timeout: Optional[float] = None,
+        lock_poll_interval: float = DEFAULT_LOCK_POLL_INTERVAL,
+        **kwargs,
+    ) -> RedisValue:
+        """
+        With `lock_timeout` set, a lease is taken in Redis before calling
+        `loader`, so only one worker across all processes recomputes the
+        value while others poll for it. The lease expires after
+        `lock_timeout` seconds in case its holder dies.
+        """
+
+        return await super().get_or_set(
+            key,
+            loader,
+            lock_timeout=lock_timeout,
+            lock_poll_interval=lock_poll_interval,
+            **kwargs,
+        )
+
+    async def compare_and_set(
+        self,
+        key: RedisKey,
+        expected: RedisValue,
+        value: RedisValue,
+        ttl: Optional[float] = None,
+    ) -> bool:
+        """
+        Atomically replaces value only if current one equals `expected`.
+        Without `ttl` current expiration of the key is kept.
+        """
+
+        key = await self._make_key(key)
+        client = await self._client_for(key)
+        replaced = await COMPARE_AND_SET(
+            client,
+            keys=[key],
+            args=[
+                self._serialize(expected),
+                self._serialize(value),
+                _to_milliseconds(ttl),
+            ],
+        )
+
+        return bool(replaced)
+
+    async def get_and_touch(
+        self,
+        key: RedisKey,
+        ttl: float,
+        default: RedisValue = None,
+        encoding: Optional[str] = MISSING,
+    ) -> AnyStr:
+        """
+        Returns value and resets its expiration to `ttl` in one round-trip.
+        """
+
+        key = await self._make_key(key)
+        encoding = self._get_encoding(
+            {} if encoding is MISSING else {'encoding': encoding}
+        )
+
+        client = await self._client_for(key)
+        cached_value = await GET_AND_TOUCH(
+            client,
+            keys=[key],
+            args=[_to_milliseconds(ttl)],
+            encoding=encoding,
+        )
+
+        if cached_value is None:
+            return default
+
+        return self._deserialize(cached_value)
+
+    async def incr(
+        self,
+        key: RedisKey,
+        amount: int = 1,
+        ttl: Optional[float] = None,
+    ) -> int:
+        """
+        Increments integer value, `ttl` is applied when the counter has
+        no expiration yet, i.e. it was just created.
+        """
+
+        key = await self._make_key(key)
+        client = await self._client_for(key)
+
+        return await INCR_WITH_TTL(
+            client,
+            keys=[key],
+            args=[amount, _to_milliseconds(ttl)],
+        )
 
     async def exists(self, *keys: RedisKey) -> bool:
+        keys = await self._make_keys(keys)
         client = await self._client
         exists = await client.exists(*keys)
 
         return bool(exists)
 
     async def delete(self, key: RedisKey) -> bool:
-        client = await self._client
+        key = await self._make_key(key)
+        client = await self._client_for(key)
 
         return await client.delete(key)
 
     async def flush(self) -> None:
+        """
+        Drops the whole database, or only the namespace when `prefix`
+        is set (by bumping its version).
+        """
+
+        if self._prefix is not None:
+            await self.bump_version()
+            return
+
         client = await self._client
         await client.flushdb()
 
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        Tag sets are only cleaned up here or when they expire, so a key
+        rewritten without a tag may still be deleted by that tag.
+        """
+
+        if not tags:
+            return 0
+
+        client = await self._client
+
+        return await INVALIDATE_TAGS(
+            client,
+            keys=[self._tag_key(tag) for tag in tags],
+        )
+
+    async def bump_version(self) -> int:
+        if self._prefix is None:
+            raise ValueError('Namespace operations require prefix')
+
+        version_key = self._prefix + VERSION_KEY
+        client = await self._client_for(version_key)
+        self._version = await client.incr(version_key)
+        self._version_checked_at = time.monotonic()
+
+        return self._version
+
+    async def clear_namespace(
+        self,
+        batch_size: int = DEFAULT_CLEAR_BATCH,
+    ) -> int:
+        """
+        Keys of older versions are reclaimed with SCAN and UNLINK, so
+        Redis frees memory in background and is never blocked for long.
+        """
+
+        version = await self.bump_version()
+        current_prefix = b'%s%d:' % (self._prefix, version)
+        version_key = self._prefix + VERSION_KEY
+        # tag sets are shared by all versions, keys of the current one
+        # may already be tagged
+        tag_prefix = self._prefix + NAMESPACE_TAG_PREFIX
+        pattern = _escape_pattern(self._prefix) + b'*'
+
+        client = await self._client
+        removed = 0
+        cursor = 0
+        while True:
+            cursor, keys = await client.scan(
+                cursor, match=pattern, count=batch_size,
+            )
+            stale_keys = [
+                key
+                for key in keys
+                if key != version_key
+                and not key.startswith(current_prefix)
+                and not key.startswith(tag_prefix)
+            ]
+            if stale_keys:
+                removed += await client.unlink(*stale_keys)
+
+            if not cursor:
+                return removed
+
     async def expire(
         self,
         key: RedisKey,
-        ttl: int
+        ttl: Optional[float] = None
     ) -> bool:
-        client = await self._client
+        key = await self._make_key(key)
+        client = await self._client_for(key)
+
+        if ttl is None:
+            # PERSIST returns 0 for keys without TTL as well
+            transaction = client.pipeline(transaction=True)
+            transaction.persist(key)
+            transaction.exists(key)
+            _, exists = await transaction.execute()
+            return bool(exists)
 
-        return await client.expire(key, ttl)
+        if isinstance(ttl, float) and not ttl.is_integer():
+            return await client.pexpire(key, math.ceil(ttl * 1000))
+
+        return await client.expire(key, int(ttl))
 
     async def close(self) -> None:
+        await self._cancel_refreshes()
+        if self._health_checker is not None:
+            self._health_checker.cancel()
+            self._health_checker = None
+
+        self._closed = True
+        for batcher in self._batchers.values():
+            await batcher.close()
+
+        if self._pool is not None:
+            await self._pool.aclose()
+            self._pool = None
+
+    def _wrap_operation(
+        self,
+        name: str,
+        method: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Any]]:
+        # get_or_set awaits the loader, its Redis calls are guarded anyway
+        if name == 'get_or_set' or (
+            self._command_timeout is None
+            and not self._retries
+            and self._circuit_breaker is None
+        ):
+            return method
+
+        fallback = FALLBACKS.get(name)
+        retries = 0 if name in NON_RETRYABLE_OPERATIONS else self._retries
+
+        @wraps(method)
+        async def guarded(*args: Any, **kwargs) -> Any:
+            breaker = self._circuit_breaker
+            if breaker is not None and not breaker.allow_request():
+                if fallback is None:
+                    raise CircuitOpenError('Redis circuit breaker is open')
+
+                return fallback(name, args, kwargs)
+
+            attempt = 0
+            while True:
+                try:
+                    result = await asyncio.wait_for(
+                        method(*args, **kwargs),
+                        self._command_timeout,
+                    )
+                except CONNECTION_ERRORS:
+                    if breaker is not None:
+                        breaker.record_failure()
+
+                    if attempt >= retries or (
+                        breaker is not None and not breaker.allow_request()
+                    ):
+                        raise
+
+                    await asyncio.sleep(self._retry_backoff * 2 ** attempt)
+                    attempt += 1
+                    continue
+
+                if breaker is not None:
+                    breaker.record_success()
+
+                return result
+
+        return guarded
+
+    async def _check_health_periodically(self) -> None:
+        timeout = self._command_timeout or self._health_check_interval
+        while True:
+            await asyncio.sleep(self._health_check_interval)
+            try:
+                await asyncio.wait_for(self._pool.ping(), timeout)
+            except CONNECTION_ERRORS:
+                logger.warning('Redis health check failed', exc_info=True)
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker.record_failure()
+
+                await self._disconnect_idle()
+            else:
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker.record_success()
+
+    async def _compute(
+        self,
+        key: RedisKey,
+        loader: Loader,
+        lock_timeout: Optional[float] = None,
+        lock_poll_interval: float = DEFAULT_LOCK_POLL_INTERVAL,
+        **kwargs,
+    ) -> RedisValue:
+        if lock_timeout is None:
+            return await super()._compute(key, loader, **kwargs)
+
+        lock_key = self._lock_key(key)
+        client = await self._client_for(lock_key)
+        token = uuid.uuid4().hex
+
+        while True:
+            acquired = await client.set(
+                lock_key,
+                token,
+                px=int(lock_timeout * 1000),
+                nx=True,
+            )
+            if acquired:
+                try:
+                    return await super()._compute(key, loader, **kwargs)
+                finally:
+                    await RELEASE_LOCK(client, keys=[lock_key], args=[token])
+
+            await asyncio.sleep(lock_poll_interval)
+            value = await self.get(key, MISSING)
+            if value is not MISSING:
+                return value
+
+    async def _disconnect_idle(self) -> None:
+        # the pool reconnects on demand
+        await self._pool.connection_pool.disconnect(inuse_connections=False)
+
+    async def _mget(
+        self,
+        keys: Sequence[RedisKey],
+        encoding: Optional[str],
+    ) -> List[Optional[AnyStr]]:
         client = await self._client
-        client.close()
-        await client.wait_closed()
+        cached_values = await client.mget(keys)
+
+        return [_decode(cached_value, encoding) for cached_value in cached_values]
+
+    def _with_ttl(
+        self,
+        cached_value: Optional[bytes],
+        pttl: int,
+        default: RedisValue,
+        encoding: Optional[str],
+    ) -> Tuple[AnyStr, Optional[float]]:
+        if cached_value is None:
+            return default, None
+
+        return (
+            self._deserialize(_decode(cached_value, encoding)),
+            pttl / 1000 if pttl >= 0 else None,
+        )
+
+    async def _get_version(self) -> int:
+        now = time.monotonic()
+        if (
+            self._version is None
+            or now - self._version_checked_at >= self._version_ttl
+        ):
+            version_key = self._prefix + VERSION_KEY
+            client = await self._client_for(version_key)
+            version = await client.get(version_key)
+            self._version = int(version or 0)
+            self._version_checked_at = now
+
+        return self._version
+
+    async def _make_key(self, key: RedisKey) -> RedisKey:
+        if self._prefix is None:
+            return key
+
+        version = await self._get_version()
+        return b'%s%d:%s' % (self._prefix, version, self._encode_key(key))
+
+    async def _make_keys(
+        self,
+        keys: Sequence[RedisKey],
+    ) -> Sequence[RedisKey]:
+        if self._prefix is None:
+            return keys
+
+        prefix = b'%s%d:' % (self._prefix, await self._get_version())
+        return [prefix + self._encode_key(key) for key in keys]
+
+    async def _set_with_tags(
+        self,
+        key: RedisKey,
+        value: RedisValue,
+        tags: Sequence[str],
+        nx: bool = False,
+        **kwargs,
+    ) -> bool:
+        options = _translate_ttl(kwargs)
+        client = await self._client_for(key)
+        if _expires_immediately(options):
+            if nx:
+                return not await client.exists(key)
+
+            await client.delete(key)
+            return True
+
+        pttl = options.pop('px', None)
+        if pttl is None:
+            pttl = _to_milliseconds(options.pop('ex', None))
+        if options:
+            raise TypeError(
+                'Unexpected arguments with tags: {}'.format(', '.join(options))
+            )
+
+        # tag sets live at least as long as the keys they point to
+        is_set = await SET_WITH_TAGS(
+            client,
+            keys=[key, *map(self._tag_key, tags)],
+            args=[self._serialize(value), pttl, int(nx)],
+        )
+
+        return bool(is_set)
+
+    def _tag_key(self, tag: str) -> bytes:
+        if self._prefix is None:
+            return TAG_PREFIX + self._encode_key(tag)
+
+        return self._prefix + NAMESPACE_TAG_PREFIX + self._encode_key(tag)
+
+    def _encode_key(self, key: RedisKey) -> bytes:
+        if isinstance(key, str):
+            key = key.encode(self._encoding or DEFAULT_ENCODING)
+        elif not isinstance(key, (bytes, bytearray)):
+            key = str(key).encode(DEFAULT_ENCODING)
+
+        return bytes(key)
+
+    def as_stored(self, key: RedisKey, value: RedisValue) -> RedisValue:
+        if self._serializer is not None:
+            return self._serializer.loads(self._serializer.dumps(value))
+
+        # redis-py sends numbers as their string representation
+        encoded = Encoder(DEFAULT_ENCODING, 'strict', False).encode(value)
+        return _decode(encoded, self._encoding)
+
+    def _get_encoding(self, kwargs: dict) -> Optional[str]:
+        # serialized payloads are binary, so they are never decoded
+        if self._serializer is not None:
+            return None
+
+        return kwargs.get('encoding', self._encoding)
+
+    def _serialize(self, value: RedisValue) -> RedisValue:
+        if self._serializer is None:
+            return value
+
+        return self._serializer.dumps(value)
+
+    def _deserialize(self, cached_value: AnyStr) -> RedisValue:
+        if self._serializer is None:
+            return cached_value
+
+        return self._serializer.loads(cached_value)
+
+    def _get_batcher(self, encoding: Optional[str]) -> AutoBatcher:
+        batcher = self._batchers.get(encoding)
+        if batcher is None:
+            async def fetch(keys: List[RedisKey]) -> List[AnyStr]:
+                return await self._mget(keys, encoding)
+
+            batcher = AutoBatcher(
+                fetch,
+                window=self._autobatch_window,
+                max_batch_size=self._autobatch_max_size,
+            )
+            self._batchers[encoding] = batcher
+
+        return batcher
+
+    def _lock_key(self, key: RedisKey) -> bytes:
+        return LOCK_PREFIX + (self._prefix or b'') + self._encode_key(key)
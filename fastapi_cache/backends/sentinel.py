@@ -0,0 +1,81 @@
+from typing import Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.sentinel import Sentinel, SentinelConnectionPool
+
+from .redis import RedisCacheBackend
+
+CACHE_KEY = 'REDIS_SENTINEL'
+DEFAULT_SENTINEL_TIMEOUT = 0.2
+DEFAULT_SENTINEL_PORT = 26379
+
+SentinelAddress = Union[str, Tuple[str, int]]
+
+
+def _parse_address(address: SentinelAddress) -> Tuple[str, int]:
+    if isinstance(address, tuple):
+        return address
+
+    url = urlparse(address)
+    return url.hostname, url.port or DEFAULT_SENTINEL_PORT
+
+
+class BlockingSentinelConnectionPool(
+    SentinelConnectionPool,
+    BlockingConnectionPool,
+):
+    """
+    Sentinel pool waiting for a free connection at `max_connections`
+    instead of raising MaxConnectionsError, like the other backends.
+    """
+
+
+class RedisSentinelCacheBackend(RedisCacheBackend):
+    """
+    Talks to the current master of `service_name` as reported by
+    `sentinels`, after a failover commands go to the promoted replica.
+    Other options are the same as of `RedisCacheBackend`.
+    """
+
+    def __init__(
+        self,
+        sentinels: Sequence[SentinelAddress],
+        service_name: str,
+        **kwargs,
+    ) -> None:
+        if not sentinels:
+            raise ValueError('At least one sentinel is required')
+
+        super().__init__(sentinels[0], **kwargs)
+
+        self._sentinels = [_parse_address(address) for address in sentinels]
+        self._service_name = service_name
+        self._sentinel: Optional[Sentinel] = None
+
+    async def close(self) -> None:
+        await super().close()
+
+        if self._sentinel is not None:
+            for client in self._sentinel.sentinels:
+                await client.aclose()
+
+            self._sentinel = None
+
+    async def _create_connection(self) -> Redis:
+        self._sentinel = Sentinel(
+            self._sentinels,
+            sentinel_kwargs={
+                'socket_timeout': self._connect_timeout or DEFAULT_SENTINEL_TIMEOUT,
+            },
+        )
+
+        client = self._sentinel.master_for(
+            self._service_name,
+            connection_pool_class=BlockingSentinelConnectionPool,
+            timeout=None,
+            **self._pool_options(),
+        )
+        await self._fill_pool(client)
+
+        return client
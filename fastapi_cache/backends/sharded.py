@@ -0,0 +1,258 @@
+import asyncio
+from typing import (
+    Any, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple, Union
+)
+
+from .base import DEFAULT_CLEAR_BATCH, BaseCacheBackend, Loader
+from .utils.hashring import DEFAULT_VIRTUAL_NODES, HashRing
+
+CACHE_KEY = 'SHARDED'
+
+Shards = Union[Sequence[BaseCacheBackend], Mapping[str, BaseCacheBackend]]
+
+
+class ShardedCacheBackend(BaseCacheBackend[Hashable, Any]):
+    """
+    Spreads keys over `shards` with a consistent hash ring, so adding
+    or removing a shard only moves about 1/N of the keys. Multi-key
+    operations are split by shard and sent to all of them in parallel.
+
+    Shards passed as a sequence are named by position, pass a mapping
+    with stable names when shards are going to be added or removed.
+    """
+
+    def __init__(
+        self,
+        shards: Shards,
+        virtual_nodes: int = DEFAULT_VIRTUAL_NODES,
+    ) -> None:
+        super().__init__()
+
+        if not isinstance(shards, Mapping):
+            shards = {
+                'shard-{}'.format(position): shard
+                for position, shard in enumerate(shards)
+            }
+
+        if not shards:
+            raise ValueError('At least one shard is required')
+
+        self._ring = HashRing(virtual_nodes)
+        self.shards: Dict[str, BaseCacheBackend] = {}
+        for name, shard in shards.items():
+            self.add_shard(name, shard)
+
+    def add_shard(self, name: str, shard: BaseCacheBackend) -> None:
+        self._ring.add(name)
+        self.shards[name] = shard
+
+    def remove_shard(self, name: str) -> BaseCacheBackend:
+        """
+        Takes shard out of the ring and returns it, closing it is left
+        to the caller.
+        """
+
+        if len(self.shards) == 1 and name in self.shards:
+            raise ValueError('Cannot remove the last shard')
+
+        self._ring.remove(name)
+        return self.shards.pop(name)
+
+    def get_shard(self, key: Hashable) -> BaseCacheBackend:
+        return self.shards[self._ring.get(key)]
+
+    async def add(self, key: Hashable, value: Any, **kwargs) -> bool:
+        return await self.get_shard(key).add(key, value, **kwargs)
+
+    async def get(self, key: Hashable, default: Any = None, **kwargs) -> Any:
+        return await self.get_shard(key).get(key, default, **kwargs)
+
+    async def get_raw(self, key: Hashable, default: Any = None) -> Any:
+        return await self.get_shard(key).get_raw(key, default)
+
+    async def get_with_ttl(
+        self,
+        key: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> Tuple[Any, Optional[float]]:
+        return await self.get_shard(key).get_with_ttl(key, default, **kwargs)
+
+    async def get_and_touch(
+        self,
+        key: Hashable,
+        ttl: float,
+        default: Any = None,
+        **kwargs
+    ) -> Any:
+        return await self.get_shard(key).get_and_touch(
+            key, ttl, default, **kwargs
+        )
+
+    async def set(self, key: Hashable, value: Any, **kwargs) -> bool:
+        return await self.get_shard(key).set(key, value, **kwargs)
+
+    async def get_or_set(
+        self,
+        key: Hashable,
+        loader: Loader,
+        **kwargs
+    ) -> Any:
+        # shards deduplicate loads themselves, possibly across processes
+        return await self.get_shard(key).get_or_set(key, loader, **kwargs)
+
+    async def compare_and_set(
+        self,
+        key: Hashable,
+        expected: Any,
+        value: Any,
+        **kwargs
+    ) -> bool:
+        return await self.get_shard(key).compare_and_set(
+            key, expected, value, **kwargs
+        )
+
+    async def incr(self, key: Hashable, *args: Any, **kwargs) -> int:
+        return await self.get_shard(key).incr(key, *args, **kwargs)
+
+    async def expire(self, key: Hashable, ttl: Optional[float] = None) -> bool:
+        return await self.get_shard(key).expire(key, ttl)
+
+    async def delete(self, key: Hashable) -> bool:
+        return await self.get_shard(key).delete(key)
+
+    async def get_many(
+        self,
+        *keys: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> List[Any]:
+        groups = self._group(keys)
+        results = await asyncio.gather(*(
+            shard.get_many(*(keys[position] for position in positions),
+                           default=default, **kwargs)
+            for shard, positions in groups
+        ))
+
+        values: List[Any] = [default] * len(keys)
+        for (_, positions), shard_values in zip(groups, results):
+            for position, value in zip(positions, shard_values):
+                values[position] = value
+
+        return values
+
+    async def get_many_with_ttl(
+        self,
+        *keys: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> List[Tuple[Any, Optional[float]]]:
+        groups = self._group(keys)
+        results = await asyncio.gather(*(
+            shard.get_many_with_ttl(*(keys[position] for position in positions),
+                                    default=default, **kwargs)
+            for shard, positions in groups
+        ))
+
+        values: List[Tuple[Any, Optional[float]]] = [(default, None)] * len(keys)
+        for (_, positions), shard_values in zip(groups, results):
+            for position, value in zip(positions, shard_values):
+                values[position] = value
+
+        return values
+
+    async def set_many(
+        self,
+        mapping: Mapping[Hashable, Any],
+        ttl: Optional[float] = None,
+        ttls: Optional[Mapping[Hashable, float]] = None,
+    ) -> bool:
+        keys = list(mapping)
+        ttls = ttls or {}
+
+        results = await asyncio.gather(*(
+            shard.set_many(
+                {keys[position]: mapping[keys[position]] for position in positions},
+                ttl=ttl,
+                ttls={
+                    keys[position]: ttls[keys[position]]
+                    for position in positions
+                    if keys[position] in ttls
+                },
+            )
+            for shard, positions in self._group(keys)
+        ))
+
+        return all(results)
+
+    async def delete_many(self, *keys: Hashable) -> int:
+        results = await asyncio.gather(*(
+            shard.delete_many(*(keys[position] for position in positions))
+            for shard, positions in self._group(keys)
+        ))
+
+        return sum(results)
+
+    async def exists(self, *keys: Hashable) -> bool:
+        results = await asyncio.gather(*(
+            shard.exists(*(keys[position] for position in positions))
+            for shard, positions in self._group(keys)
+        ))
+
+        return any(results)
+
+    async def flush(self) -> None:
+        await asyncio.gather(*(shard.flush() for shard in self.shards.values()))
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        # a tag may be attached to keys on any shard
+        results = await asyncio.gather(*(
+            shard.invalidate_tags(*tags) for shard in self.shards.values()
+        ))
+
+        return sum(results)
+
+    async def bump_version(self) -> int:
+        versions = await asyncio.gather(*(
+            shard.bump_version() for shard in self.shards.values()
+        ))
+
+        return max(versions)
+
+    async def clear_namespace(
+        self,
+        batch_size: int = DEFAULT_CLEAR_BATCH,
+    ) -> int:
+        results = await asyncio.gather(*(
+            shard.clear_namespace(batch_size) for shard in self.shards.values()
+        ))
+
+        return sum(results)
+
+    async def connect(self) -> None:
+        await asyncio.gather(*(shard.connect() for shard in self.shards.values()))
+
+    async def close(self) -> None:
+        await self._cancel_refreshes()
+        await asyncio.gather(*(shard.close() for shard in self.shards.values()))
+
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        stats['shards'] = {
+            name: shard.get_stats() for name, shard in self.shards.items()
+        }
+
+        return stats
+
+    def as_stored(self, key: Hashable, value: Any) -> Any:
+        return self.get_shard(key).as_stored(key, value)
+
+    def _group(
+        self,
+        keys: Sequence[Hashable],
+    ) -> List[Tuple[BaseCacheBackend, List[int]]]:
+        groups: Dict[str, List[int]] = {}
+        for position, key in enumerate(keys):
+            groups.setdefault(self._ring.get(key), []).append(position)
+
+        return [(self.shards[name], positions) for name, positions in groups.items()]
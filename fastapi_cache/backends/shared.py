@@ -0,0 +1,174 @@
+import asyncio
+from typing import Any, Hashable, List, Optional, Tuple
+
+from ..serializers import BaseSerializer, PickleSerializer
+from .base import DEFAULT_CLEAR_BATCH, BaseCacheBackend
+from .utils.hashring import key_to_bytes
+from .utils.sharedtable import (
+    DEFAULT_MAX_PROBES,
+    DEFAULT_SLOT_SIZE,
+    DEFAULT_SLOTS,
+    SharedTable,
+)
+
+CACHE_KEY = 'SHARED_MEMORY'
+
+
+def _get_ttl(kwargs: dict) -> Optional[float]:
+    pttl = kwargs.get('pttl')
+    if pttl is not None:
+        return pttl / 1000
+
+    return kwargs.get('ttl')
+
+
+class SharedMemoryCacheBackend(BaseCacheBackend[Hashable, Any]):
+    """
+    One cache for all processes of a host opening the same `path`, like
+    workers of a gunicorn or uvicorn server. Put `path` on tmpfs such as
+    `/dev/shm`, so the segment is never written back to disk.
+
+    Key and serialized value of an entry have to fit into `slot_size`
+    bytes less a 48 byte header, `set` of a larger value returns False.
+    Reads take no lock, writes of all processes are serialized and
+    block the event loop only for the copy of one entry.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        slots: int = DEFAULT_SLOTS,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        max_probes: int = DEFAULT_MAX_PROBES,
+        serializer: Optional[BaseSerializer] = None,
+        prefix: Optional[str] = None,
+    ) -> None:
+        super().__init__()
+
+        self._table = SharedTable(path, slots, slot_size, max_probes)
+        self._serializer = serializer or PickleSerializer()
+        self._prefix = prefix.encode('utf-8') if prefix is not None else None
+
+    async def add(self, key: Hashable, value: Any, **kwargs) -> bool:
+        self._check_tags(kwargs)
+        return self._table.add(
+            self._make_key(key), self._serializer.dumps(value), _get_ttl(kwargs),
+        )
+
+    async def get(self, key: Hashable, default: Any = None, **kwargs) -> Any:
+        return self._get(key, default)
+
+    async def get_many(
+        self,
+        *keys: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> List[Any]:
+        return [self._get(key, default) for key in keys]
+
+    async def get_with_ttl(
+        self,
+        key: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> Tuple[Any, Optional[float]]:
+        cached_value, ttl = self._table.get_with_ttl(self._make_key(key))
+        if cached_value is None:
+            return default, None
+
+        return self._serializer.loads(cached_value), ttl
+
+    async def set(self, key: Hashable, value: Any, **kwargs) -> bool:
+        self._check_tags(kwargs)
+        return self._table.set(
+            self._make_key(key), self._serializer.dumps(value), _get_ttl(kwargs),
+        )
+
+    async def expire(
+        self,
+        key: Hashable,
+        ttl: Optional[float] = None,
+        **kwargs,
+    ) -> bool:
+        return self._table.expire(
+            self._make_key(key), _get_ttl(dict(kwargs, ttl=ttl)),
+        )
+
+    async def exists(self, *keys: Hashable) -> bool:
+        return any(
+            self._table.get(self._make_key(key)) is not None for key in keys
+        )
+
+    async def delete(self, key: Hashable) -> bool:
+        return self._table.delete(self._make_key(key))
+
+    async def flush(self) -> None:
+        self._table.flush()
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        raise NotImplementedError('Tags are not supported in shared memory')
+
+    async def bump_version(self) -> int:
+        if self._prefix is None:
+            raise ValueError('Namespace operations require prefix')
+
+        return self._table.bump_version(self._prefix)
+
+    async def clear_namespace(
+        self,
+        batch_size: int = DEFAULT_CLEAR_BATCH,
+    ) -> int:
+        version = await self.bump_version()
+        current_prefix = b'%s:%d:' % (self._prefix, version)
+        stale_keys = [
+            key
+            for key in self._table.keys()
+            if key.startswith(self._prefix + b':')
+            and not key.startswith(current_prefix)
+        ]
+
+        removed = 0
+        for start in range(0, len(stale_keys), batch_size):
+            removed += sum(
+                self._table.delete(key)
+                for key in stale_keys[start:start + batch_size]
+            )
+            await asyncio.sleep(0)
+
+        return removed
+
+    async def close(self) -> None:
+        await self._cancel_refreshes()
+        self._table.close()
+
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        stats.update(
+            evictions=self._table.evictions,
+            entries=len(self._table),
+            slots=self._table.slots,
+        )
+
+        return stats
+
+    def as_stored(self, key: Hashable, value: Any) -> Any:
+        return self._serializer.loads(self._serializer.dumps(value))
+
+    def _get(self, key: Hashable, default: Any) -> Any:
+        cached_value = self._table.get(self._make_key(key))
+        if cached_value is None:
+            return default
+
+        return self._serializer.loads(cached_value)
+
+    def _make_key(self, key: Hashable) -> bytes:
+        if self._prefix is None:
+            return key_to_bytes(key)
+
+        version = self._table.get_version(self._prefix)
+        return b'%s:%d:%s' % (self._prefix, version, key_to_bytes(key))
+
+    @staticmethod
+    def _check_tags(kwargs: dict) -> None:
+        if kwargs.get('tags'):
+            raise NotImplementedError('Tags are not supported in shared memory')
@@ -0,0 +1,404 @@
+import time
+from typing import Any, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+from .base import DEFAULT_CLEAR_BATCH, MISSING, BaseCacheBackend, KeyLoader
+from .invalidation import RedisInvalidationBus
+from .memory import InMemoryCacheBackend
+from .utils.ttldict import TTLDict
+
+CACHE_KEY = 'TIERED'
+
+WRITE_THROUGH = 'write_through'
+WRITE_AROUND = 'write_around'
+
+DEFAULT_L1_TTL = 1.0
+DEFAULT_L1_MAX_ENTRIES = 10000
+
+
+def _get_ttl(kwargs: dict) -> Optional[float]:
+    pttl = kwargs.get('pttl', kwargs.get('pexpire'))
+    if pttl is not None:
+        return pttl / 1000
+
+    return kwargs.get('ttl', kwargs.get('expire'))
+
+
+class TieredCacheStats:
+    __slots__ = ('l1_hits', 'l1_misses', 'l2_hits', 'l2_misses')
+
+    def __init__(self) -> None:
+        self.l1_hits = 0
+        self.l1_misses = 0
+        self.l2_hits = 0
+        self.l2_misses = 0
+
+    @property
+    def l1_hit_ratio(self) -> float:
+        total = self.l1_hits + self.l1_misses
+        return self.l1_hits / total if total else 0.0
+
+
+class TieredCacheBackend(BaseCacheBackend[Hashable, Any]):
+    """
+    Near cache: bounded in-process L1 with short TTL in front of any L2.
+
+    With `read_through` L2 hits are copied to L1. In `write_through` mode
+    writes go to both tiers, in `write_around` mode only to L2 while the
+    L1 copy is dropped. L1 entries never outlive the L2 TTL.
+
+    L1 keeps values as an L2 read returns them (see `as_stored`), so
+    their type does not change once the L1 copy expires. `get_with_ttl`
+    served from L1 reports the TTL left in L2 when the copy was made.
+
+    Calls with backend specific options (e.g. `encoding`) bypass L1.
+
+    With `invalidation_bus` writes on this node also drop L1 copies
+    on every other node attached to the same bus.
+    """
+
+    def __init__(
+        self,
+        l2: BaseCacheBackend,
+        l1: Optional[InMemoryCacheBackend] = None,
+        l1_ttl: float = DEFAULT_L1_TTL,
+        read_through: bool = True,
+        write_mode: str = WRITE_THROUGH,
+        invalidation_bus: Optional[RedisInvalidationBus] = None,
+    ) -> None:
+        super().__init__()
+
+        if write_mode not in (WRITE_THROUGH, WRITE_AROUND):
+            raise ValueError('Unknown write mode: {}'.format(write_mode))
+
+        self.l1 = l1 if l1 is not None else InMemoryCacheBackend(
+            max_entries=DEFAULT_L1_MAX_ENTRIES
+        )
+        self.l2 = l2
+
+        self._l1_ttl = l1_ttl
+        self._read_through = read_through
+        self._write_mode = write_mode
+
+        self._invalidation_bus = invalidation_bus
+        if invalidation_bus is not None:
+            invalidation_bus.attach(self.l1)
+
+        # L2 expiration times of L1 entries, reported by get_with_ttl
+        self._l2_deadlines = TTLDict(max_entries=DEFAULT_L1_MAX_ENTRIES)
+        self.stats = TieredCacheStats()
+
+    async def add(
+        self,
+        key: Hashable,
+        value: Any,
+        **kwargs,
+    ) -> bool:
+        is_added = await self.l2.add(key, value, **kwargs)
+        if is_added:
+            await self._write_l1(key, value, _get_ttl(kwargs), kwargs.get('tags'))
+            self._publish(key)
+
+        return is_added
+
+    async def get(
+        self,
+        key: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> Any:
+        if kwargs:
+            return await self.l2.get(key, default, **kwargs)
+
+        value = await self.l1.get(key, MISSING)
+        if value is not MISSING:
+            self.stats.l1_hits += 1
+            return value
+
+        self.stats.l1_misses += 1
+        if not self._read_through:
+            value, remaining = await self.l2.get(key, MISSING), None
+        else:
+            value, remaining = await self.l2.get_with_ttl(key, MISSING)
+
+        if value is MISSING:
+            self.stats.l2_misses += 1
+            return default
+
+        self.stats.l2_hits += 1
+        if self._read_through:
+            await self._fill_l1({key: value}, {key: remaining})
+
+        return value
+
+    async def get_with_ttl(
+        self,
+        key: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> Tuple[Any, Optional[float]]:
+        if kwargs:
+            return await self.l2.get_with_ttl(key, default, **kwargs)
+
+        value, l1_ttl = await self.l1.get_with_ttl(key, MISSING)
+        if value is not MISSING:
+            self.stats.l1_hits += 1
+            return value, self._get_l2_ttl(key, l1_ttl)
+
+        self.stats.l1_misses += 1
+        value, remaining = await self.l2.get_with_ttl(key, MISSING)
+        if value is MISSING:
+            self.stats.l2_misses += 1
+            return default, None
+
+        self.stats.l2_hits += 1
+        if self._read_through:
+            await self._fill_l1({key: value}, {key: remaining})
+
+        return value, remaining
+
+    async def get_many(
+        self,
+        *keys: Hashable,
+        default: Any = None,
+        **kwargs
+    ) -> List[Any]:
+        if kwargs:
+            return await self.l2.get_many(*keys, default=default, **kwargs)
+
+        values = await self.l1.get_many(*keys, default=MISSING)
+        missed = [key for key, value in zip(keys, values) if value is MISSING]
+
+        self.stats.l1_hits += len(keys) - len(missed)
+        self.stats.l1_misses += len(missed)
+
+        fetched = {}
+        if missed and not self._read_through:
+            l2_values = await self.l2.get_many(*missed, default=MISSING)
+            fetched = {
+                key: value
+                for key, value in zip(missed, l2_values)
+                if value is not MISSING
+            }
+        elif missed:
+            # L1 copies must not outlive what is left of the L2 TTL
+            results = await self.l2.get_many_with_ttl(*missed, default=MISSING)
+            ttls = {}
+            for key, (value, remaining) in zip(missed, results):
+                if value is not MISSING:
+                    fetched[key] = value
+                    ttls[key] = remaining
+
+            await self._fill_l1(fetched, ttls)
+
+        self.stats.l2_hits += len(fetched)
+        self.stats.l2_misses += len(missed) - len(fetched)
+
+        return [
+            fetched.get(key, default) if value is MISSING else value
+            for key, value in zip(keys, values)
+        ]
+
+    async def set(
+        self,
+        key: Hashable,
+        value: Any,
+        **kwargs,
+    ) -> bool:
+        is_set = await self.l2.set(key, value, **kwargs)
+        if not is_set:
+            # e.g. the circuit is open, L1 must not keep what L2 does not
+            await self.l1.delete(key)
+            return is_set
+
+        await self._write_l1(key, value, _get_ttl(kwargs), kwargs.get('tags'))
+        self._publish(key)
+
+        return is_set
+
+    async def set_many(
+        self,
+        mapping: Mapping[Hashable, Any],
+        ttl: Optional[float] = None,
+        ttls: Optional[Mapping[Hashable, float]] = None,
+    ) -> bool:
+        is_set = await self.l2.set_many(mapping, ttl, ttls)
+
+        # keys of a failed batch may be partly written, drop them in L1
+        if is_set and self._write_mode == WRITE_THROUGH:
+            ttls = ttls or {}
+            stored = {
+                key: self.l2.as_stored(key, value)
+                for key, value in mapping.items()
+            }
+            await self._fill_l1(stored, {key: ttls.get(key, ttl) for key in stored})
+        else:
+            await self.l1.delete_many(*mapping)
+
+        self._publish(*mapping)
+        return is_set
+
+    async def expire(
+        self,
+        key: Hashable,
+        ttl: Optional[float] = None
+    ) -> bool:
+        await self.l1.delete(key)
+        self._publish(key)
+        return await self.l2.expire(key, ttl)
+
+    async def exists(self, *keys: Hashable) -> bool:
+        if await self.l1.exists(*keys):
+            return True
+
+        return await self.l2.exists(*keys)
+
+    async def delete(self, key: Hashable) -> bool:
+        await self.l1.delete(key)
+        self._publish(key)
+        return await self.l2.delete(key)
+
+    async def delete_many(self, *keys: Hashable) -> int:
+        await self.l1.delete_many(*keys)
+        self._publish(*keys)
+        return await self.l2.delete_many(*keys)
+
+    async def flush(self) -> None:
+        await self.l1.flush()
+        if self._invalidation_bus is not None:
+            self._invalidation_bus.publish_flush()
+        await self.l2.flush()
+
+    async def invalidate_tags(self, *tags: str) -> int:
+        await self.l1.invalidate_tags(*tags)
+        if self._invalidation_bus is not None:
+            self._invalidation_bus.publish_tags(*tags)
+
+        return await self.l2.invalidate_tags(*tags)
+
+    async def bump_version(self) -> int:
+        version = await self.l2.bump_version()
+        await self.l1.flush()
+        if self._invalidation_bus is not None:
+            self._invalidation_bus.publish_flush()
+
+        return version
+
+    async def clear_namespace(
+        self,
+        batch_size: int = DEFAULT_CLEAR_BATCH,
+    ) -> int:
+        await self.l1.flush()
+        if self._invalidation_bus is not None:
+            self._invalidation_bus.publish_flush()
+
+        return await self.l2.clear_namespace(batch_size)
+
+    async def connect(self) -> None:
+        await self.l2.connect()
+
+    async def warmup(
+        self,
+        keys: Sequence[Hashable] = (),
+        loader: Optional[KeyLoader] = None,
+        ttl: Optional[float] = None,
+    ) -> int:
+        """
+        Warms L2 and copies `keys` found there into L1.
+        """
+
+        loaded = await self.l2.warmup(keys, loader, ttl)
+        if not keys:
+            return loaded
+
+        results = await self.l2.get_many_with_ttl(*keys, default=MISSING)
+        mapping, ttls = {}, {}
+        for key, (value, remaining) in zip(keys, results):
+            if value is not MISSING:
+                mapping[key] = value
+                ttls[key] = remaining
+
+        await self._fill_l1(mapping, ttls)
+
+        return loaded
+
+    async def close(self) -> None:
+        await self._cancel_refreshes()
+        if self._invalidation_bus is not None:
+            await self._invalidation_bus.close()
+        await self.l1.close()
+        await self.l2.close()
+
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        stats.update(
+            l1_hits=self.stats.l1_hits,
+            l1_misses=self.stats.l1_misses,
+            l2_hits=self.stats.l2_hits,
+            l2_misses=self.stats.l2_misses,
+        )
+
+        return stats
+
+    def as_stored(self, key: Hashable, value: Any) -> Any:
+        return self.l2.as_stored(key, value)
+
+    def _publish(self, *keys: Hashable) -> None:
+        if self._invalidation_bus is not None:
+            self._invalidation_bus.publish(*keys)
+
+    async def _write_l1(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float],
+        tags: Optional[Sequence[str]] = None,
+    ) -> None:
+        if self._write_mode == WRITE_THROUGH:
+            await self.l1.set(
+                key,
+                self.l2.as_stored(key, value),
+                ttl=self._get_l1_ttl(ttl),
+                tags=tags,
+            )
+            self._track_l2_ttl(key, ttl)
+        else:
+            await self.l1.delete(key)
+
+    async def _fill_l1(
+        self,
+        mapping: Mapping[Hashable, Any],
+        l2_ttls: Mapping[Hashable, Optional[float]],
+    ) -> None:
+        """
+        Copies `mapping` to L1, `l2_ttls` are TTLs the keys have in L2.
+        """
+
+        if not mapping:
+            return
+
+        await self.l1.set_many(mapping, ttls={
+            key: self._get_l1_ttl(l2_ttls[key]) for key in mapping
+        })
+        for key in mapping:
+            self._track_l2_ttl(key, l2_ttls[key])
+
+    def _track_l2_ttl(self, key: Hashable, ttl: Optional[float]) -> None:
+        deadline = time.monotonic() + ttl if ttl is not None else None
+        self._l2_deadlines.set(key, deadline, ttl=self._get_l1_ttl(ttl))
+
+    def _get_l2_ttl(self, key: Hashable, l1_ttl: Optional[float]) -> Optional[float]:
+        # L1 entries filled behind this backend's back keep their own TTL
+        deadline = self._l2_deadlines.get(key, MISSING)
+        if deadline is MISSING:
+            return l1_ttl
+
+        if deadline is None:
+            return None
+
+        return max(deadline - time.monotonic(), 0.0)
+
+    def _get_l1_ttl(self, ttl: Optional[float]) -> float:
+        if ttl is None:
+            return self._l1_ttl
+
+        return min(ttl, self._l1_ttl)
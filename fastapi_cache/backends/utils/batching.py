@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 512
+
+BatchFetcher = Callable[[List[Hashable]], Awaitable[List[Any]]]
+
+
+class AutoBatcher:
+    """
+    Collects keys requested within one event loop iteration (or within
+    `window` seconds) and resolves all of them with a single `fetch` call.
+    """
+
+    def __init__(
+        self,
+        fetch: BatchFetcher,
+        window: float = 0.0,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ) -> None:
+        self._fetch = fetch
+        self._window = window
+        self._max_batch_size = max_batch_size
+
+        self._pending: Dict[Hashable, List[asyncio.Future]] = {}
+        self._handle: Optional[asyncio.Handle] = None
+        # the loop keeps only weak references to tasks
+        self._tasks: Set[asyncio.Future] = set()
+
+    def load(self, key: Hashable) -> Awaitable[Any]:
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+
+        if len(self._pending) >= self._max_batch_size:
+            self._dispatch()
+        elif self._handle is None:
+            if self._window > 0:
+                self._handle = loop.call_later(self._window, self._dispatch)
+            else:
+                self._handle = loop.call_soon(self._dispatch)
+
+        return future
+
+    def _dispatch(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        pending, self._pending = self._pending, {}
+        if pending:
+            task = asyncio.ensure_future(self._resolve(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._finish)
+
+    def _finish(self, task: asyncio.Future) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error('Batched fetch failed', exc_info=task.exception())
+
+    async def close(self) -> None:
+        """
+        Cancels loads not dispatched yet and waits for fetches in progress.
+        """
+
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+        pending, self._pending = self._pending, {}
+        for futures in pending.values():
+            for future in futures:
+                future.cancel()
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _resolve(
+        self,
+        pending: Dict[Hashable, List[asyncio.Future]],
+    ) -> None:
+        keys = list(pending)
+        try:
+            values = await self._fetch(keys)
+        except asyncio.CancelledError:
+            for futures in pending.values():
+                for future in futures:
+                    future.cancel()
+            raise
+        except Exception as exc:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+
+        for key, value in zip(keys, values):
+            for future in pending[key]:
+                if not future.done():
+                    future.set_result(value)
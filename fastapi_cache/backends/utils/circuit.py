@@ -0,0 +1,63 @@
+import time
+from typing import Callable
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_TIMEOUT = 5.0
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `recovery_timeout` seconds. After that a single trial call is let
+    through per `recovery_timeout`, its success closes the circuit again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_RECOVERY_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._clock = clock
+
+        self._failures = 0
+        self._opened_at = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+
+        if self._clock() - self._opened_at >= self._recovery_timeout:
+            return HALF_OPEN
+
+        return OPEN
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == HALF_OPEN:
+            # the trial call keeps others out until it reports back
+            # or until the next recovery timeout elapses
+            self._opened_at = self._clock()
+            return True
+
+        return state == CLOSED
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._opened_at is not None or self._failures >= self._failure_threshold:
+            self._opened_at = self._clock()
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from typing import Optional
+
+DEFAULT_RESOLUTION = 0.01
+
+
+class CoarseClock:
+    """
+    Monotonic clock that is refreshed by the event loop every `resolution`
+    seconds, so reading it does not cost a syscall. Until started it falls
+    back to `time.monotonic()`.
+
+    Readings lag behind real time by up to `resolution`. Deadlines are
+    computed from a lagging reading as well, so entries may expire up to
+    `resolution` early or late.
+
+    The clock stops with the loop that refreshes it and falls back to
+    `time.monotonic()` once that loop is closed.
+    """
+
+    def __init__(self, resolution: float = DEFAULT_RESOLUTION) -> None:
+        self._resolution = resolution
+        self._now = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def __call__(self) -> float:
+        if not self.is_running:
+            return time.monotonic()
+
+        return self._now
+
+    @property
+    def is_running(self) -> bool:
+        return (
+            self._handle is not None
+            and not self._handle.cancelled()
+            and not self._loop.is_closed()
+        )
+
+    def start(self) -> None:
+        if not self.is_running:
+            self._loop = asyncio.get_event_loop()
+            self._tick()
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+            self._loop = None
+
+    def _tick(self) -> None:
+        self._now = time.monotonic()
+        self._handle = self._loop.call_later(self._resolution, self._tick)
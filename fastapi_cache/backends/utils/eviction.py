@@ -0,0 +1,286 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Type, Union
+
+
+class BaseEvictionPolicy:
+    """
+    Tracks key usage for a bounded TTLDict and decides which
+    key should be dropped when the dict grows over its limits.
+    """
+
+    def insert(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def access(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def remove(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def evict(self) -> Optional[Hashable]:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LRUEvictionPolicy(BaseEvictionPolicy):
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        self._order = OrderedDict()
+
+    def insert(self, key: Hashable) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def access(self, key: Hashable) -> None:
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def remove(self, key: Hashable) -> None:
+        self._order.pop(key, None)
+
+    def evict(self) -> Optional[Hashable]:
+        if not self._order:
+            return None
+
+        key, _ = self._order.popitem(last=False)
+        return key
+
+    def clear(self) -> None:
+        self._order.clear()
+
+
+class LFUEvictionPolicy(BaseEvictionPolicy):
+    """
+    Constant time LFU, keys with equal frequency are evicted in LRU order.
+    """
+
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        self._freqs: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, OrderedDict] = {}
+        self._min_freq = 0
+
+    def insert(self, key: Hashable) -> None:
+        if key in self._freqs:
+            self.access(key)
+            return
+
+        self._freqs[key] = 1
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_freq = 1
+
+    def access(self, key: Hashable) -> None:
+        freq = self._freqs.get(key)
+        if freq is None:
+            return
+
+        self._unlink(key, freq)
+        self._freqs[key] = freq + 1
+        self._buckets.setdefault(freq + 1, OrderedDict())[key] = None
+
+        if self._min_freq == freq and freq not in self._buckets:
+            self._min_freq = freq + 1
+
+    def remove(self, key: Hashable) -> None:
+        freq = self._freqs.pop(key, None)
+        if freq is not None:
+            self._unlink(key, freq)
+
+    def evict(self) -> Optional[Hashable]:
+        if not self._freqs:
+            return None
+
+        if self._min_freq not in self._buckets:
+            self._min_freq = min(self._buckets)
+
+        bucket = self._buckets[self._min_freq]
+        key, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self._buckets[self._min_freq]
+
+        del self._freqs[key]
+        return key
+
+    def clear(self) -> None:
+        self._freqs.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+    def _unlink(self, key: Hashable, freq: int) -> None:
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+
+
+class CountMinSketch:
+    """
+    Approximate frequency counter with periodic aging,
+    used by TinyLFU to estimate key popularity.
+    """
+
+    SEEDS = (0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F)
+    MAX_COUNT = 15
+
+    def __init__(self, capacity: int) -> None:
+        width = 16
+        while width < capacity:
+            width <<= 1
+
+        self._mask = width - 1
+        self._table: List[List[int]] = [[0] * width for _ in self.SEEDS]
+        self._sample_size = 10 * max(capacity, 1)
+        self._additions = 0
+
+    def increment(self, key: Hashable) -> None:
+        hashed = hash(key)
+        for row, seed in zip(self._table, self.SEEDS):
+            index = ((hashed * seed) >> 7) & self._mask
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._reset()
+
+    def frequency(self, key: Hashable) -> int:
+        hashed = hash(key)
+        return min(
+            row[((hashed * seed) >> 7) & self._mask]
+            for row, seed in zip(self._table, self.SEEDS)
+        )
+
+    def clear(self) -> None:
+        for row in self._table:
+            row[:] = [0] * len(row)
+        self._additions = 0
+
+    def _reset(self) -> None:
+        for row in self._table:
+            row[:] = [count >> 1 for count in row]
+        self._additions //= 2
+
+
+class TinyLFUEvictionPolicy(BaseEvictionPolicy):
+    """
+    W-TinyLFU: a small LRU admission window in front of a segmented
+    LRU main area. Keys leaving the window have to beat the main area
+    victim by estimated frequency to be admitted.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        window_ratio: float = 0.01,
+        protected_ratio: float = 0.8,
+    ) -> None:
+        if not capacity:
+            raise ValueError('TinyLFU eviction policy requires capacity')
+
+        self._window_capacity = max(1, int(capacity * window_ratio))
+        self._protected_capacity = max(
+            1, int((capacity - self._window_capacity) * protected_ratio)
+        )
+
+        self._sketch = CountMinSketch(capacity)
+        self._window = OrderedDict()
+        self._probation = OrderedDict()
+        self._protected = OrderedDict()
+        self._candidate: Optional[Hashable] = None
+
+    def insert(self, key: Hashable) -> None:
+        self._sketch.increment(key)
+        if self._touch(key):
+            return
+
+        self._window[key] = None
+        if len(self._window) > self._window_capacity:
+            candidate, _ = self._window.popitem(last=False)
+            self._probation[candidate] = None
+            self._candidate = candidate
+
+    def access(self, key: Hashable) -> None:
+        self._sketch.increment(key)
+        self._touch(key)
+
+    def remove(self, key: Hashable) -> None:
+        self._window.pop(key, None)
+        self._probation.pop(key, None)
+        self._protected.pop(key, None)
+        if self._candidate == key:
+            self._candidate = None
+
+    def evict(self) -> Optional[Hashable]:
+        candidate, self._candidate = self._candidate, None
+        victim = self._main_victim(exclude=candidate)
+
+        if victim is None:
+            if candidate is not None and candidate in self._probation:
+                victim = candidate
+            elif self._window:
+                victim = next(iter(self._window))
+            else:
+                return None
+        elif candidate is not None and candidate in self._probation:
+            freq_candidate = self._sketch.frequency(candidate)
+            if freq_candidate <= self._sketch.frequency(victim):
+                victim = candidate
+
+        self.remove(victim)
+        return victim
+
+    def clear(self) -> None:
+        self._sketch.clear()
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+        self._candidate = None
+
+    def _main_victim(
+        self,
+        exclude: Optional[Hashable] = None
+    ) -> Optional[Hashable]:
+        for segment in (self._probation, self._protected):
+            for key in segment:
+                if key != exclude:
+                    return key
+
+        return None
+
+    def _touch(self, key: Hashable) -> bool:
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+        elif key in self._probation:
+            del self._probation[key]
+            self._protected[key] = None
+            if len(self._protected) > self._protected_capacity:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+        else:
+            return False
+
+        return True
+
+
+EVICTION_POLICIES: Dict[str, Type[BaseEvictionPolicy]] = {
+    'lru': LRUEvictionPolicy,
+    'lfu': LFUEvictionPolicy,
+    'tinylfu': TinyLFUEvictionPolicy,
+}
+
+EvictionPolicy = Union[str, BaseEvictionPolicy]
+
+
+def get_eviction_policy(
+    policy: EvictionPolicy,
+    capacity: Optional[int] = None,
+) -> BaseEvictionPolicy:
+    if isinstance(policy, BaseEvictionPolicy):
+        return policy
+
+    if policy not in EVICTION_POLICIES:
+        raise ValueError('Unknown eviction policy: {}'.format(policy))
+
+    return EVICTION_POLICIES[policy](capacity)
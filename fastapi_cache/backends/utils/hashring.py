@@ -0,0 +1,75 @@
+import bisect
+import hashlib
+from typing import Dict, Hashable, List, Set
+
+DEFAULT_VIRTUAL_NODES = 160
+
+
+def key_to_bytes(key: Hashable) -> bytes:
+    # built-in hash() is salted per process, so keys are hashed by value
+    if isinstance(key, bytes):
+        return key
+
+    if isinstance(key, str):
+        return key.encode('utf-8')
+
+    return repr(key).encode('utf-8')
+
+
+def _hash(data: bytes) -> int:
+    return int.from_bytes(hashlib.md5(data).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    Consistent hash ring, every node owns `virtual_nodes` points on it
+    and a key belongs to the node of the first point at or after its
+    hash. Adding or removing a node only remaps keys of that node.
+    """
+
+    def __init__(self, virtual_nodes: int = DEFAULT_VIRTUAL_NODES) -> None:
+        if virtual_nodes < 1:
+            raise ValueError('virtual_nodes must be positive')
+
+        self._virtual_nodes = virtual_nodes
+        self._nodes: Set[str] = set()
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def add(self, node: str) -> None:
+        if node in self._nodes:
+            raise NameError('Node with the same name already added')
+
+        self._nodes.add(node)
+
+        for replica in range(self._virtual_nodes):
+            point = _hash('{}#{}'.format(node, replica).encode('utf-8'))
+            # on the rare collision the earlier node keeps the point
+            if point not in self._owners:
+                self._owners[point] = node
+                bisect.insort(self._points, point)
+
+    def remove(self, node: str) -> None:
+        if node not in self._nodes:
+            raise NameError('Node with the same name not added')
+
+        self._nodes.remove(node)
+        self._owners = {
+            point: owner
+            for point, owner in self._owners.items()
+            if owner != node
+        }
+        self._points = sorted(self._owners)
+
+    def get(self, key: Hashable) -> str:
+        if not self._points:
+            raise LookupError('Hash ring is empty')
+
+        index = bisect.bisect_left(self._points, _hash(key_to_bytes(key)))
+        if index == len(self._points):
+            index = 0
+
+        return self._owners[self._points[index]]
@@ -0,0 +1,158 @@
+import hashlib
+from typing import Any, Dict, Optional, Sequence
+
+from redis.asyncio import Redis
+from redis.exceptions import NoScriptError
+
+
+def _decode_reply(reply: Any, encoding: Optional[str]) -> Any:
+    if encoding is None:
+        return reply
+
+    if isinstance(reply, bytes):
+        return reply.decode(encoding)
+
+    if isinstance(reply, list):
+        return [_decode_reply(item, encoding) for item in reply]
+
+    return reply
+
+
+class RedisScript:
+    """
+    Lua script executed with EVALSHA, the script is (re)loaded with
+    SCRIPT LOAD when Redis replies with NOSCRIPT, e.g. after restart.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.sha = hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    async def __call__(
+        self,
+        client: Redis,
+        keys: Sequence[Any] = (),
+        args: Sequence[Any] = (),
+        encoding: Optional[str] = None,
+    ) -> Any:
+        try:
+            return await self._evalsha(client, keys, args, encoding)
+        except NoScriptError:
+            await self.load(client)
+
+        return await self._evalsha(client, keys, args, encoding)
+
+    async def load(self, client: Redis) -> None:
+        await client.script_load(self.source)
+
+    async def _evalsha(
+        self,
+        client: Redis,
+        keys: Sequence[Any],
+        args: Sequence[Any],
+        encoding: Optional[str],
+    ) -> Any:
+        reply = await client.evalsha(self.sha, len(keys), *keys, *args)
+        return _decode_reply(reply, encoding)
+
+
+class ScriptRegistry:
+    def __init__(self) -> None:
+        self._scripts: Dict[str, RedisScript] = {}
+
+    def register(self, name: str, source: str) -> RedisScript:
+        if name in self._scripts:
+            raise NameError('Script with the same name already registered')
+
+        script = self._scripts[name] = RedisScript(source)
+        return script
+
+    def get(self, name: str) -> RedisScript:
+        return self._scripts[name]
+
+    async def load(self, client: Redis) -> None:
+        for script in self._scripts.values():
+            await script.load(client)
+
+
+scripts = ScriptRegistry()
+
+RELEASE_LOCK = scripts.register('release_lock', """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+""")
+
+COMPARE_AND_SET = scripts.register('compare_and_set', """
+if redis.call("GET", KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if tonumber(ARGV[3]) > 0 then
+    redis.call("SET", KEYS[1], ARGV[2], "PX", ARGV[3])
+else
+    redis.call("SET", KEYS[1], ARGV[2], "KEEPTTL")
+end
+return 1
+""")
+
+GET_AND_TOUCH = scripts.register('get_and_touch', """
+local value = redis.call("GET", KEYS[1])
+if value then
+    redis.call("PEXPIRE", KEYS[1], ARGV[1])
+end
+return value
+""")
+
+INCR_WITH_TTL = scripts.register('incr_with_ttl', """
+local value = redis.call("INCRBY", KEYS[1], ARGV[1])
+if tonumber(ARGV[2]) > 0 and redis.call("PTTL", KEYS[1]) == -1 then
+    redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return value
+""")
+
+SET_WITH_TAGS = scripts.register('set_with_tags', """
+local pttl = tonumber(ARGV[2])
+local arguments = {KEYS[1], ARGV[1]}
+if pttl > 0 then
+    table.insert(arguments, "PX")
+    table.insert(arguments, pttl)
+end
+if ARGV[3] == "1" then
+    table.insert(arguments, "NX")
+end
+if not redis.call("SET", unpack(arguments)) then
+    return 0
+end
+for i = 2, #KEYS do
+    local tag_pttl = redis.call("PTTL", KEYS[i])
+    redis.call("SADD", KEYS[i], KEYS[1])
+    if pttl == 0 then
+        if tag_pttl >= 0 then
+            redis.call("PERSIST", KEYS[i])
+        end
+    elseif tag_pttl == -2 or (tag_pttl >= 0 and tag_pttl < pttl) then
+        redis.call("PEXPIRE", KEYS[i], pttl)
+    end
+end
+return 1
+""")
+
+INVALIDATE_TAGS = scripts.register('invalidate_tags', """
+local removed = 0
+for i = 1, #KEYS do
+    local keys = redis.call("SMEMBERS", KEYS[i])
+    for j = 1, #keys, 1000 do
+        removed = removed + redis.call(
+            "DEL", unpack(keys, j, math.min(j + 999, #keys))
+        )
+    end
+    redis.call("DEL", KEYS[i])
+end
+return removed
+""")
+
+GET_WITH_PTTL = scripts.register('get_with_pttl', """
+return {redis.call("GET", KEYS[1]), redis.call("PTTL", KEYS[1])}
+""")
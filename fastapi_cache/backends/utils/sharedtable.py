@@ -0,0 +1,393 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+MAGIC = b'FCSHT001'
+# magic, slot count, slot size, epoch
+HEADER = struct.Struct('<8sIIQ')
+EPOCH_OFFSET = 16
+# namespace versions, namespaces sharing a counter are invalidated together
+VERSIONS_OFFSET = 64
+VERSION_COUNTERS = 64
+HEADER_SIZE = VERSIONS_OFFSET + VERSION_COUNTERS * 8
+# sequence, key hash, epoch, expires at, stored at, key length, value length
+SLOT_HEADER = struct.Struct('<QQQddII')
+COUNTER = struct.Struct('<Q')
+
+DEFAULT_SLOTS = 16384
+DEFAULT_SLOT_SIZE = 1024
+DEFAULT_MAX_PROBES = 8
+MAX_READ_ATTEMPTS = 100
+
+EMPTY = 0
+
+
+def _hash(key: bytes) -> int:
+    key_hash = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+    return key_hash or 1
+
+
+class SharedTable:
+    """
+    Fixed-slot hash table in a file mapped by every process that opens
+    `path`. A key lives in one of `max_probes` slots following its hash,
+    when all of them are taken the entry stored longest ago is evicted.
+
+    Readers take no lock. Every slot carries a sequence number that
+    writers make odd while they change the slot, readers retry when it
+    was odd or changed during the read (seqlock). Writers of all processes
+    are serialized with flock. Expiration times come from `clock`, the
+    default monotonic clock is the same for all processes of a host.
+
+    A process opens its own mapping on first use and again after fork,
+    flock does not exclude processes sharing an inherited descriptor.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        slots: int = DEFAULT_SLOTS,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        max_probes: int = DEFAULT_MAX_PROBES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if fcntl is None:
+            raise ImportError('SharedTable requires fcntl, available on Unix only')
+
+        if slots < 1 or max_probes < 1:
+            raise ValueError('slots and max_probes must be positive')
+
+        if slot_size <= SLOT_HEADER.size:
+            raise ValueError('slot_size must exceed {} bytes'.format(
+                SLOT_HEADER.size,
+            ))
+
+        self._path = path
+        self._slots = slots
+        self._slot_size = slot_size
+        self._max_probes = min(max_probes, slots)
+        self._clock = clock
+
+        self._fd: Optional[int] = None
+        self._segment: Optional[mmap.mmap] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.evictions = 0
+
+    @property
+    def capacity(self) -> int:
+        """
+        Bytes available for key and value of a single entry.
+        """
+
+        return self._slot_size - SLOT_HEADER.size
+
+    @property
+    def slots(self) -> int:
+        return self._slots
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        return self.get_with_ttl(key)[0]
+
+    def get_with_ttl(self, key: bytes) -> Tuple[Optional[bytes], Optional[float]]:
+        segment = self._open()
+        epoch = COUNTER.unpack_from(segment, EPOCH_OFFSET)[0]
+        key_hash = _hash(key)
+
+        for offset in self._probe(key_hash):
+            entry = self._read(segment, offset, key_hash, epoch)
+            if entry is None or entry[1] != key:
+                continue
+
+            expires_at, _, value = entry
+            if expires_at == math.inf:
+                return value, None
+
+            remaining = expires_at - self._clock()
+            if remaining <= 0:
+                return None, None
+
+            return value, remaining
+
+        return None, None
+
+    def set(self, key: bytes, value: bytes, ttl: Optional[float] = None) -> bool:
+        if len(key) + len(value) > self.capacity:
+            # the previous value must not outlive a failed update
+            self.delete(key)
+            return False
+
+        with self._locked() as segment:
+            existing, free, oldest = self._scan(segment, key)
+            offset = existing if existing is not None else free
+            if offset is None:
+                offset = oldest
+                self.evictions += 1
+
+            self._write(segment, offset, key, value, self._get_expires_at(ttl))
+
+        return True
+
+    def add(self, key: bytes, value: bytes, ttl: Optional[float] = None) -> bool:
+        if len(key) + len(value) > self.capacity:
+            return False
+
+        with self._locked() as segment:
+            existing, free, oldest = self._scan(segment, key)
+            if existing is not None:
+                return False
+
+            offset = free
+            if offset is None:
+                offset = oldest
+                self.evictions += 1
+
+            self._write(segment, offset, key, value, self._get_expires_at(ttl))
+
+        return True
+
+    def expire(self, key: bytes, ttl: Optional[float] = None) -> bool:
+        with self._locked() as segment:
+            offset = self._scan(segment, key)[0]
+            if offset is None:
+                return False
+
+            _, _, _, _, _, key_length, value_length = SLOT_HEADER.unpack_from(
+                segment, offset,
+            )
+            start = offset + SLOT_HEADER.size + key_length
+            value = segment[start:start + value_length]
+            self._write(segment, offset, key, value, self._get_expires_at(ttl))
+
+        return True
+
+    def delete(self, key: bytes) -> bool:
+        with self._locked() as segment:
+            offset = self._scan(segment, key)[0]
+            if offset is None:
+                return False
+
+            self._write(segment, offset, b'', b'', 0.0, key_hash=EMPTY)
+
+        return True
+
+    def keys(self) -> List[bytes]:
+        """
+        Keys of live entries, a snapshot that concurrent writes may change.
+        """
+
+        segment = self._open()
+        epoch = COUNTER.unpack_from(segment, EPOCH_OFFSET)[0]
+        now = self._clock()
+
+        keys = []
+        for index in range(self._slots):
+            offset = HEADER_SIZE + index * self._slot_size
+            entry = self._read(segment, offset, None, epoch)
+            if entry is not None and entry[0] > now:
+                keys.append(entry[1])
+
+        return keys
+
+    def flush(self) -> None:
+        # entries of older epochs are treated as free slots
+        with self._locked() as segment:
+            epoch = COUNTER.unpack_from(segment, EPOCH_OFFSET)[0]
+            COUNTER.pack_into(segment, EPOCH_OFFSET, epoch + 1)
+
+    def get_version(self, namespace: bytes) -> int:
+        return COUNTER.unpack_from(self._open(), self._version_offset(namespace))[0]
+
+    def bump_version(self, namespace: bytes) -> int:
+        offset = self._version_offset(namespace)
+        with self._locked() as segment:
+            version = COUNTER.unpack_from(segment, offset)[0] + 1
+            COUNTER.pack_into(segment, offset, version)
+
+        return version
+
+    def close(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            os.close(self._fd)
+
+        self._segment = self._fd = self._pid = None
+
+    def _open(self) -> mmap.mmap:
+        if self._pid == os.getpid():
+            return self._segment
+
+        # mapping and descriptor inherited over fork are dropped
+        self.close()
+
+        size = HEADER_SIZE + self._slots * self._slot_size
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size == 0:
+                    os.ftruncate(fd, size)
+                    os.pwrite(fd, HEADER.pack(
+                        MAGIC, self._slots, self._slot_size, 0,
+                    ), 0)
+
+                segment = mmap.mmap(fd, 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+            magic, slots, slot_size, _ = HEADER.unpack_from(segment)
+            if (magic, slots, slot_size) != (MAGIC, self._slots, self._slot_size):
+                segment.close()
+                raise ValueError(
+                    '{} is not a table of {} slots of {} bytes'.format(
+                        self._path, self._slots, self._slot_size,
+                    )
+                )
+        except BaseException:
+            os.close(fd)
+            raise
+
+        self._fd, self._segment, self._pid = fd, segment, os.getpid()
+
+        return segment
+
+    @contextmanager
+    def _locked(self) -> Iterator[mmap.mmap]:
+        segment = self._open()
+        # flock only excludes other processes, threads take the lock
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield segment
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _version_offset(namespace: bytes) -> int:
+        return VERSIONS_OFFSET + _hash(namespace) % VERSION_COUNTERS * COUNTER.size
+
+    def _probe(self, key_hash: int) -> Iterator[int]:
+        start = key_hash % self._slots
+        for step in range(self._max_probes):
+            yield HEADER_SIZE + (start + step) % self._slots * self._slot_size
+
+    def _read(
+        self,
+        segment: mmap.mmap,
+        offset: int,
+        key_hash: Optional[int],
+        epoch: int,
+    ) -> Optional[Tuple[float, bytes, bytes]]:
+        """
+        Consistent copy of expiration, key and value of the entry at
+        `offset`, None when it is empty, stale, of another `key_hash`
+        or kept being rewritten.
+        """
+
+        for _ in range(MAX_READ_ATTEMPTS):
+            (
+                sequence, slot_hash, slot_epoch, expires_at, _,
+                key_length, value_length,
+            ) = SLOT_HEADER.unpack_from(segment, offset)
+            if sequence & 1:
+                continue
+
+            if slot_hash == EMPTY or slot_epoch != epoch or (
+                key_hash is not None and slot_hash != key_hash
+            ):
+                return None
+
+            start = offset + SLOT_HEADER.size
+            data = segment[start:start + key_length + value_length]
+            if COUNTER.unpack_from(segment, offset)[0] != sequence:
+                continue
+
+            return expires_at, data[:key_length], data[key_length:]
+
+        return None
+
+    def _scan(
+        self,
+        segment: mmap.mmap,
+        key: bytes,
+    ) -> Tuple[Optional[int], Optional[int], int]:
+        """
+        Offsets of the live entry of `key`, of the first free slot and of
+        the entry stored longest ago among slots `key` may use. Called
+        with the lock held.
+        """
+
+        epoch = COUNTER.unpack_from(segment, EPOCH_OFFSET)[0]
+        key_hash = _hash(key)
+        now = self._clock()
+
+        free = oldest = None
+        oldest_stored_at = math.inf
+        for offset in self._probe(key_hash):
+            (
+                _, slot_hash, slot_epoch, expires_at, stored_at, key_length, _,
+            ) = SLOT_HEADER.unpack_from(segment, offset)
+            if slot_hash == EMPTY or slot_epoch != epoch or expires_at <= now:
+                if free is None:
+                    free = offset
+                continue
+
+            start = offset + SLOT_HEADER.size
+            if slot_hash == key_hash and segment[start:start + key_length] == key:
+                return offset, free, offset
+
+            if stored_at < oldest_stored_at:
+                oldest, oldest_stored_at = offset, stored_at
+
+        return None, free, oldest
+
+    def _write(
+        self,
+        segment: mmap.mmap,
+        offset: int,
+        key: bytes,
+        value: bytes,
+        expires_at: float,
+        key_hash: Optional[int] = None,
+    ) -> None:
+        # an odd sequence left by a writer that died mid-write is skipped
+        sequence = COUNTER.unpack_from(segment, offset)[0]
+        sequence += 2 if sequence & 1 else 1
+        COUNTER.pack_into(segment, offset, sequence)
+
+        SLOT_HEADER.pack_into(
+            segment,
+            offset,
+            sequence,
+            _hash(key) if key_hash is None else key_hash,
+            COUNTER.unpack_from(segment, EPOCH_OFFSET)[0],
+            expires_at,
+            self._clock(),
+            len(key),
+            len(value),
+        )
+        start = offset + SLOT_HEADER.size
+        segment[start:start + len(key) + len(value)] = key + value
+
+        COUNTER.pack_into(segment, offset, sequence + 1)
+
+    def _get_expires_at(self, ttl: Optional[float]) -> float:
+        if ttl is None:
+            return math.inf
+
+        return self._clock() + ttl
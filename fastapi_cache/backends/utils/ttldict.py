@@ -1,44 +1,205 @@
+import heapq
+import itertools
+import logging
+import sys
 import time
-from typing import Any, Hashable, Optional, Union
+from typing import (
+    Any, Callable, Hashable, Iterable, List, Mapping, Optional, Tuple, Union
+)
+
+from .eviction import EvictionPolicy, get_eviction_policy
+
+logger = logging.getLogger(__name__)
+
+Tracer = Callable[[str, Hashable], None]
+
+
+def logging_tracer(operation: str, key: Hashable) -> None:
+    logger.debug('%s %r', operation, key)
+
+
+class TTLDictStats:
+    __slots__ = ('hits', 'misses', 'evictions', 'expirations')
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
 
 
 class TTLDict:
-    def __init__(self):
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        eviction_policy: EvictionPolicy = 'lru',
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+        tracer: Optional[Tracer] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self._base = dict()
+        self._tracer = tracer
+        self._clock = clock
+
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._sizes = {}
+        self._total_bytes = 0
+
+        self._policy = None
+        if max_entries is not None or max_bytes is not None:
+            self._policy = get_eviction_policy(eviction_policy, max_entries)
+
+        self._expiry_heap = []
+        self._expiry_counter = itertools.count()
+
+        # tag -> keys and key -> tags, both cleaned whenever a key is removed
+        self._tags = {}
+        self._key_tags = {}
+
+        self.stats = TTLDictStats()
+
+    def __len__(self) -> int:
+        return len(self._base)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
 
-    def set(self, key: Hashable, value: Any, *, ttl: Optional[int] = None) -> bool:
+    def keys(self) -> List[Hashable]:
+        return list(self._base)
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        *,
+        ttl: Optional[float] = None,
+        pttl: Optional[int] = None,
+        tags: Optional[Iterable[Hashable]] = None,
+    ) -> bool:
+        timestamp = self._get_ttl_timestamp(ttl, pttl)
         try:
-            self._base[key] = (
-                self._get_ttl_timestamp(ttl), value
-            )
-            print(self._base)
+            self._base[key] = (timestamp, value)
         except Exception:
             return False
 
+        if self._tracer is not None:
+            self._tracer('set', key)
+
+        self._untag(key)
+        if tags:
+            self._tag(key, tags)
+
+        if timestamp is not None:
+            self._schedule_expiry(key, timestamp)
+
+        if self._policy is not None:
+            self._policy.insert(key)
+            if self._max_bytes is not None:
+                self._track_size(key, value)
+            self._enforce_bounds()
+
+            return key in self._base
+
         return True
 
-    def add(self, key: Hashable, value: Any, *, ttl: Optional[int] = None) -> bool:
+    def add(
+        self,
+        key: Hashable,
+        value: Any,
+        *,
+        ttl: Optional[float] = None,
+        pttl: Optional[int] = None,
+        tags: Optional[Iterable[Hashable]] = None,
+    ) -> bool:
         if key in self._base:
             return False
 
-        return self.set(key, value, ttl=ttl)
+        return self.set(key, value, ttl=ttl, pttl=pttl, tags=tags)
 
     def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
         ttl, value = self._base.get(key, (None, default))
-        print(self._base)
         if ttl is not None and self._is_ttl_expired(ttl):
-            self.delete(key)
+            self._expire_key(key)
+            self.stats.misses += 1
             return default
 
+        if key in self._base:
+            self.stats.hits += 1
+            if self._policy is not None:
+                self._policy.access(key)
+            if self._tracer is not None:
+                self._tracer('hit', key)
+        else:
+            self.stats.misses += 1
+            if self._tracer is not None:
+                self._tracer('miss', key)
+
         return value
 
+    def get_many(
+        self,
+        keys: Iterable[Hashable],
+        default: Optional[Any] = None,
+    ) -> List[Any]:
+        return [self.get(key, default) for key in keys]
+
+    def set_many(
+        self,
+        mapping: Mapping[Hashable, Any],
+        ttl: Optional[float] = None,
+        ttls: Optional[Mapping[Hashable, float]] = None,
+    ) -> bool:
+        ttls = ttls or {}
+        results = [
+            self.set(key, value, ttl=ttls.get(key, ttl))
+            for key, value in mapping.items()
+        ]
+
+        return all(results)
+
+    def delete_many(self, keys: Iterable[Hashable]) -> int:
+        return sum(self.delete(key) for key in keys)
+
+    def get_with_ttl(
+        self,
+        key: Hashable,
+        default: Optional[Any] = None,
+    ) -> Tuple[Any, Optional[float]]:
+        value = self.get(key, default)
+        if key not in self._base:
+            return default, None
+
+        timestamp, _ = self._base[key]
+        if timestamp is None:
+            return value, None
+
+        return value, max(timestamp - self._clock(), 0.0)
+
     def delete(self, key: Hashable) -> bool:
         if key not in self._base:
             return False
 
-        del self._base[key]
+        self._remove(key)
+        if self._tracer is not None:
+            self._tracer('delete', key)
         return True
 
+    def invalidate_tags(self, *tags: Hashable) -> int:
+        keys = set()
+        for tag in tags:
+            keys.update(self._tags.get(tag, ()))
+
+        return sum(self.delete(key) for key in keys)
+
     def exists(self, *keys: Hashable) -> bool:
         hits = []
         for key in keys:
@@ -48,6 +209,7 @@ class TTLDict:
 
             ttl, value = self._base.get(key, (None, None))
             if ttl is not None and self._is_ttl_expired(ttl):
+                self._expire_key(key)
                 hits.append(False)
             else:
                 hits.append(True)
@@ -57,26 +219,134 @@ class TTLDict:
     def expire(
         self,
         key: Hashable,
-        ttl: int
+        ttl: Optional[float] = None,
+        *,
+        pttl: Optional[int] = None,
     ) -> bool:
         if key in self._base:
             _, value = self._base.get(key)
-            self._base[key] = (
-                self._get_ttl_timestamp(ttl),
-                value
-            )
+            timestamp = self._get_ttl_timestamp(ttl, pttl)
+            self._base[key] = (timestamp, value)
+            if timestamp is not None:
+                self._schedule_expiry(key, timestamp)
             return True
 
         return False
 
+    def sweep(self, limit: Optional[int] = None) -> int:
+        """
+        Removes expired keys in deadline order and returns how many were
+        removed. At most `limit` index entries are processed per call,
+        so a sweep over a large dict can be split into short slices.
+        """
+
+        removed = 0
+        processed = 0
+        heap = self._expiry_heap
+        now = self._clock()
+
+        while heap and (limit is None or processed < limit):
+            timestamp, _, key = heap[0]
+            if timestamp > now:
+                break
+
+            heapq.heappop(heap)
+            processed += 1
+
+            entry = self._base.get(key)
+            if entry is not None and entry[0] == timestamp:
+                self._expire_key(key)
+                removed += 1
+
+        return removed
+
     def flush(self) -> None:
         self._base.clear()
+        self._expiry_heap.clear()
+        self._sizes.clear()
+        self._total_bytes = 0
+        self._tags.clear()
+        self._key_tags.clear()
+        if self._policy is not None:
+            self._policy.clear()
+
+    def _remove(self, key: Hashable) -> None:
+        del self._base[key]
+        self._untag(key)
+        if self._policy is not None:
+            self._policy.remove(key)
+            self._total_bytes -= self._sizes.pop(key, 0)
+
+    def _expire_key(self, key: Hashable) -> None:
+        self._remove(key)
+        self.stats.expirations += 1
+        if self._tracer is not None:
+            self._tracer('expire', key)
+
+    def _tag(self, key: Hashable, tags: Iterable[Hashable]) -> None:
+        tags = self._key_tags[key] = tuple(tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+    def _untag(self, key: Hashable) -> None:
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+    def _schedule_expiry(self, key: Hashable, timestamp: float) -> None:
+        # Rewritten keys leave stale index entries behind, rebuild
+        # the heap once they start to dominate it.
+        if len(self._expiry_heap) > 2 * len(self._base) + 64:
+            self._expiry_heap = [
+                (entry_timestamp, next(self._expiry_counter), entry_key)
+                for entry_key, (entry_timestamp, _) in self._base.items()
+                if entry_timestamp is not None
+            ]
+            heapq.heapify(self._expiry_heap)
+
+        heapq.heappush(
+            self._expiry_heap,
+            (timestamp, next(self._expiry_counter), key),
+        )
+
+    def _track_size(self, key: Hashable, value: Any) -> None:
+        size = self._sizeof(value)
+        self._total_bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def _enforce_bounds(self) -> None:
+        while self._is_over_bounds():
+            victim = self._policy.evict()
+            if victim is None:
+                break
+
+            del self._base[victim]
+            self._untag(victim)
+            self._total_bytes -= self._sizes.pop(victim, 0)
+            self.stats.evictions += 1
+            if self._tracer is not None:
+                self._tracer('evict', victim)
+
+    def _is_over_bounds(self) -> bool:
+        if self._max_entries is not None and len(self._base) > self._max_entries:
+            return True
+
+        return self._max_bytes is not None and self._total_bytes > self._max_bytes
+
+    def _get_ttl_timestamp(
+        self,
+        ttl: Union[float, None],
+        pttl: Union[int, None] = None,
+    ) -> Union[float, None]:
+        if pttl is not None:
+            ttl = pttl / 1000
 
-    def _get_ttl_timestamp(self, ttl: Union[int, None]) -> Union[int, None]:
         if ttl is None:
             return None
 
-        return int(time.time()) + ttl
+        return self._clock() + ttl
 
-    def _is_ttl_expired(self, timestamp: Union[int, None]) -> bool:
-        return int(time.time()) >= timestamp
+    def _is_ttl_expired(self, timestamp: Union[float, None]) -> bool:
+        return self._clock() >= timestamp
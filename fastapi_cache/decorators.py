@@ -0,0 +1,210 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .dependencies import (
+    KeyBuilder,
+    can_read_cache,
+    can_write_cache,
+    default_key_builder,
+    get_cache,
+)
+
+REQUEST_PARAMETER = '__fastapi_cache_request'
+RESPONSE_PARAMETER = '__fastapi_cache_response'
+
+CACHE_STATUS_HEADER = 'x-cache'
+SKIPPED_HEADERS = frozenset(('content-length', 'set-cookie'))
+# responses varying on these belong to a single user
+PRIVATE_HEADERS = frozenset(('authorization', 'cookie'))
+
+
+def _make_etag(body: bytes) -> str:
+    return '"{}"'.format(hashlib.sha1(body).hexdigest())
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get('if-none-match')
+    if header is None:
+        return False
+
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    return '*' in candidates or etag in candidates or 'W/' + etag in candidates
+
+
+def _encode_result(result: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(result, Response):
+        data = jsonable_encoder(result)
+        body = json.dumps(data, sort_keys=True).encode('utf-8')
+        return {'etag': _make_etag(body), 'data': data}
+
+    body = getattr(result, 'body', None)
+    if result.status_code != 200 or body is None \
+            or 'set-cookie' in result.headers:
+        return None
+
+    return {
+        'etag': _make_etag(body),
+        'status_code': result.status_code,
+        'headers': [
+            [name, value]
+            for name, value in result.headers.items()
+            if name not in SKIPPED_HEADERS
+        ],
+        'body': body.decode('latin-1'),
+    }
+
+
+def _make_cache_headers(
+    ttl: Optional[float],
+    vary: Sequence[str],
+) -> Dict[str, str]:
+    headers = {}
+    if vary:
+        headers['vary'] = ', '.join(vary)
+
+    if ttl is not None:
+        cache_control = 'max-age={}'.format(max(int(ttl), 0))
+        if PRIVATE_HEADERS.intersection(name.lower() for name in vary):
+            cache_control = 'private, ' + cache_control
+        headers['cache-control'] = cache_control
+
+    return headers
+
+
+def _decode_result(entry: Dict[str, Any]) -> Any:
+    if 'data' in entry:
+        return entry['data']
+
+    response = Response(
+        content=entry['body'].encode('latin-1'),
+        status_code=entry['status_code'],
+    )
+    for name, value in entry['headers']:
+        response.headers[name] = value
+
+    return response
+
+
+def _inject_parameters(
+    func: Callable,
+    wrapper: Callable,
+) -> None:
+    signature = inspect.signature(func)
+    parameters = list(signature.parameters.values())
+
+    extra = [
+        inspect.Parameter(
+            REQUEST_PARAMETER,
+            inspect.Parameter.KEYWORD_ONLY,
+            annotation=Request,
+        ),
+        inspect.Parameter(
+            RESPONSE_PARAMETER,
+            inspect.Parameter.KEYWORD_ONLY,
+            annotation=Response,
+        ),
+    ]
+
+    if parameters and parameters[-1].kind is inspect.Parameter.VAR_KEYWORD:
+        parameters[-1:-1] = extra
+    else:
+        parameters.extend(extra)
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)
+
+
+def cached(
+    cache: str,
+    ttl: Optional[float] = None,
+    key_builder: Optional[KeyBuilder] = None,
+    vary: Sequence[str] = (),
+) -> Callable:
+    """
+    Caches endpoint responses in registered cache backend:
+
+        @app.get('/')
+        @cached(cache=CACHE_KEY, ttl=60)
+        async def index():
+            ...
+
+    Only GET and HEAD requests are cached. Responses carry an ETag,
+    `If-None-Match` is answered with 304, and request `Cache-Control`
+    directives `no-cache` / `no-store` bypass reading / using the cache.
+
+    Responses list `vary` headers in `Vary` and get `max-age` of the time
+    left until the entry expires. Responses varying on `Authorization` or
+    `Cookie` are marked `private`, so shared caches do not store them.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            request: Request = kwargs.pop(REQUEST_PARAMETER)
+            response: Response = kwargs.pop(RESPONSE_PARAMETER)
+
+            async def call_endpoint() -> Any:
+                if asyncio.iscoroutinefunction(func):
+                    return await func(*args, **kwargs)
+
+                return await run_in_threadpool(func, *args, **kwargs)
+
+            if not can_write_cache(request):
+                return await call_endpoint()
+
+            backend = get_cache(cache)
+            if key_builder is not None:
+                key = key_builder(request)
+            else:
+                key = default_key_builder(request, vary)
+
+            entry = None
+            remaining = ttl
+            if can_read_cache(request):
+                cached_value, cached_ttl = await backend.get_with_ttl(key)
+                if cached_value is not None:
+                    entry = json.loads(cached_value)
+                    remaining = cached_ttl
+
+            if entry is not None:
+                cache_status = 'HIT'
+                result = _decode_result(entry)
+            else:
+                cache_status = 'MISS'
+                result = await call_endpoint()
+                entry = _encode_result(result)
+                if entry is None:
+                    return result
+
+                await backend.set(key, json.dumps(entry), ttl=ttl)
+
+            headers = {
+                'etag': entry['etag'],
+                CACHE_STATUS_HEADER: cache_status,
+                **_make_cache_headers(remaining, vary),
+            }
+
+            if _etag_matches(request, entry['etag']):
+                return Response(status_code=304, headers=headers)
+
+            target = result if isinstance(result, Response) else response
+            if 'vary' in headers and 'vary' in target.headers:
+                headers['vary'] = '{}, {}'.format(
+                    target.headers['vary'], headers['vary'],
+                )
+            target.headers.update(headers)
+
+            return result
+
+        _inject_parameters(func, wrapper)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,137 @@
+import hashlib
+import json
+from typing import Any, Callable, Optional, Sequence
+
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+
+from .backends.base import BaseCacheBackend
+from .registry import CacheRegistry
+
+CACHEABLE_METHODS = frozenset(('GET', 'HEAD'))
+KEY_PREFIX = 'fastapi_cache'
+
+KeyBuilder = Callable[[Request], str]
+
+
+def default_key_builder(request: Request, vary: Sequence[str] = ()) -> str:
+    parts = [
+        request.method if request.method != 'HEAD' else 'GET',
+        request.url.path,
+        '&'.join(
+            '{}={}'.format(name, value)
+            for name, value in sorted(request.query_params.multi_items())
+        ),
+    ]
+    parts.extend(
+        '{}:{}'.format(header.lower(), request.headers.get(header, ''))
+        for header in vary
+    )
+
+    digest = hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+    return '{}:{}'.format(KEY_PREFIX, digest)
+
+
+def get_cache(name: str) -> BaseCacheBackend:
+    cache = CacheRegistry.get(name)
+    if cache is None:
+        raise NameError('Cache {} not registered'.format(name))
+
+    return cache
+
+
+def cache_control(request: Request) -> Sequence[str]:
+    header = request.headers.get('cache-control', '')
+    return [
+        directive.strip().lower()
+        for directive in header.split(',')
+        if directive.strip()
+    ]
+
+
+def can_read_cache(request: Request) -> bool:
+    if request.method not in CACHEABLE_METHODS:
+        return False
+
+    directives = cache_control(request)
+    return not any(
+        directive in ('no-cache', 'no-store', 'max-age=0')
+        for directive in directives
+    )
+
+
+def can_write_cache(request: Request) -> bool:
+    if request.method not in CACHEABLE_METHODS:
+        return False
+
+    return 'no-store' not in cache_control(request)
+
+
+class RequestCache:
+    """
+    Per request view of a cache backend, the key is derived from the request.
+
+    Values are stored JSON encoded, so any backend can hold them.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        cache: BaseCacheBackend,
+        key: str,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.request = request
+        self.cache = cache
+        self.key = key
+        self.ttl = ttl
+
+    async def get(self, default: Any = None) -> Any:
+        if not can_read_cache(self.request):
+            return default
+
+        cached_value = await self.cache.get(self.key)
+        if cached_value is None:
+            return default
+
+        return json.loads(cached_value)
+
+    async def set(self, value: Any) -> bool:
+        if not can_write_cache(self.request):
+            return False
+
+        return await self.cache.set(
+            self.key,
+            json.dumps(jsonable_encoder(value)),
+            ttl=self.ttl,
+        )
+
+    async def delete(self) -> bool:
+        return await self.cache.delete(self.key)
+
+
+def request_cache(
+    cache: str,
+    ttl: Optional[float] = None,
+    key_builder: Optional[KeyBuilder] = None,
+    vary: Sequence[str] = (),
+) -> Callable[[Request], RequestCache]:
+    """
+    Builds a dependency that provides RequestCache bound to current request:
+
+        @app.get('/')
+        async def index(
+            cache: RequestCache = Depends(request_cache(CACHE_KEY, ttl=5))
+        ):
+            ...
+    """
+
+    def dependency(request: Request) -> RequestCache:
+        if key_builder is not None:
+            key = key_builder(request)
+        else:
+            key = default_key_builder(request, vary)
+
+        return RequestCache(request, get_cache(cache), key, ttl)
+
+    return dependency
@@ -0,0 +1,368 @@
+import bisect
+import itertools
+import math
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+try:
+    from prometheus_client.core import (
+        CounterMetricFamily,
+        HistogramMetricFamily,
+    )
+except ImportError:  # pragma: no cover
+    CounterMetricFamily = HistogramMetricFamily = None
+
+try:
+    from opentelemetry.metrics import Meter, Observation
+except ImportError:  # pragma: no cover
+    Meter = Observation = None
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+INSTRUMENTED_OPERATIONS = (
+    'add', 'get', 'get_raw', 'get_with_ttl', 'get_and_touch', 'get_many',
+    'get_many_with_ttl', 'set', 'set_many', 'get_or_set', 'compare_and_set',
+    'incr', 'expire', 'exists', 'delete', 'delete_many', 'invalidate_tags',
+    'flush',
+)
+
+WRITE_OPERATIONS = ('add', 'set', 'set_many', 'compare_and_set', 'incr')
+
+# position of `default` argument of read operations, key excluded
+DEFAULT_POSITIONS = {
+    'get': 1,
+    'get_raw': 1,
+    'get_with_ttl': 1,
+    'get_and_touch': 2,
+}
+
+_MISSING = object()
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(
+        self,
+        bounds: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        return {
+            'buckets': list(zip(
+                self.bounds + (math.inf,),
+                itertools.accumulate(self.counts),
+            )),
+            'sum': self.sum,
+            'count': self.count,
+        }
+
+
+class OperationMetrics:
+    __slots__ = ('errors', 'hits', 'misses', 'latency')
+
+    def __init__(
+        self,
+        latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        self.errors = 0
+        self.hits = 0
+        self.misses = 0
+        self.latency = Histogram(latency_buckets)
+
+    @property
+    def calls(self) -> int:
+        return self.latency.count
+
+    def snapshot(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'hits': self.hits,
+            'misses': self.misses,
+            'latency': self.latency.snapshot(),
+        }
+
+
+class CacheMetrics:
+    """
+    Per operation counters and latency histograms of a single backend.
+    Counters are plain attributes updated from the event loop thread,
+    so recording a call takes no locks, though its wrapper still
+    allocates (see `instrument`).
+    """
+
+    def __init__(
+        self,
+        latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        self._latency_buckets = latency_buckets
+        self.operations: Dict[str, OperationMetrics] = {}
+
+    def operation(self, name: str) -> OperationMetrics:
+        operation = self.operations.get(name)
+        if operation is None:
+            operation = OperationMetrics(self._latency_buckets)
+            self.operations[name] = operation
+
+        return operation
+
+    def snapshot(self) -> dict:
+        operations = self.operations.values()
+
+        return {
+            'hits': sum(operation.hits for operation in operations),
+            'misses': sum(operation.misses for operation in operations),
+            'sets': sum(
+                self.operations[name].calls
+                for name in WRITE_OPERATIONS
+                if name in self.operations
+            ),
+            'errors': sum(operation.errors for operation in operations),
+            'operations': {
+                name: operation.snapshot()
+                for name, operation in self.operations.items()
+            },
+        }
+
+
+def instrument(
+    metrics: CacheMetrics,
+    name: str,
+    method: Callable[..., Any],
+) -> Callable[..., Any]:
+    """
+    Wraps backend `method` so every call is counted and timed, reads
+    are additionally classified as hits or misses. Wrappers take
+    `*args, **kwargs`, so arguments are repacked on every call.
+    """
+
+    operation = metrics.operation(name)
+    latency = operation.latency
+    counts, bounds = latency.counts, latency.bounds
+    clock = time.perf_counter
+    bisect_left = bisect.bisect_left
+
+    # Histogram.observe is inlined below, it is the hot path of every call
+
+    if name == 'get_many':
+        @wraps(method)
+        async def wrapper(*keys: Any, default: Any = None, **kwargs) -> Any:
+            started = clock()
+            try:
+                values = await method(*keys, default=_MISSING, **kwargs)
+            except Exception:
+                operation.errors += 1
+                raise
+            finally:
+                elapsed = clock() - started
+                counts[bisect_left(bounds, elapsed)] += 1
+                latency.sum += elapsed
+
+            misses = sum(value is _MISSING for value in values)
+            operation.hits += len(values) - misses
+            operation.misses += misses
+            if not misses:
+                return values
+
+            return [default if value is _MISSING else value for value in values]
+
+        return wrapper
+
+    if name == 'get_many_with_ttl':
+        @wraps(method)
+        async def wrapper(*keys: Any, default: Any = None, **kwargs) -> Any:
+            started = clock()
+            try:
+                results = await method(*keys, default=_MISSING, **kwargs)
+            except Exception:
+                operation.errors += 1
+                raise
+            finally:
+                elapsed = clock() - started
+                counts[bisect_left(bounds, elapsed)] += 1
+                latency.sum += elapsed
+
+            misses = sum(value is _MISSING for value, _ in results)
+            operation.hits += len(results) - misses
+            operation.misses += misses
+            if not misses:
+                return results
+
+            return [
+                (default, None) if result[0] is _MISSING else result
+                for result in results
+            ]
+
+        return wrapper
+
+    if name in DEFAULT_POSITIONS:
+        position = DEFAULT_POSITIONS[name]
+        with_ttl = name == 'get_with_ttl'
+
+        @wraps(method)
+        async def wrapper(*args: Any, **kwargs) -> Any:
+            if len(args) > position:
+                default = args[position]
+                args = args[:position] + (_MISSING,) + args[position + 1:]
+            else:
+                default = kwargs.get('default')
+                kwargs['default'] = _MISSING
+
+            started = clock()
+            try:
+                result = await method(*args, **kwargs)
+            except Exception:
+                operation.errors += 1
+                raise
+            finally:
+                elapsed = clock() - started
+                counts[bisect_left(bounds, elapsed)] += 1
+                latency.sum += elapsed
+
+            value = result[0] if with_ttl else result
+            if value is not _MISSING:
+                operation.hits += 1
+                return result
+
+            operation.misses += 1
+            return (default, None) if with_ttl else default
+
+        return wrapper
+
+    @wraps(method)
+    async def wrapper(*args: Any, **kwargs) -> Any:
+        started = clock()
+        try:
+            return await method(*args, **kwargs)
+        except Exception:
+            operation.errors += 1
+            raise
+        finally:
+            elapsed = clock() - started
+            counts[bisect_left(bounds, elapsed)] += 1
+            latency.sum += elapsed
+
+    return wrapper
+
+
+class PrometheusCollector:
+    """
+    Exposes stats of registered caches, register it with
+    `prometheus_client.REGISTRY.register(PrometheusCollector())`.
+    """
+
+    def __init__(
+        self,
+        stats: Optional[Callable[[], Dict[str, dict]]] = None,
+        namespace: str = 'fastapi_cache',
+    ) -> None:
+        if CounterMetricFamily is None:
+            raise ImportError(
+                'PrometheusCollector requires prometheus_client package'
+            )
+
+        if stats is None:
+            from .registry import CacheRegistry
+            stats = CacheRegistry.stats
+
+        self._stats = stats
+        self._namespace = namespace
+
+    def collect(self) -> Iterable[Any]:
+        labels = ['cache', 'operation']
+        counters = {
+            field: CounterMetricFamily(
+                '{}_{}'.format(self._namespace, field),
+                'Cache {} by operation'.format(field),
+                labels=labels,
+            )
+            for field in ('calls', 'errors', 'hits', 'misses')
+        }
+        latency = HistogramMetricFamily(
+            '{}_latency_seconds'.format(self._namespace),
+            'Cache operation latency',
+            labels=labels,
+        )
+
+        for cache_name, stats in self._stats().items():
+            for name, operation in stats['operations'].items():
+                for field, counter in counters.items():
+                    counter.add_metric([cache_name, name], operation[field])
+
+                histogram = operation['latency']
+                latency.add_metric(
+                    [cache_name, name],
+                    buckets=[
+                        (_format_bound(bound), count)
+                        for bound, count in histogram['buckets']
+                    ],
+                    sum_value=histogram['sum'],
+                )
+
+        yield from counters.values()
+        yield latency
+
+
+def register_opentelemetry(
+    meter: 'Meter',
+    stats: Optional[Callable[[], Dict[str, dict]]] = None,
+    prefix: str = 'fastapi_cache',
+) -> None:
+    """
+    Registers observable counters reading stats of registered caches on
+    every collection. Latency is reported as total and count, buckets
+    are only available through Prometheus.
+    """
+
+    if Observation is None:
+        raise ImportError('register_opentelemetry requires opentelemetry-api')
+
+    if stats is None:
+        from .registry import CacheRegistry
+        stats = CacheRegistry.stats
+
+    def observe(field: Callable[[dict], float]) -> Callable[..., Any]:
+        def callback(options: Any) -> Iterable[Observation]:
+            for cache_name, cache_stats in stats().items():
+                for name, operation in cache_stats['operations'].items():
+                    yield Observation(
+                        field(operation),
+                        {'cache': cache_name, 'operation': name},
+                    )
+
+        return callback
+
+    fields = {
+        'calls': lambda operation: operation['calls'],
+        'errors': lambda operation: operation['errors'],
+        'hits': lambda operation: operation['hits'],
+        'misses': lambda operation: operation['misses'],
+        'latency_count': lambda operation: operation['latency']['count'],
+        'latency_sum': lambda operation: operation['latency']['sum'],
+    }
+    for field, getter in fields.items():
+        meter.create_observable_counter(
+            '{}.{}'.format(prefix, field),
+            callbacks=[observe(getter)],
+            unit='s' if field == 'latency_sum' else '1',
+        )
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == math.inf else repr(bound)
@@ -21,6 +21,10 @@ class CacheRegistry:
     def all(cls) -> Tuple[BaseCacheBackend]:
         return tuple(cls._caches.values())
 
+    @classmethod
+    def stats(cls) -> Dict[str, dict]:
+        return {name: cache.get_stats() for name, cache in cls._caches.items()}
+
     @classmethod
     def remove(cls, name: str) -> None:
         if name not in cls._caches:
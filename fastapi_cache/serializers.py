@@ -0,0 +1,160 @@
+import json
+import pickle
+import zlib
+from typing import Any, Callable, Dict, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover
+    lz4 = None
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class BaseSerializer:
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class PickleSerializer(BaseSerializer):
+    def __init__(self, protocol: int = pickle.HIGHEST_PROTOCOL) -> None:
+        self._protocol = protocol
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=self._protocol)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class JsonSerializer(BaseSerializer):
+    """
+    Uses orjson when installed, falls back to standard json otherwise.
+    """
+
+    def dumps(self, value: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(value)
+
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, data: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(data)
+
+        return json.loads(data)
+
+
+class MsgpackSerializer(BaseSerializer):
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise ImportError('MsgpackSerializer requires msgpack package')
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+class RawSerializer(BaseSerializer):
+    """
+    Passes bytes through as is, for values that are already encoded.
+    """
+
+    def dumps(self, value: Buffer) -> bytes:
+        if isinstance(value, bytes):
+            return value
+
+        return bytes(value)
+
+    def loads(self, data: bytes) -> bytes:
+        return data
+
+
+def _lz4_compress(data: bytes, level: int) -> bytes:
+    if lz4 is None:
+        raise ImportError('lz4 compression requires lz4 package')
+
+    return lz4.frame.compress(data, compression_level=level)
+
+
+def _lz4_decompress(data: Buffer) -> bytes:
+    if lz4 is None:
+        raise ImportError('lz4 compression requires lz4 package')
+
+    return lz4.frame.decompress(data)
+
+
+HEADER_PLAIN = 0
+HEADER_ZLIB = 1
+HEADER_LZ4 = 2
+
+COMPRESSORS: Dict[str, Tuple[int, Callable[[bytes, int], bytes]]] = {
+    'zlib': (HEADER_ZLIB, zlib.compress),
+    'lz4': (HEADER_LZ4, _lz4_compress),
+}
+
+DECOMPRESSORS: Dict[int, Callable[[Buffer], bytes]] = {
+    HEADER_ZLIB: zlib.decompress,
+    HEADER_LZ4: _lz4_decompress,
+}
+
+DEFAULT_COMPRESSION_THRESHOLD = 1024
+
+
+class CompressedSerializer(BaseSerializer):
+    """
+    Wraps another serializer and compresses payloads of at least `threshold`
+    bytes. Every payload starts with a header byte naming the codec, so
+    values written with different settings can be read back.
+    """
+
+    def __init__(
+        self,
+        serializer: BaseSerializer,
+        threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+        codec: str = 'zlib',
+        level: int = 6,
+    ) -> None:
+        if codec not in COMPRESSORS:
+            raise ValueError('Unknown compression codec: {}'.format(codec))
+
+        self._serializer = serializer
+        self._threshold = threshold
+        self._header, self._compress = COMPRESSORS[codec]
+        self._level = level
+
+    def dumps(self, value: Any) -> bytes:
+        data = self._serializer.dumps(value)
+        if len(data) < self._threshold:
+            return bytes((HEADER_PLAIN,)) + data
+
+        return bytes((self._header,)) + self._compress(data, self._level)
+
+    def loads(self, data: bytes) -> Any:
+        header = data[0]
+        if header == HEADER_PLAIN:
+            # plain payloads are below `threshold`, and wrapped serializers
+            # (standard json, raw) need bytes
+            return self._serializer.loads(data[1:])
+
+        if header not in DECOMPRESSORS:
+            raise ValueError('Unknown compression header: {}'.format(header))
+
+        # decompressors read the buffer in place, no copy of the payload
+        payload = memoryview(data)[1:]
+        return self._serializer.loads(DECOMPRESSORS[header](payload))
@@ -10,14 +10,23 @@ setup(
     description='FastAPI simple cache',
     author=__author__,
     url='https://github.com/comeuplater/fastapi_cache',
-    packages=find_packages(exclude=('tests',)),
+    packages=find_packages(exclude=('tests', 'benchmarks')),
     long_description=open(join(dirname(__file__), 'README.md')).read(),
     long_description_content_type='text/markdown',
     license='MIT License',
     keywords=[
-        'redis', 'aioredis', 'asyncio', 'fastapi', 'starlette', 'cache'
+        'redis', 'asyncio', 'fastapi', 'starlette', 'cache'
     ],
     install_requires=[
-        'aioredis==1.3.1',
+        'redis>=5.3',
     ],
+    extras_require={
+        'fastapi': ['fastapi'],
+        'hiredis': ['redis[hiredis]>=5.3'],
+        'msgpack': ['msgpack'],
+        'lz4': ['lz4'],
+        'orjson': ['orjson'],
+        'prometheus': ['prometheus_client'],
+        'opentelemetry': ['opentelemetry-api'],
+    },
 )
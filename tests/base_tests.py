@@ -0,0 +1,28 @@
+import pytest
+
+from fastapi_cache.backends.base import BaseCacheBackend
+
+
+class DictCacheBackend(BaseCacheBackend):
+    def __init__(self) -> None:
+        super().__init__()
+        self.data = {}
+
+    async def get(self, key, default=None, **kwargs):
+        return self.data.get(key, default)
+
+    async def set(self, key, value, **kwargs):
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+
+@pytest.mark.asyncio
+async def test_batch_operations_should_fall_back_to_single_ops() -> None:
+    cache = DictCacheBackend()
+
+    assert await cache.set_many({'a': 1, 'b': 2}) is True
+    assert await cache.get_many('a', 'b', 'c') == [1, 2, None]
+    assert await cache.delete_many('a', 'c') == 1
@@ -0,0 +1,98 @@
+import asyncio
+from typing import Any, List
+
+import pytest
+
+from fastapi_cache.backends.utils.batching import AutoBatcher
+
+
+class Fetcher:
+    def __init__(self) -> None:
+        self.calls: List[List[str]] = []
+
+    async def __call__(self, keys: List[str]) -> List[str]:
+        self.calls.append(keys)
+        return [key.upper() for key in keys]
+
+
+@pytest.mark.asyncio
+async def test_should_batch_keys_loaded_in_same_tick() -> None:
+    fetcher = Fetcher()
+    batcher = AutoBatcher(fetcher)
+
+    values = await asyncio.gather(
+        batcher.load('a'), batcher.load('b'), batcher.load('a')
+    )
+
+    assert values == ['A', 'B', 'A']
+    assert fetcher.calls == [['a', 'b']]
+
+
+@pytest.mark.asyncio
+async def test_should_batch_keys_loaded_within_window() -> None:
+    fetcher = Fetcher()
+    batcher = AutoBatcher(fetcher, window=0.01)
+
+    async def delayed_load(key: str) -> str:
+        await asyncio.sleep(0)
+        return await batcher.load(key)
+
+    values = await asyncio.gather(batcher.load('a'), delayed_load('b'))
+
+    assert values == ['A', 'B']
+    assert fetcher.calls == [['a', 'b']]
+
+
+@pytest.mark.asyncio
+async def test_should_dispatch_when_batch_is_full() -> None:
+    fetcher = Fetcher()
+    batcher = AutoBatcher(fetcher, max_batch_size=2)
+
+    values = await asyncio.gather(*(batcher.load(key) for key in 'abc'))
+
+    assert values == ['A', 'B', 'C']
+    assert fetcher.calls == [['a', 'b'], ['c']]
+
+
+@pytest.mark.asyncio
+async def test_should_propagate_fetch_errors() -> None:
+    async def fetch(keys: List[str]) -> List[str]:
+        raise ConnectionError('boom')
+
+    batcher = AutoBatcher(fetch)
+
+    with pytest.raises(ConnectionError):
+        await batcher.load('a')
+
+
+@pytest.mark.asyncio
+async def test_close_should_wait_for_fetches_in_progress() -> None:
+    fetched = []
+
+    async def fetch(keys: List[str]) -> List[str]:
+        await asyncio.sleep(0.01)
+        fetched.extend(keys)
+        return keys
+
+    batcher = AutoBatcher(fetch, window=0.01)
+    first = batcher.load('a')
+    batcher._dispatch()
+    second = batcher.load('b')
+    await batcher.close()
+
+    assert await first == 'a'
+    assert second.cancelled()
+    assert fetched == ['a']
+
+
+@pytest.mark.asyncio
+async def test_should_log_failed_batches(caplog: Any) -> None:
+    async def fetch(keys: List[str]) -> None:
+        return None
+
+    batcher = AutoBatcher(fetch)
+    batcher.load('a')
+    await asyncio.sleep(0)
+    await batcher.close()
+
+    assert 'Batched fetch failed' in caplog.messages
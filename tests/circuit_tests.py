@@ -0,0 +1,49 @@
+from fastapi_cache.backends.utils.circuit import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_should_open_after_consecutive_failures() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request() is True
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow_request() is False
+
+
+def test_should_let_single_trial_through_after_recovery_timeout() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 5
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+    breaker.record_failure()
+    clock.now += 4
+    assert breaker.allow_request() is False
+
+    clock.now += 1
+    assert breaker.allow_request() is True
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request() is True
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+
+from fastapi_cache.backends.utils.clock import CoarseClock
+
+
+def test_stopped_clock_should_fall_back_to_monotonic() -> None:
+    clock = CoarseClock()
+    before = time.monotonic()
+
+    assert before <= clock() <= time.monotonic()
+    assert clock.is_running is False
+
+
+@pytest.mark.asyncio
+async def test_running_clock_should_be_refreshed_by_loop() -> None:
+    clock = CoarseClock(resolution=0.01)
+    clock.start()
+    first = clock()
+
+    assert clock() == first
+
+    await asyncio.sleep(0.05)
+    assert clock() > first
+
+    clock.stop()
+    assert clock.is_running is False
+
+
+def test_clock_should_stop_with_its_loop() -> None:
+    clock = CoarseClock(resolution=60)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.call_soon(clock.start)
+    loop.run_until_complete(asyncio.sleep(0))
+    assert clock.is_running is True
+
+    loop.close()
+    assert clock.is_running is False
+    before = time.monotonic()
+    assert before <= clock() <= time.monotonic()
+
+    async def restart() -> bool:
+        clock.start()
+        return clock.is_running
+
+    assert asyncio.run(restart()) is True
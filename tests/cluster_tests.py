@@ -0,0 +1,153 @@
+from typing import Any, List, Tuple
+
+import pytest
+from redis.asyncio.cluster import ClusterNode
+from redis.exceptions import MovedError
+
+from fastapi_cache.backends.cluster import RedisClusterCacheBackend
+
+# `foo` and `bar` hash to slots 12182 and 5061. Both nodes connect to
+# the same standalone server.
+NODES = ['redis://node-1:6379', ('node-2', 6379)]
+CLUSTER_SLOTS = [
+    [0, 8191, [b'node-1', 6379, b'a' * 40]],
+    [8192, 16383, [b'node-2', 6379, b'b' * 40], [b'replica', 6380, b'c' * 40]],
+]
+
+
+@pytest.fixture
+def f_commands(monkeypatch: Any) -> List[Tuple[str, Any]]:
+    """
+    Answers CLUSTER SLOTS as a two node cluster would and records which
+    node every other command was sent to.
+    """
+
+    commands: List[Tuple[str, Any]] = []
+    init = ClusterNode.__init__
+    execute_command = ClusterNode.execute_command
+
+    def init_node(node: ClusterNode, host: str, *args: Any, **kwargs) -> None:
+        init(node, host, *args, **kwargs)
+        node.connection_kwargs['host'] = '127.0.0.1'
+
+    async def execute_cluster_command(node: ClusterNode, *args: Any, **kwargs) -> Any:
+        if args[0] == 'CLUSTER SLOTS':
+            return CLUSTER_SLOTS
+
+        commands.append((node.host, *args))
+        return await execute_command(node, *args, **kwargs)
+
+    monkeypatch.setattr(ClusterNode, '__init__', init_node)
+    monkeypatch.setattr(ClusterNode, 'execute_command', execute_cluster_command)
+    return commands
+
+
+@pytest.fixture
+def f_backend(f_commands: List[Any]) -> RedisClusterCacheBackend:
+    return RedisClusterCacheBackend(NODES)
+
+
+@pytest.mark.asyncio
+async def test_should_load_slots_from_cluster_slots_reply(
+    f_backend: RedisClusterCacheBackend,
+) -> None:
+    await f_backend.connect()
+    client = f_backend._pool
+
+    assert client.get_node_from_key('bar').host == 'node-1'
+    assert client.get_node_from_key('foo').host == 'node-2'
+    assert sorted(node.host for node in client.get_primaries()) == [
+        'node-1', 'node-2',
+    ]
+
+    await f_backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_route_keys_by_slot(
+    f_backend: RedisClusterCacheBackend,
+    f_commands: List[Any],
+) -> None:
+    await f_backend.flush()
+    await f_backend.set('foo', '1')
+    await f_backend.add('bar', '2')
+
+    assert ('node-2', 'SET', 'foo', '1') in f_commands
+    assert ('node-1', 'SET', 'bar', '2', 'NX') in f_commands
+    assert await f_backend.get('foo') == '1'
+    assert await f_backend.get_with_ttl('bar') == ('2', None)
+
+    await f_backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_follow_moved_reply(
+    f_backend: RedisClusterCacheBackend,
+    f_commands: List[Any],
+    monkeypatch: Any,
+) -> None:
+    await f_backend.set('foo', '1')
+    execute_command = ClusterNode.execute_command
+
+    async def move_slot(node: ClusterNode, *args: Any, **kwargs) -> Any:
+        if node.host == 'node-2' and args[0] == 'GET':
+            raise MovedError('12182 node-1:6379')
+
+        return await execute_command(node, *args, **kwargs)
+
+    monkeypatch.setattr(ClusterNode, 'execute_command', move_slot)
+
+    assert await f_backend.get('foo') == '1'
+    assert ('node-1', 'GET', 'foo') in f_commands
+    assert f_backend._pool.get_node_from_key('foo').host == 'node-1'
+
+    await f_backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_split_multi_key_operations_by_slot(
+    f_backend: RedisClusterCacheBackend,
+) -> None:
+    await f_backend.flush()
+    await f_backend.set_many({'foo': '1', 'bar': '2', '{foo}x': '3'})
+    await f_backend.set_many({'zap': '4'}, ttl=10)
+
+    assert await f_backend.get_many('bar', 'missing', 'foo', '{foo}x') == [
+        '2', None, '1', '3',
+    ]
+    assert await f_backend.get_many_with_ttl('zap', 'missing', 'bar') == [
+        ('4', pytest.approx(10, abs=1)), (None, None), ('2', None),
+    ]
+    assert await f_backend.exists('missing', 'foo') is True
+    assert await f_backend.delete_many('foo', 'bar', 'zap', 'missing') == 3
+    assert await f_backend.get_many('foo', 'bar', '{foo}x') == [None, None, '3']
+
+    await f_backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_clear_namespace_on_every_node(
+    f_commands: List[Any],
+) -> None:
+    backend = RedisClusterCacheBackend(NODES, prefix='app')
+    await backend.set_many({'foo': '1', 'bar': '2'})
+    await backend.set('other', '3')
+
+    assert await backend.clear_namespace(batch_size=1) == 3
+    assert await backend.get_many('foo', 'bar') == [None, None]
+    assert {command[0] for command in f_commands if command[1] == 'SCAN'} == {
+        'node-1', 'node-2',
+    }
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_tags_should_not_be_supported(
+    f_backend: RedisClusterCacheBackend,
+) -> None:
+    with pytest.raises(NotImplementedError):
+        await f_backend.set('foo', '1', tags=['tag'])
+
+    with pytest.raises(NotImplementedError):
+        await f_backend.invalidate_tags('tag')
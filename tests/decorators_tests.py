@@ -0,0 +1,201 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse
+
+from fastapi_cache import caches
+from fastapi_cache.backends.memory import CACHE_KEY, InMemoryCacheBackend
+from fastapi_cache.backends.tiered import TieredCacheBackend
+from fastapi_cache.decorators import cached
+
+
+@pytest.fixture
+def f_calls() -> list:
+    return []
+
+
+@pytest.fixture
+def f_client(f_calls: list) -> TestClient:
+    app = FastAPI()
+
+    @app.get('/items/{item_id}')
+    @cached(cache=CACHE_KEY, ttl=60)
+    async def get_item(item_id: int, q: str = ''):
+        f_calls.append(item_id)
+        return {'item_id': item_id, 'q': q}
+
+    @app.post('/items/{item_id}')
+    @cached(cache=CACHE_KEY, ttl=60)
+    async def post_item(item_id: int):
+        f_calls.append(item_id)
+        return {'item_id': item_id}
+
+    @app.get('/greeting')
+    @cached(cache=CACHE_KEY, ttl=60, vary=('accept-language',))
+    async def get_greeting():
+        f_calls.append('greeting')
+        return {'greeting': 'hello'}
+
+    @app.get('/me')
+    @cached(cache=CACHE_KEY, ttl=60, vary=('authorization',))
+    async def get_me():
+        f_calls.append('me')
+        return PlainTextResponse('me', headers={'vary': 'accept-encoding'})
+
+    @app.get('/static')
+    @cached(cache=CACHE_KEY, ttl=60, key_builder=lambda request: 'static')
+    async def get_static():
+        return {'static': True}
+
+    @app.get('/text')
+    @cached(cache=CACHE_KEY)
+    def get_text():
+        f_calls.append('text')
+        return PlainTextResponse('hello')
+
+    caches.set(CACHE_KEY, InMemoryCacheBackend())
+    yield TestClient(app)
+    caches.flush()
+
+
+def test_should_cache_get_responses(
+    f_client: TestClient,
+    f_calls: list,
+) -> None:
+    first = f_client.get('/items/1')
+    second = f_client.get('/items/1')
+
+    assert first.json() == second.json() == {'item_id': 1, 'q': ''}
+    assert first.headers['x-cache'] == 'MISS'
+    assert second.headers['x-cache'] == 'HIT'
+    assert first.headers['cache-control'] == 'max-age=60'
+    assert second.headers['cache-control'] in ('max-age=59', 'max-age=60')
+    assert 'vary' not in second.headers
+    assert f_calls == [1]
+
+
+def test_should_build_key_from_query(
+    f_client: TestClient,
+    f_calls: list,
+) -> None:
+    f_client.get('/items/1?q=a')
+    f_client.get('/items/1?q=b')
+
+    assert f_calls == [1, 1]
+
+
+def test_should_not_cache_non_get_requests(
+    f_client: TestClient,
+    f_calls: list,
+) -> None:
+    f_client.post('/items/1')
+    response = f_client.post('/items/1')
+
+    assert 'x-cache' not in response.headers
+    assert f_calls == [1, 1]
+
+
+def test_should_respond_not_modified_on_matching_etag(
+    f_client: TestClient,
+) -> None:
+    etag = f_client.get('/items/1').headers['etag']
+    response = f_client.get('/items/1', headers={'if-none-match': etag})
+
+    assert response.status_code == 304
+    assert response.content == b''
+
+
+@pytest.mark.parametrize('directive,calls', [
+    ['no-cache', [1, 1]],
+    ['no-store', [1, 1]],
+])
+def test_should_respect_request_cache_control(
+    directive: str,
+    calls: list,
+    f_client: TestClient,
+    f_calls: list,
+) -> None:
+    f_client.get('/items/1')
+    f_client.get('/items/1', headers={'cache-control': directive})
+
+    assert f_calls == calls
+
+
+def test_no_cache_should_refresh_cached_response(
+    f_client: TestClient,
+    f_calls: list,
+) -> None:
+    f_client.get('/items/1', headers={'cache-control': 'no-cache'})
+    response = f_client.get('/items/1')
+
+    assert response.headers['x-cache'] == 'HIT'
+    assert f_calls == [1]
+
+
+def test_should_cache_response_objects(
+    f_client: TestClient,
+    f_calls: list,
+) -> None:
+    f_client.get('/text')
+    response = f_client.get('/text')
+
+    assert response.text == 'hello'
+    assert response.headers['content-type'].startswith('text/plain')
+    assert response.headers['x-cache'] == 'HIT'
+    assert f_calls == ['text']
+
+
+def test_should_send_vary_headers(
+    f_client: TestClient,
+    f_calls: list,
+) -> None:
+    for language in ('en', 'de', 'en'):
+        response = f_client.get(
+            '/greeting', headers={'accept-language': language},
+        )
+        assert response.headers['vary'] == 'accept-language'
+        assert response.headers['cache-control'].startswith('max-age=')
+
+    assert f_calls == ['greeting', 'greeting']
+
+
+def test_per_user_responses_should_be_private(
+    f_client: TestClient,
+) -> None:
+    for _ in range(2):
+        response = f_client.get('/me', headers={'authorization': 'Bearer 1'})
+        assert response.headers['vary'] == 'accept-encoding, authorization'
+        assert response.headers['cache-control'].startswith('private, max-age=')
+
+
+def test_hit_should_send_remaining_ttl(f_client: TestClient) -> None:
+    assert f_client.get('/static').headers['cache-control'] == 'max-age=60'
+    asyncio.run(caches.get(CACHE_KEY).expire('static', 30.5))
+
+    response = f_client.get('/static')
+    assert response.headers['x-cache'] == 'HIT'
+    assert response.headers['cache-control'] == 'max-age=30'
+
+
+def test_tiered_backend_should_serve_hits_from_l1(f_calls: list) -> None:
+    app = FastAPI()
+    backend = TieredCacheBackend(InMemoryCacheBackend(), l1_ttl=10)
+
+    @app.get('/tiered')
+    @cached(cache='tiered', ttl=60)
+    async def get_tiered():
+        f_calls.append('tiered')
+        return {'tiered': True}
+
+    caches.set('tiered', backend)
+    client = TestClient(app)
+    client.get('/tiered')
+    response = client.get('/tiered')
+    caches.flush()
+
+    assert response.headers['x-cache'] == 'HIT'
+    assert response.headers['cache-control'] in ('max-age=59', 'max-age=60')
+    assert backend.stats.l1_hits == 1
+    assert f_calls == ['tiered']
@@ -0,0 +1,55 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from fastapi_cache import caches
+from fastapi_cache.backends.memory import CACHE_KEY, InMemoryCacheBackend
+from fastapi_cache.dependencies import RequestCache, request_cache
+
+
+@pytest.fixture
+def f_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get('/')
+    async def index(
+        cache: RequestCache = Depends(request_cache(CACHE_KEY, ttl=5)),
+    ):
+        in_cache = await cache.get()
+        if in_cache is not None:
+            return {'cached': True, **in_cache}
+
+        value = {'answer': 42}
+        await cache.set(value)
+        return {'cached': False, **value}
+
+    @app.get('/unregistered')
+    async def unregistered(
+        cache: RequestCache = Depends(request_cache('UNKNOWN')),
+    ):
+        return {}
+
+    caches.set(CACHE_KEY, InMemoryCacheBackend())
+    yield TestClient(app)
+    caches.flush()
+
+
+def test_request_cache_should_return_cached_value(f_client: TestClient) -> None:
+    assert f_client.get('/').json() == {'cached': False, 'answer': 42}
+    assert f_client.get('/').json() == {'cached': True, 'answer': 42}
+
+
+def test_request_cache_should_skip_cache_on_no_cache(
+    f_client: TestClient
+) -> None:
+    f_client.get('/')
+    response = f_client.get('/', headers={'cache-control': 'no-cache'})
+
+    assert response.json() == {'cached': False, 'answer': 42}
+
+
+def test_request_cache_should_raise_for_unregistered_cache(
+    f_client: TestClient
+) -> None:
+    with pytest.raises(NameError, match='Cache UNKNOWN not registered'):
+        f_client.get('/unregistered')
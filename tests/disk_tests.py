@@ -0,0 +1,193 @@
+import asyncio
+import os
+import sqlite3
+from typing import Any
+
+import pytest
+
+from fastapi_cache.backends.disk import DiskCacheBackend
+from fastapi_cache.serializers import JsonSerializer
+
+TEST_KEY = 'constant'
+TEST_VALUE = '0'
+
+
+def _get_size(path: str) -> int:
+    return sum(
+        os.path.getsize(name)
+        for name in (path, path + '-wal')
+        if os.path.exists(name)
+    )
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def f_path(tmp_path: Any) -> str:
+    return str(tmp_path / 'cache.db')
+
+
+@pytest.fixture
+def f_backend(f_path: str) -> DiskCacheBackend:
+    return DiskCacheBackend(f_path)
+
+
+@pytest.mark.asyncio
+async def test_should_add_n_get_data(f_backend: DiskCacheBackend) -> None:
+    assert await f_backend.add(TEST_KEY, {'value': TEST_VALUE}) is True
+    assert await f_backend.add(TEST_KEY, TEST_VALUE) is False
+    assert await f_backend.get(TEST_KEY) == {'value': TEST_VALUE}
+    assert await f_backend.get('missing', 'default') == 'default'
+
+    await f_backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_keep_entries_over_restart(f_path: str) -> None:
+    backend = DiskCacheBackend(f_path, serializer=JsonSerializer())
+    await backend.set_many({'a': 1, ('b', 2): [2]})
+    await backend.set('large', 'x' * 1024 * 1024)
+    await backend.close()
+
+    backend = DiskCacheBackend(f_path, serializer=JsonSerializer())
+    assert await backend.get_many('a', ('b', 2), 'c') == [1, [2], None]
+    assert await backend.get('large') == 'x' * 1024 * 1024
+    assert await backend.exists('c', 'a') is True
+
+    assert await backend.delete_many('a', 'c') == 1
+    assert await backend.delete(('b', 2)) is True
+    await backend.flush()
+    assert await backend.exists('large') is False
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_expire_entries(f_path: str) -> None:
+    clock = FakeClock()
+    backend = DiskCacheBackend(f_path, clock=clock)
+    await backend.set(TEST_KEY, TEST_VALUE, pttl=500)
+    await backend.set('other', TEST_VALUE, ttl=10)
+
+    clock.now += 4
+    assert await backend.get_with_ttl('other') == (TEST_VALUE, 6)
+    assert await backend.get(TEST_KEY) is None
+    assert await backend.exists(TEST_KEY) is False
+    assert await backend.expire(TEST_KEY, 10) is False
+    assert await backend.add(TEST_KEY, 'new') is True
+
+    assert await backend.expire('other') is True
+    clock.now += 100
+    assert await backend.get_with_ttl('other') == (TEST_VALUE, None)
+
+    assert await backend.expire('other', 1) is True
+    clock.now += 1
+    assert await backend.get('other') is None
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_compact_should_remove_expired_entries(f_path: str) -> None:
+    clock = FakeClock()
+    backend = DiskCacheBackend(f_path, compact_batch=10, clock=clock)
+    await backend.set_many({number: 'x' * 4096 for number in range(25)}, ttl=1)
+    await backend.set(TEST_KEY, TEST_VALUE, tags=['tag'])
+    size = _get_size(f_path)
+
+    clock.now += 1
+    assert await backend.compact() == 25
+    assert await backend.compact() == 0
+    assert _get_size(f_path) < size
+    assert os.path.getsize(f_path) < 4096 * 25
+    assert await backend.get(TEST_KEY) == TEST_VALUE
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_compact_periodically(f_path: str) -> None:
+    clock = FakeClock()
+    backend = DiskCacheBackend(f_path, compact_interval=0.01, clock=clock)
+    await backend.set(TEST_KEY, TEST_VALUE, ttl=1)
+    clock.now += 1
+
+    await asyncio.sleep(0.05)
+    connection = sqlite3.connect(f_path)
+    assert connection.execute('SELECT COUNT(*) FROM entries').fetchone() == (0,)
+    connection.close()
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_log_compaction_failures(f_path: str, caplog: Any) -> None:
+    backend = DiskCacheBackend(f_path, compact_interval=0.01)
+
+    async def compact() -> int:
+        raise sqlite3.OperationalError('database is locked')
+
+    backend.compact = compact
+    await backend.set(TEST_KEY, TEST_VALUE)
+    await asyncio.sleep(0.05)
+
+    assert 'Failed to compact disk cache' in caplog.messages
+    assert backend._compactor is not None and not backend._compactor.done()
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_invalidate_tags(f_backend: DiskCacheBackend) -> None:
+    await f_backend.set('a', 1, tags=['users', 'all'])
+    await f_backend.set('b', 2, tags=['all'])
+    await f_backend.set('c', 3, tags=['users'])
+    # rewriting a key drops its previous tags
+    await f_backend.set('c', 3)
+
+    assert await f_backend.invalidate_tags('users') == 1
+    assert await f_backend.get_many('a', 'b', 'c') == [None, 2, 3]
+    assert await f_backend.invalidate_tags('all', 'missing') == 1
+    assert await f_backend.exists('b') is False
+
+    await f_backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_clear_namespace(f_path: str) -> None:
+    tenant_a = DiskCacheBackend(f_path, prefix='a')
+    tenant_b = DiskCacheBackend(f_path, prefix='b')
+    await tenant_a.set_many({'first': 1, 'second': 2})
+    await tenant_b.set(TEST_KEY, 'b')
+
+    assert await tenant_a.clear_namespace(batch_size=1) == 2
+    assert await tenant_a.get('first') is None
+    assert await tenant_b.get(TEST_KEY) == 'b'
+
+    with pytest.raises(ValueError):
+        await DiskCacheBackend(f_path).bump_version()
+
+    await tenant_a.close()
+    await tenant_b.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_should_not_be_lost(f_path: str) -> None:
+    first = DiskCacheBackend(f_path, max_workers=4)
+    second = DiskCacheBackend(f_path, max_workers=4)
+
+    await asyncio.gather(*(
+        (first if number % 2 else second).set(number, number)
+        for number in range(200)
+    ))
+    assert await first.get_many(*range(200)) == list(range(200))
+    assert first.get_stats()['sets'] == 100
+
+    await first.close()
+    await second.close()
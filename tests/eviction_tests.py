@@ -0,0 +1,91 @@
+import pytest
+
+from fastapi_cache.backends.utils.eviction import (
+    BaseEvictionPolicy,
+    LFUEvictionPolicy,
+    LRUEvictionPolicy,
+    TinyLFUEvictionPolicy,
+    get_eviction_policy,
+)
+
+
+def test_lru_should_evict_in_access_order() -> None:
+    policy = LRUEvictionPolicy()
+    for key in ('a', 'b', 'c'):
+        policy.insert(key)
+    policy.access('a')
+
+    assert [policy.evict() for _ in range(3)] == ['b', 'c', 'a']
+    assert policy.evict() is None
+
+
+def test_lfu_should_evict_least_frequently_used() -> None:
+    policy = LFUEvictionPolicy()
+    for key in ('a', 'b', 'c'):
+        policy.insert(key)
+    policy.access('a')
+    policy.access('a')
+    policy.access('c')
+
+    assert [policy.evict() for _ in range(3)] == ['b', 'c', 'a']
+
+
+def test_lfu_should_skip_removed_keys() -> None:
+    policy = LFUEvictionPolicy()
+    policy.insert('a')
+    policy.insert('b')
+    policy.access('b')
+    policy.remove('a')
+
+    assert policy.evict() == 'b'
+    assert policy.evict() is None
+
+
+def test_tinylfu_should_keep_frequent_keys() -> None:
+    policy = TinyLFUEvictionPolicy(capacity=100)
+    evicted = set()
+
+    for key in range(100):
+        policy.insert(key)
+    for _ in range(5):
+        for key in range(10):
+            policy.access(key)
+
+    for key in range(1000, 1100):
+        policy.insert(key)
+        evicted.add(policy.evict())
+
+    assert evicted.isdisjoint(range(10))
+
+
+def test_tinylfu_requires_capacity() -> None:
+    with pytest.raises(ValueError):
+        TinyLFUEvictionPolicy()
+
+
+@pytest.mark.parametrize('name,expected', [
+    ('lru', LRUEvictionPolicy),
+    ('lfu', LFUEvictionPolicy),
+    ('tinylfu', TinyLFUEvictionPolicy),
+])
+def test_get_eviction_policy_by_name(
+    name: str,
+    expected: type,
+) -> None:
+    assert isinstance(get_eviction_policy(name, 10), expected)
+
+
+def test_get_eviction_policy_should_pass_instances_through() -> None:
+    policy = LRUEvictionPolicy()
+
+    assert get_eviction_policy(policy) is policy
+
+
+def test_get_eviction_policy_should_reject_unknown_names() -> None:
+    with pytest.raises(ValueError, match='Unknown eviction policy'):
+        get_eviction_policy('fifo')
+
+
+def test_base_policy_is_abstract() -> None:
+    with pytest.raises(NotImplementedError):
+        BaseEvictionPolicy().evict()
@@ -0,0 +1,155 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from fastapi_cache.backends.invalidation import RedisInvalidationBus
+from fastapi_cache.backends.memory import InMemoryCacheBackend
+from fastapi_cache.backends.tiered import TieredCacheBackend
+
+TEST_KEY = 'constant'
+TEST_VALUE = '0'
+REDIS_ADDRESS = 'redis://localhost'
+
+
+async def wait_for(predicate, timeout: float = 1.0) -> None:
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout
+    while not await predicate():
+        assert loop.time() < deadline, 'Condition not met in time'
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_should_invalidate_caches_on_other_nodes() -> None:
+    l2 = InMemoryCacheBackend()
+    nodes = [
+        TieredCacheBackend(l2, invalidation_bus=RedisInvalidationBus(REDIS_ADDRESS))
+        for _ in range(2)
+    ]
+    for node in nodes:
+        await node._invalidation_bus.start()
+
+    await nodes[0].set(TEST_KEY, 'old')
+    assert await nodes[1].get(TEST_KEY) == 'old'
+
+    await nodes[0].set(TEST_KEY, TEST_VALUE)
+
+    async def is_invalidated() -> bool:
+        return await nodes[1].l1.get(TEST_KEY) is None
+
+    await wait_for(is_invalidated)
+    assert await nodes[0].l1.get(TEST_KEY) == TEST_VALUE
+    assert await nodes[1].get(TEST_KEY) == TEST_VALUE
+
+    for node in nodes:
+        await node.close()
+
+
+@pytest.mark.asyncio
+async def test_should_batch_keys_in_single_message() -> None:
+    sender = RedisInvalidationBus(REDIS_ADDRESS, batch_window=0.05)
+    receiver = RedisInvalidationBus(REDIS_ADDRESS)
+    calls = []
+
+    class RecordingCache(InMemoryCacheBackend):
+        async def delete_many(self, *keys):
+            calls.append(keys)
+            return 0
+
+    receiver.attach(RecordingCache())
+    await receiver.start()
+
+    sender.publish('a')
+    sender.publish('b', ('tuple', 'key'))
+
+    async def is_received() -> bool:
+        return bool(calls)
+
+    await wait_for(is_received)
+    assert calls == [('a', 'b', ('tuple', 'key'))]
+
+    await sender.close()
+    await receiver.close()
+
+
+@pytest.mark.asyncio
+async def test_should_flush_on_other_nodes() -> None:
+    sender = RedisInvalidationBus(REDIS_ADDRESS)
+    receiver = RedisInvalidationBus(REDIS_ADDRESS)
+    cache = InMemoryCacheBackend()
+    receiver.attach(cache)
+    await receiver.start()
+
+    await cache.set(TEST_KEY, TEST_VALUE)
+    sender.publish_flush()
+
+    async def is_flushed() -> bool:
+        return not await cache.exists(TEST_KEY)
+
+    await wait_for(is_flushed)
+
+    await sender.close()
+    await receiver.close()
+
+
+@pytest.mark.asyncio
+async def test_should_invalidate_tags_on_other_nodes() -> None:
+    sender = RedisInvalidationBus(REDIS_ADDRESS)
+    receiver = RedisInvalidationBus(REDIS_ADDRESS)
+    cache = InMemoryCacheBackend()
+    receiver.attach(cache)
+    await receiver.start()
+
+    await cache.set(TEST_KEY, TEST_VALUE, tags=['entity'])
+    await cache.set('untagged', TEST_VALUE)
+    sender.publish_tags('entity')
+
+    async def is_invalidated() -> bool:
+        return not await cache.exists(TEST_KEY)
+
+    await wait_for(is_invalidated)
+    assert await cache.get('untagged') == TEST_VALUE
+
+    await sender.close()
+    await receiver.close()
+
+
+@pytest.mark.asyncio
+async def test_should_resync_after_reconnect() -> None:
+    bus = RedisInvalidationBus(REDIS_ADDRESS, reconnect_interval=0.01)
+    cache = InMemoryCacheBackend()
+    bus.attach(cache)
+    await bus.start()
+
+    await cache.set(TEST_KEY, TEST_VALUE)
+    await bus._subscriber.connection.disconnect()
+
+    async def is_flushed() -> bool:
+        return not await cache.exists(TEST_KEY)
+
+    await wait_for(is_flushed)
+    await bus.close()
+
+
+@pytest.mark.asyncio
+async def test_close_should_wait_for_publishes(caplog: Any) -> None:
+    sender = RedisInvalidationBus(REDIS_ADDRESS)
+    receiver = RedisInvalidationBus(REDIS_ADDRESS)
+    cache = InMemoryCacheBackend()
+    await cache.set(TEST_KEY, TEST_VALUE)
+    receiver.attach(cache)
+    await receiver.start()
+
+    sender.publish_flush()
+    sender.publish_tags(object())
+    await sender.close()
+
+    async def is_flushed() -> bool:
+        return await cache.get(TEST_KEY) is None
+
+    await wait_for(is_flushed)
+    assert 'Failed to publish cache invalidation' in caplog.messages
+    assert not sender._tasks
+
+    await receiver.close()
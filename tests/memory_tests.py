@@ -1,3 +1,4 @@
+import asyncio
 from typing import Hashable, Any, Tuple
 
 import pytest
@@ -177,3 +178,252 @@ async def test_expire_from_cache(
     fetched_value = await f_backend.get(key)
 
     assert fetched_value == expected
+
+
+@pytest.mark.asyncio
+async def test_bounded_backend_should_evict_entries() -> None:
+    backend = InMemoryCacheBackend(max_entries=2)
+    for key in ('a', 'b', 'c'):
+        await backend.set(key, key)
+
+    assert await backend.get('a') is None
+    assert await backend.get('c') == 'c'
+    assert backend.stats.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_sweeper_should_reclaim_expired_entries() -> None:
+    backend = InMemoryCacheBackend(sweep_interval=0.01)
+    await backend.set('hello', 'world', ttl=0)
+    await asyncio.sleep(0.05)
+
+    assert len(backend._cache) == 0
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_expire_sub_second_ttl_with_coarse_clock() -> None:
+    backend = InMemoryCacheBackend(coarse_clock_resolution=0.005)
+    await backend.set('hello', 'world', pttl=50)
+
+    assert await backend.get('hello') == 'world'
+
+    await asyncio.sleep(0.1)
+    assert await backend.get('hello') is None
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_should_coalesce_concurrent_loaders(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    calls = []
+
+    async def loader() -> str:
+        calls.append(TEST_KEY)
+        await asyncio.sleep(0.01)
+        return TEST_VALUE
+
+    values = await asyncio.gather(*(
+        f_backend.get_or_set(TEST_KEY, loader, ttl=10) for _ in range(10)
+    ))
+
+    assert values == [TEST_VALUE] * 10
+    assert calls == [TEST_KEY]
+    assert await f_backend.get(TEST_KEY) == TEST_VALUE
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_should_survive_cancelled_leader(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    calls = []
+
+    async def loader() -> str:
+        calls.append(TEST_KEY)
+        await asyncio.sleep(0.01)
+        return TEST_VALUE
+
+    leader = asyncio.ensure_future(f_backend.get_or_set(TEST_KEY, loader))
+    await asyncio.sleep(0)
+    followers = asyncio.gather(*(
+        f_backend.get_or_set(TEST_KEY, loader) for _ in range(3)
+    ))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await followers == [TEST_VALUE] * 3
+    assert leader.cancelled()
+    assert calls == [TEST_KEY]
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_should_propagate_loader_errors(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    async def loader() -> str:
+        await asyncio.sleep(0.01)
+        raise ValueError('boom')
+
+    results = await asyncio.gather(
+        f_backend.get_or_set(TEST_KEY, loader),
+        f_backend.get_or_set(TEST_KEY, loader),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert await f_backend.exists(TEST_KEY) is False
+
+
+@pytest.mark.asyncio
+async def test_get_with_ttl_should_return_remaining_ttl(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE, ttl=10)
+    await f_backend.set('forever', TEST_VALUE)
+
+    value, ttl = await f_backend.get_with_ttl(TEST_KEY)
+    assert value == TEST_VALUE
+    assert 9 < ttl <= 10
+
+    assert await f_backend.get_with_ttl('forever') == (TEST_VALUE, None)
+    assert await f_backend.get_with_ttl('missing', 'default') == ('default', None)
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_should_serve_stale_while_revalidating(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    values = iter(['first', 'second'])
+
+    async def loader() -> str:
+        return next(values)
+
+    kwargs = {'ttl': 0.05, 'stale_ttl': 10}
+    assert await f_backend.get_or_set(TEST_KEY, loader, **kwargs) == 'first'
+
+    await asyncio.sleep(0.06)
+    assert await f_backend.get_or_set(TEST_KEY, loader, **kwargs) == 'first'
+
+    await asyncio.sleep(0)
+    assert await f_backend.get_or_set(TEST_KEY, loader, **kwargs) == 'second'
+
+
+@pytest.mark.asyncio
+async def test_close_should_cancel_background_refreshes() -> None:
+    backend = InMemoryCacheBackend()
+    values = iter(['first', 'second'])
+
+    async def loader() -> str:
+        value = next(values)
+        if value == 'second':
+            await asyncio.sleep(10)
+        return value
+
+    kwargs = {'ttl': 0.01, 'stale_ttl': 10}
+    await backend.get_or_set(TEST_KEY, loader, **kwargs)
+    await asyncio.sleep(0.02)
+    assert await backend.get_or_set(TEST_KEY, loader, **kwargs) == 'first'
+    assert len(backend._refreshes) == 1
+
+    await backend.close()
+    assert not backend._refreshes
+    assert await backend.get(TEST_KEY) == 'first'
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_should_refresh_early(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    calls = []
+
+    async def loader() -> int:
+        calls.append(TEST_KEY)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    assert await f_backend.get_or_set(TEST_KEY, loader, ttl=10, beta=1e6) == 1
+    assert await f_backend.get_or_set(TEST_KEY, loader, ttl=10, beta=1e6) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_should_require_ttl_for_stale_values(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    async def loader() -> str:
+        return TEST_VALUE
+
+    with pytest.raises(ValueError, match='require ttl'):
+        await f_backend.get_or_set(TEST_KEY, loader, stale_ttl=10)
+
+
+@pytest.mark.asyncio
+async def test_batch_operations(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    assert await f_backend.set_many({'pi': '3.14159', 'e': '2.71828'}, ttl=10)
+    assert await f_backend.get_many('pi', 'e', 'phi', default='?') == [
+        '3.14159', '2.71828', '?'
+    ]
+    assert await f_backend.delete_many('pi', 'phi') == 1
+    assert await f_backend.get_many('pi', 'e') == [None, '2.71828']
+
+
+@pytest.mark.asyncio
+async def test_should_store_buffers_as_bytes(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    payload = bytearray(b'x' * 1024)
+
+    await f_backend.set('view', memoryview(payload)[:512])
+    await f_backend.set_many({'array': payload})
+    payload[0:1] = b'y'
+
+    assert await f_backend.get('view') == b'x' * 512
+    assert await f_backend.get('array') == b'x' * 1024
+
+    raw_value = await f_backend.get_raw('array')
+    assert isinstance(raw_value, memoryview)
+    assert raw_value.readonly is True
+    assert raw_value[:3] == b'xxx'
+    assert await f_backend.get_raw('missing', 'default') == 'default'
+
+
+@pytest.mark.asyncio
+async def test_bump_version_should_invalidate_namespace() -> None:
+    backend = InMemoryCacheBackend(prefix='tenant')
+
+    await backend.set(TEST_KEY, TEST_VALUE)
+    await backend.set_many({'pi': '3.14159'}, ttls={'pi': 10})
+
+    assert await backend.bump_version() == 1
+    assert await backend.get(TEST_KEY) is None
+    assert await backend.exists(TEST_KEY, 'pi') is False
+
+    await backend.set(TEST_KEY, 'new')
+
+    assert await backend.clear_namespace(batch_size=1) == 3
+    assert await backend.get(TEST_KEY) is None
+    assert len(backend._cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_bump_version_should_require_prefix(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    with pytest.raises(ValueError):
+        await f_backend.bump_version()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    await f_backend.set('profile', 1, tags=['user:1'])
+    await f_backend.set('feed', 2, ttl=10, tags=['user:1', 'feed'])
+    await f_backend.set(TEST_KEY, TEST_VALUE)
+
+    assert await f_backend.invalidate_tags('user:1') == 2
+    assert await f_backend.get_many('profile', 'feed', TEST_KEY) == [
+        None, None, TEST_VALUE
+    ]
@@ -0,0 +1,167 @@
+import math
+
+import pytest
+
+from fastapi_cache.backends.base import BaseCacheBackend
+from fastapi_cache.backends.memory import InMemoryCacheBackend
+from fastapi_cache.metrics import (
+    Histogram,
+    PrometheusCollector,
+    register_opentelemetry,
+)
+from fastapi_cache.registry import CacheRegistry
+
+TEST_KEY = 'constant'
+TEST_VALUE = '0'
+
+
+@pytest.fixture
+def f_backend() -> InMemoryCacheBackend:
+    return InMemoryCacheBackend(max_entries=1)
+
+
+@pytest.fixture
+def cache_registry() -> CacheRegistry:
+    registry = CacheRegistry()
+    yield registry
+    registry.flush()
+
+
+def test_histogram_should_count_cumulative_buckets() -> None:
+    histogram = Histogram([0.1, 1.0])
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot['buckets'] == [(0.1, 2), (1.0, 3), (math.inf, 4)]
+    assert snapshot['count'] == 4
+    assert snapshot['sum'] == pytest.approx(2.65)
+
+
+@pytest.mark.asyncio
+async def test_should_count_hits_and_misses(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE, ttl=10)
+
+    assert await f_backend.get(TEST_KEY) == TEST_VALUE
+    assert await f_backend.get('missing', 'default') == 'default'
+    assert await f_backend.get('missing', default='default') == 'default'
+    assert await f_backend.get_many(TEST_KEY, 'missing', default='?') == [
+        TEST_VALUE, '?'
+    ]
+    assert await f_backend.get_with_ttl('missing', 'default') == (
+        'default', None
+    )
+
+    stats = f_backend.get_stats()
+    operations = stats['operations']
+
+    assert stats['hits'] == 2
+    assert stats['misses'] == 4
+    assert stats['sets'] == 1
+    assert operations['get']['calls'] == 3
+    assert operations['get']['latency']['count'] == 3
+    assert operations['get_many']['hits'] == 1
+    assert operations['get_many']['misses'] == 1
+    assert operations['get_with_ttl']['misses'] == 1
+
+
+@pytest.mark.asyncio
+async def test_should_include_backend_stats(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    await f_backend.set('first', 1)
+    await f_backend.set('second', 2)
+
+    stats = f_backend.get_stats()
+
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 1
+
+
+@pytest.mark.asyncio
+async def test_should_count_errors() -> None:
+    backend = BaseCacheBackend()
+
+    with pytest.raises(NotImplementedError):
+        await backend.get(TEST_KEY)
+
+    assert backend.get_stats()['errors'] == 1
+    assert backend.get_stats()['operations']['get']['calls'] == 1
+
+
+@pytest.mark.asyncio
+async def test_should_record_super_calls_once() -> None:
+    class Backend(InMemoryCacheBackend):
+        async def get(self, key, default=None, **kwargs):
+            return await super().get(key, default, **kwargs)
+
+    backend = Backend()
+    await backend.get(TEST_KEY)
+
+    assert backend.get_stats()['operations']['get']['calls'] == 1
+
+
+@pytest.mark.asyncio
+async def test_registry_should_collect_stats(
+    cache_registry: CacheRegistry,
+    f_backend: InMemoryCacheBackend,
+) -> None:
+    cache_registry.set('memory', f_backend)
+    await f_backend.get(TEST_KEY)
+
+    assert cache_registry.stats()['memory']['misses'] == 1
+
+
+@pytest.mark.asyncio
+async def test_prometheus_collector(
+    cache_registry: CacheRegistry,
+    f_backend: InMemoryCacheBackend,
+) -> None:
+    prometheus_client = pytest.importorskip('prometheus_client')
+
+    cache_registry.set('memory', f_backend)
+    await f_backend.get(TEST_KEY)
+
+    registry = prometheus_client.CollectorRegistry()
+    registry.register(PrometheusCollector())
+    labels = {'cache': 'memory', 'operation': 'get'}
+
+    assert registry.get_sample_value(
+        'fastapi_cache_misses_total', labels
+    ) == 1
+    assert registry.get_sample_value(
+        'fastapi_cache_latency_seconds_count', labels
+    ) == 1
+
+
+@pytest.mark.asyncio
+async def test_opentelemetry_exporter(
+    f_backend: InMemoryCacheBackend
+) -> None:
+    pytest.importorskip('opentelemetry.sdk')
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+
+    reader = InMemoryMetricReader()
+    meter = MeterProvider(metric_readers=[reader]).get_meter('test')
+    register_opentelemetry(meter, stats=lambda: {'memory': f_backend.get_stats()})
+
+    await f_backend.get(TEST_KEY)
+
+    metrics = {
+        metric.name: metric
+        for resource in reader.get_metrics_data().resource_metrics
+        for scope in resource.scope_metrics
+        for metric in scope.metrics
+    }
+    point, = [
+        point
+        for point in metrics['fastapi_cache.misses'].data.data_points
+        if point.attributes['operation'] == 'get'
+    ]
+
+    assert point.value == 1
+    assert point.attributes['cache'] == 'memory'
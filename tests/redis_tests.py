@@ -1,9 +1,20 @@
+import asyncio
 from typing import Tuple, List, Any
 
-import aioredis
 import pytest
-
-from fastapi_cache.backends.redis import RedisCacheBackend, RedisKey
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from fastapi_cache.backends.redis import (
+    PoolClosedError,
+    RedisCacheBackend,
+    RedisKey,
+)
+from fastapi_cache.backends.utils.circuit import (
+    CLOSED,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from fastapi_cache.serializers import CompressedSerializer, PickleSerializer
 
 TEST_KEY = 'constant'
 TEST_VALUE = '0'
@@ -165,7 +176,7 @@ async def test_close_should_close_connection(
     f_backend: RedisCacheBackend
 ) -> None:
     await f_backend.close()
-    with pytest.raises(aioredis.errors.PoolClosedError):
+    with pytest.raises(PoolClosedError):
         await f_backend.add(TEST_KEY, TEST_VALUE)
 
 
@@ -187,3 +198,603 @@ async def test_scalar_types(
 ) -> None:
     await f_backend.set(key, value)
     assert await f_backend.get(key) == expected
+
+
+@pytest.mark.asyncio
+async def test_expire_should_accept_sub_second_ttl(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE)
+    await f_backend.expire(TEST_KEY, 0.05)
+
+    assert await f_backend.get(TEST_KEY) == TEST_VALUE
+
+    await asyncio.sleep(0.1)
+    assert await f_backend.get(TEST_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_expire_without_ttl_should_persist_key(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.delete('missing')
+    await f_backend.set(TEST_KEY, TEST_VALUE, ttl=10)
+
+    assert await f_backend.expire(TEST_KEY, None) is True
+    assert await f_backend.get_with_ttl(TEST_KEY) == (TEST_VALUE, None)
+    assert await f_backend.expire(TEST_KEY) is True
+    assert await f_backend.expire('missing') is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('kwargs', [
+    {'ttl': 0.05},
+    {'pttl': 50},
+])
+async def test_set_should_accept_ttl(
+    kwargs: dict,
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE, **kwargs)
+
+    assert await f_backend.get(TEST_KEY) == TEST_VALUE
+
+    await asyncio.sleep(0.1)
+    assert await f_backend.get(TEST_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_get_or_set_should_use_distributed_lock(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.delete(TEST_KEY)
+    other_worker = RedisCacheBackend('redis://localhost')
+    calls = []
+
+    async def loader() -> str:
+        calls.append(TEST_KEY)
+        await asyncio.sleep(0.05)
+        return TEST_VALUE
+
+    values = await asyncio.gather(
+        f_backend.get_or_set(TEST_KEY, loader, lock_timeout=1),
+        other_worker.get_or_set(TEST_KEY, loader, lock_timeout=1),
+    )
+
+    assert values == [TEST_VALUE, TEST_VALUE]
+    assert calls == [TEST_KEY]
+    assert await f_backend.exists(f_backend._lock_key(TEST_KEY)) is False
+    await other_worker.close()
+
+
+@pytest.mark.asyncio
+async def test_get_with_ttl_should_return_remaining_ttl(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE, ttl=10)
+    await f_backend.set('forever', TEST_VALUE)
+
+    value, ttl = await f_backend.get_with_ttl(TEST_KEY)
+    assert value == TEST_VALUE
+    assert 9 < ttl <= 10
+
+    assert await f_backend.get_with_ttl('forever') == (TEST_VALUE, None)
+    assert await f_backend.get_with_ttl('missing', 'default') == ('default', None)
+
+
+@pytest.mark.asyncio
+async def test_get_many_with_ttl_should_return_remaining_ttls(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.delete('missing')
+    await f_backend.set(TEST_KEY, TEST_VALUE, ttl=10)
+    await f_backend.set('forever', TEST_VALUE)
+
+    (value, ttl), *rest = await f_backend.get_many_with_ttl(
+        TEST_KEY, 'forever', 'missing', default='default',
+    )
+    assert value == TEST_VALUE
+    assert 9 < ttl <= 10
+    assert rest == [(TEST_VALUE, None), ('default', None)]
+
+    stats = f_backend.get_stats()['operations']['get_many_with_ttl']
+    assert (stats['hits'], stats['misses']) == (2, 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('ttl,ttls', [
+    [None, None],
+    [10, {'e': 0.5}],
+])
+async def test_batch_operations(
+    ttl: Any,
+    ttls: Any,
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.delete_many('pi', 'e', 'phi')
+
+    assert await f_backend.set_many(
+        {'pi': '3.14159', 'e': '2.71828'}, ttl=ttl, ttls=ttls
+    )
+    assert await f_backend.get_many('pi', 'e', 'phi', default='?') == [
+        '3.14159', '2.71828', '?'
+    ]
+    assert await f_backend.delete_many('pi', 'phi') == 1
+    assert await f_backend.get_many('pi', 'e') == [None, '2.71828']
+
+
+@pytest.mark.asyncio
+async def test_batch_operations_should_accept_no_keys(
+    f_backend: RedisCacheBackend
+) -> None:
+    assert await f_backend.get_many() == []
+    assert await f_backend.set_many({}) is True
+    assert await f_backend.delete_many() == 0
+
+
+@pytest.mark.asyncio
+async def test_autobatch_should_resolve_concurrent_gets() -> None:
+    backend = RedisCacheBackend('redis://localhost', autobatch=True)
+    await backend.set_many({'pi': '3.14159', 'e': '2.71828'})
+    await backend.delete('phi')
+
+    values = await asyncio.gather(
+        backend.get('pi'),
+        backend.get('e', encoding=None),
+        backend.get('phi', '?'),
+    )
+
+    assert values == ['3.14159', b'2.71828', '?']
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_add_should_be_atomic(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.delete(TEST_KEY)
+
+    results = await asyncio.gather(*(
+        f_backend.add(TEST_KEY, str(num)) for num in range(10)
+    ))
+
+    assert results.count(True) == 1
+
+
+@pytest.mark.asyncio
+async def test_add_should_accept_ttl(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.delete(TEST_KEY)
+    await f_backend.add(TEST_KEY, TEST_VALUE, ttl=10)
+
+    _, ttl = await f_backend.get_with_ttl(TEST_KEY)
+    assert 9 < ttl <= 10
+
+
+@pytest.mark.asyncio
+async def test_compare_and_set(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.set(TEST_KEY, 'old', ttl=10)
+
+    assert await f_backend.compare_and_set(TEST_KEY, 'other', 'new') is False
+    assert await f_backend.compare_and_set(TEST_KEY, 'old', 'new') is True
+
+    value, ttl = await f_backend.get_with_ttl(TEST_KEY)
+    assert value == 'new'
+    assert 9 < ttl <= 10
+
+
+@pytest.mark.asyncio
+async def test_get_and_touch(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE, ttl=1)
+    await f_backend.delete('missing')
+
+    assert await f_backend.get_and_touch(TEST_KEY, 100) == TEST_VALUE
+    assert await f_backend.get_and_touch(TEST_KEY, 100, encoding=None) == b'0'
+    assert await f_backend.get_and_touch('missing', 100, 'default') == 'default'
+
+    _, ttl = await f_backend.get_with_ttl(TEST_KEY)
+    assert ttl > 99
+
+
+@pytest.mark.asyncio
+async def test_incr_should_set_ttl_on_new_counter(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.delete('counter')
+
+    assert await f_backend.incr('counter', ttl=10) == 1
+    assert await f_backend.incr('counter', 5, ttl=100) == 6
+
+    _, ttl = await f_backend.get_with_ttl('counter')
+    assert 9 < ttl <= 10
+
+
+@pytest.mark.asyncio
+async def test_serializer_round_trip() -> None:
+    backend = RedisCacheBackend(
+        'redis://localhost',
+        serializer=CompressedSerializer(PickleSerializer(), threshold=16),
+    )
+    value = {'id': 1, 'tags': ('a', 'b'), 'body': 'x' * 64}
+
+    await backend.set(TEST_KEY, value)
+    await backend.set_many({'first': [1], 'second': [2]}, ttl=10)
+
+    assert await backend.get(TEST_KEY) == value
+    assert await backend.get_many('first', 'second', 'missing') == [[1], [2], None]
+
+    cached_value, ttl = await backend.get_with_ttl('first')
+    assert cached_value == [1]
+    assert 9 < ttl <= 10
+
+    assert await backend.compare_and_set('first', [1], [3]) is True
+    assert await backend.get_and_touch('first', 10) == [3]
+
+
+@pytest.mark.asyncio
+async def test_get_raw_should_skip_decoding(
+    f_backend: RedisCacheBackend
+) -> None:
+    payload = bytearray(b'{"id": 1}')
+
+    await f_backend.set(TEST_KEY, memoryview(payload))
+    await f_backend.set('array', payload)
+    await f_backend.delete('missing')
+
+    assert await f_backend.get_raw(TEST_KEY) == b'{"id": 1}'
+    assert await f_backend.get_raw('array') == b'{"id": 1}'
+    assert await f_backend.get(TEST_KEY) == '{"id": 1}'
+    assert await f_backend.get_raw('missing', b'') == b''
+
+
+@pytest.mark.asyncio
+async def test_prefixed_backends_should_not_share_keys(
+    f_backend: RedisCacheBackend
+) -> None:
+    tenant_a = RedisCacheBackend('redis://localhost', prefix='tenant_a')
+    tenant_b = RedisCacheBackend('redis://localhost', prefix='tenant_b')
+
+    await f_backend.set(TEST_KEY, 'global')
+    await tenant_a.set(TEST_KEY, 'a')
+    await tenant_b.set_many({TEST_KEY: 'b', 'other': 'b'}, ttl=10)
+
+    assert await tenant_a.get(TEST_KEY) == 'a'
+    assert await tenant_b.get_many(TEST_KEY, 'other') == ['b', 'b']
+
+    await tenant_a.flush()
+
+    assert await tenant_a.get(TEST_KEY) is None
+    assert await tenant_b.get(TEST_KEY) == 'b'
+    assert await f_backend.get(TEST_KEY) == 'global'
+
+
+@pytest.mark.asyncio
+async def test_bump_version_should_invalidate_namespace_on_all_nodes() -> None:
+    first = RedisCacheBackend('redis://localhost', prefix='shared')
+    second = RedisCacheBackend('redis://localhost', prefix='shared', version_ttl=0)
+
+    await first.set(TEST_KEY, TEST_VALUE)
+    assert await second.get(TEST_KEY) == TEST_VALUE
+
+    version = await first.bump_version()
+
+    assert await second.bump_version() == version + 1
+    assert await first.get(TEST_KEY) is None
+    assert await second.exists(TEST_KEY) is False
+
+
+@pytest.mark.asyncio
+async def test_clear_namespace_should_unlink_stale_keys(
+    f_backend: RedisCacheBackend
+) -> None:
+    namespaced = RedisCacheBackend('redis://localhost', prefix='clear[me]*')
+    other = RedisCacheBackend('redis://localhost', prefix='clear')
+
+    await f_backend.set(TEST_KEY, TEST_VALUE)
+    await other.set(TEST_KEY, TEST_VALUE)
+    await namespaced.set_many({str(i): i for i in range(50)})
+
+    assert await namespaced.clear_namespace(batch_size=10) == 50
+    assert await namespaced.clear_namespace() == 0
+    assert await other.get(TEST_KEY) == TEST_VALUE
+    assert await f_backend.get(TEST_KEY) == TEST_VALUE
+
+
+@pytest.mark.asyncio
+async def test_bump_version_should_require_prefix(
+    f_backend: RedisCacheBackend
+) -> None:
+    with pytest.raises(ValueError):
+        await f_backend.bump_version()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.set('profile', 1, tags=['user:1'])
+    await f_backend.set('feed', 2, ttl=10, tags=['user:1', 'feed'])
+    await f_backend.set(TEST_KEY, TEST_VALUE)
+
+    value, ttl = await f_backend.get_with_ttl('feed')
+    assert value == '2'
+    assert 9 < ttl <= 10
+
+    assert await f_backend.invalidate_tags('user:1', 'missing') == 2
+    assert await f_backend.get_many('profile', 'feed', TEST_KEY) == [
+        None, None, TEST_VALUE
+    ]
+    assert await f_backend.invalidate_tags('feed') == 0
+
+
+@pytest.mark.asyncio
+async def test_non_positive_ttl_should_expire_immediately(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE)
+
+    assert await f_backend.set(TEST_KEY, 'new', ttl=0) is True
+    assert await f_backend.get(TEST_KEY) is None
+    assert await f_backend.add(TEST_KEY, 'new', pttl=-1) is True
+    assert await f_backend.exists(TEST_KEY) is False
+
+    await f_backend.set('tagged', 1)
+    assert await f_backend.set('tagged', 2, ttl=0, tags=['t']) is True
+    assert await f_backend.set_many({'a': 1, 'b': 2}, ttls={'a': 0}) is True
+    assert await f_backend.get_many('tagged', 'a', 'b') == [None, None, '2']
+
+
+@pytest.mark.asyncio
+async def test_sub_millisecond_ttl_should_round_up(
+    f_backend: RedisCacheBackend
+) -> None:
+    assert await f_backend.set(TEST_KEY, TEST_VALUE, ttl=0.0004) is True
+    assert await f_backend.set('other', TEST_VALUE, pttl=0.5) is True
+
+    await asyncio.sleep(0.01)
+    assert await f_backend.get_many(TEST_KEY, 'other') == [None, None]
+
+
+@pytest.mark.asyncio
+async def test_add_should_tag_only_added_keys(
+    f_backend: RedisCacheBackend
+) -> None:
+    assert await f_backend.add('tagged', 1, ttl=10, tags=['added']) is True
+    assert await f_backend.add('tagged', 2, tags=['rejected']) is False
+    assert 9 < (await f_backend.get_with_ttl('tagged'))[1] <= 10
+
+    assert await f_backend.invalidate_tags('rejected') == 0
+    assert await f_backend.get('tagged') == '1'
+    assert await f_backend.invalidate_tags('added') == 1
+    assert await f_backend.get('tagged') is None
+
+
+@pytest.mark.asyncio
+async def test_set_with_tags_should_accept_expire(
+    f_backend: RedisCacheBackend
+) -> None:
+    assert await f_backend.set('seconds', 1, expire=10, tags=['t']) is True
+    assert await f_backend.set('millis', 2, pexpire=500, tags=['t']) is True
+
+    assert 9 < (await f_backend.get_with_ttl('seconds'))[1] <= 10
+    assert 0 < (await f_backend.get_with_ttl('millis'))[1] <= 0.5
+    assert await f_backend.invalidate_tags('t') == 2
+
+
+@pytest.mark.asyncio
+async def test_tag_sets_should_outlive_tagged_keys(
+    f_backend: RedisCacheBackend
+) -> None:
+    client = await f_backend._client
+    await f_backend.delete_many(
+        b'fastapi_cache:tag:short',
+        b'fastapi_cache:tag:forever',
+    )
+
+    await f_backend.set('first', 1, ttl=10, tags=['short'])
+    await f_backend.set('second', 2, ttl=100, tags=['short'])
+    await f_backend.set('third', 3, ttl=10, tags=['forever'])
+    await f_backend.set('fourth', 4, tags=['forever'])
+
+    assert 99 < await client.ttl(b'fastapi_cache:tag:short') <= 100
+    assert await client.ttl(b'fastapi_cache:tag:forever') == -1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_should_respect_namespace() -> None:
+    tenant_a = RedisCacheBackend('redis://localhost', prefix='tags_a')
+    tenant_b = RedisCacheBackend('redis://localhost', prefix='tags_b')
+
+    await tenant_a.set(TEST_KEY, 'a', tags=['shared'])
+    await tenant_b.set(TEST_KEY, 'b', tags=['shared'])
+
+    assert await tenant_a.invalidate_tags('shared') == 1
+    assert await tenant_a.get(TEST_KEY) is None
+    assert await tenant_b.get(TEST_KEY) == 'b'
+
+
+@pytest.mark.asyncio
+async def test_clear_namespace_should_keep_tag_sets(monkeypatch: Any) -> None:
+    backend = RedisCacheBackend('redis://localhost', prefix='clear_tags')
+    await backend.set('old', 1, tags=['t'])
+    version = await backend.bump_version()
+    await backend.set(TEST_KEY, TEST_VALUE, tags=['t'])
+
+    async def bump_version() -> int:
+        return version
+
+    # the sweep of a clear started before TEST_KEY was written
+    monkeypatch.setattr(backend, 'bump_version', bump_version)
+    assert await backend.clear_namespace() == 1
+
+    assert await backend.invalidate_tags('t') == 1
+    assert await backend.get(TEST_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_should_fail_fast_with_defaults() -> None:
+    backend = RedisCacheBackend(
+        'redis://localhost:1',
+        connect_timeout=0.1,
+        circuit_breaker=CircuitBreaker(failure_threshold=1, recovery_timeout=60),
+    )
+
+    with pytest.raises(RedisConnectionError):
+        await backend.get(TEST_KEY)
+
+    assert await backend.get(TEST_KEY, 'default') == 'default'
+    assert await backend.get_many(TEST_KEY, 'other', default='?') == ['?', '?']
+    assert await backend.get_with_ttl(TEST_KEY, 'default') == ('default', None)
+    assert await backend.set(TEST_KEY, TEST_VALUE) is False
+    assert await backend.delete_many(TEST_KEY) == 0
+    with pytest.raises(CircuitOpenError):
+        await backend.incr(TEST_KEY)
+
+    async def loader() -> str:
+        return TEST_VALUE
+
+    assert await backend.get_or_set(TEST_KEY, loader) == TEST_VALUE
+    assert backend.get_stats()['operations']['get']['misses'] == 2
+
+
+@pytest.mark.asyncio
+async def test_command_timeout_should_bound_latency() -> None:
+    server = await asyncio.start_server(lambda reader, writer: None, '127.0.0.1', 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    backend = RedisCacheBackend(
+        'redis://{}:{}'.format(host, port),
+        pool_minsize=1,
+        command_timeout=0.05,
+        circuit_breaker=CircuitBreaker(failure_threshold=1),
+    )
+
+    with pytest.raises(asyncio.TimeoutError):
+        await backend.get(TEST_KEY)
+    assert await backend.get(TEST_KEY, 'default') == 'default'
+
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_should_retry_idempotent_operations() -> None:
+    class FlakyBackend(RedisCacheBackend):
+        attempts = 0
+
+        async def _create_connection(self):
+            self.attempts += 1
+            if self.attempts < 3:
+                raise ConnectionRefusedError()
+
+            return await super()._create_connection()
+
+    backend = FlakyBackend('redis://localhost', retries=2, retry_backoff=0)
+    await backend.set(TEST_KEY, TEST_VALUE)
+    assert backend.attempts == 3
+
+    backend = FlakyBackend('redis://localhost', retries=2, retry_backoff=0)
+    with pytest.raises(ConnectionRefusedError):
+        await backend.add(TEST_KEY, TEST_VALUE)
+
+
+@pytest.mark.asyncio
+async def test_health_check_should_close_circuit() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    backend = RedisCacheBackend(
+        'redis://localhost',
+        circuit_breaker=breaker,
+        health_check_interval=0.01,
+    )
+    await backend._client
+    breaker.record_failure()
+
+    assert await backend.get(TEST_KEY, 'default') == 'default'
+    await asyncio.sleep(0.05)
+    assert breaker.state == CLOSED
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_use_should_create_single_pool() -> None:
+    class CountingBackend(RedisCacheBackend):
+        pools = 0
+
+        async def _create_connection(self):
+            self.pools += 1
+            await asyncio.sleep(0.01)
+            return await super()._create_connection()
+
+    backend = CountingBackend('redis://localhost', pool_minsize=2, pool_maxsize=4)
+    await asyncio.gather(*(backend.get(TEST_KEY) for _ in range(20)))
+    await backend.connect()
+
+    # requests beyond pool_maxsize wait for a free connection
+    assert backend.pools == 1
+    assert len(backend._pool.connection_pool._available_connections) == 4
+
+    await backend.close()
+
+
+def test_pool_minsize_should_not_exceed_maxsize() -> None:
+    with pytest.raises(ValueError):
+        RedisCacheBackend('redis://localhost', pool_minsize=20, pool_maxsize=10)
+
+
+@pytest.mark.asyncio
+async def test_filling_pool_should_time_out() -> None:
+    server = await asyncio.start_server(lambda reader, writer: None, '127.0.0.1', 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    backend = RedisCacheBackend(
+        'redis://{}:{}'.format(host, port), pool_minsize=2, pool_fill_timeout=0.05,
+    )
+
+    with pytest.raises(asyncio.TimeoutError):
+        await backend.connect()
+    assert backend._pool is None
+
+    server.close()
+
+
+@pytest.mark.asyncio
+async def test_warmup_should_load_missing_keys(
+    f_backend: RedisCacheBackend
+) -> None:
+    await f_backend.set('hot:1', 'cached')
+    loaded = []
+
+    async def loader(key: str) -> str:
+        loaded.append(key)
+        return 'loaded ' + key
+
+    assert await f_backend.warmup(['hot:1', 'hot:2'], loader, ttl=10) == 1
+    assert loaded == ['hot:2']
+    assert await f_backend.get_many('hot:1', 'hot:2') == [
+        'cached', 'loaded hot:2',
+    ]
+    assert 9 < (await f_backend.get_with_ttl('hot:2'))[1] <= 10
+
+
+@pytest.mark.asyncio
+async def test_resp3_should_keep_replies_and_encoding() -> None:
+    backend = RedisCacheBackend('redis://localhost', protocol=3)
+    await backend.flush()
+
+    assert await backend.set(TEST_KEY, TEST_VALUE, ttl=10) is True
+    assert await backend.add(TEST_KEY, 'other') is False
+    assert await backend.get(TEST_KEY) == TEST_VALUE
+    assert await backend.get(TEST_KEY, encoding=None) == TEST_VALUE.encode()
+    assert await backend.get_many(TEST_KEY, 'missing') == [TEST_VALUE, None]
+    assert await backend.compare_and_set(TEST_KEY, TEST_VALUE, 'new') is True
+
+    value, ttl = await backend.get_with_ttl(TEST_KEY)
+    assert value == 'new'
+    assert 0 < ttl <= 10
+
+    assert await backend.incr('counter', 2) == 2
+    await backend.flush()
+    await backend.close()
@@ -0,0 +1,58 @@
+import pytest
+from redis.exceptions import ResponseError
+
+from fastapi_cache.backends.redis import RedisCacheBackend
+from fastapi_cache.backends.utils.scripts import RedisScript, ScriptRegistry
+
+ECHO_SCRIPT = 'return ARGV[1]'
+
+
+@pytest.fixture
+def f_backend() -> RedisCacheBackend:
+    return RedisCacheBackend('redis://localhost')
+
+
+@pytest.mark.asyncio
+async def test_script_should_be_reloaded_on_noscript(
+    f_backend: RedisCacheBackend
+) -> None:
+    f_client = await f_backend._client
+    script = RedisScript(ECHO_SCRIPT)
+    await f_client.script_flush()
+
+    assert await script(f_client, args=['hello'], encoding='utf-8') == 'hello'
+    assert await f_client.script_exists(script.sha) == [1]
+
+
+@pytest.mark.asyncio
+async def test_script_should_raise_other_errors(
+    f_backend: RedisCacheBackend
+) -> None:
+    f_client = await f_backend._client
+    script = RedisScript('return redis.call("INCR", KEYS[1])')
+    await f_client.set('not_a_number', 'value')
+
+    with pytest.raises(ResponseError):
+        await script(f_client, keys=['not_a_number'])
+
+
+@pytest.mark.asyncio
+async def test_registry_should_load_all_scripts(
+    f_backend: RedisCacheBackend
+) -> None:
+    f_client = await f_backend._client
+    registry = ScriptRegistry()
+    script = registry.register('echo', ECHO_SCRIPT)
+    await f_client.script_flush()
+    await registry.load(f_client)
+
+    assert registry.get('echo') is script
+    assert await f_client.script_exists(script.sha) == [1]
+
+
+def test_registry_should_raise_error_on_duplicate_name() -> None:
+    registry = ScriptRegistry()
+    registry.register('echo', ECHO_SCRIPT)
+
+    with pytest.raises(NameError, match='Script with the same name already registered'):
+        registry.register('echo', ECHO_SCRIPT)
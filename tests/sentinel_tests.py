@@ -0,0 +1,76 @@
+import asyncio
+from typing import Any, List, Tuple
+
+import pytest
+from redis.asyncio.sentinel import Sentinel
+
+from fastapi_cache.backends import sentinel
+from fastapi_cache.backends.sentinel import (
+    BlockingSentinelConnectionPool,
+    RedisSentinelCacheBackend,
+)
+
+TEST_KEY = 'constant'
+TEST_VALUE = '0'
+
+
+class FakeSentinelClient:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class FakeSentinel(Sentinel):
+    def __init__(self, sentinels: Any, **kwargs) -> None:
+        super().__init__(sentinels, **kwargs)
+        self.addresses = sentinels
+        self.sentinels = [FakeSentinelClient() for _ in sentinels]
+        self.services: List[str] = []
+
+    async def discover_master(self, service_name: str) -> Tuple[str, int]:
+        self.services.append(service_name)
+        return '127.0.0.1', 6379
+
+
+@pytest.mark.asyncio
+async def test_should_use_master_reported_by_sentinel(monkeypatch: Any) -> None:
+    fake_sentinels: List[FakeSentinel] = []
+
+    def create_sentinel(*args: Any, **kwargs) -> FakeSentinel:
+        fake_sentinel = FakeSentinel(*args, **kwargs)
+        fake_sentinels.append(fake_sentinel)
+        return fake_sentinel
+
+    monkeypatch.setattr(sentinel, 'Sentinel', create_sentinel)
+    backend = RedisSentinelCacheBackend(
+        [('localhost', 26379), 'redis://otherhost'], 'mymaster', pool_minsize=1,
+    )
+
+    await backend.set(TEST_KEY, TEST_VALUE)
+    assert await backend.get(TEST_KEY) == TEST_VALUE
+
+    await backend.close()
+    assert fake_sentinels[0].addresses == [
+        ('localhost', 26379), ('otherhost', 26379),
+    ]
+    assert set(fake_sentinels[0].services) == {'mymaster'}
+    assert all(client.closed for client in fake_sentinels[0].sentinels)
+
+
+@pytest.mark.asyncio
+async def test_requests_beyond_pool_maxsize_should_wait(monkeypatch: Any) -> None:
+    monkeypatch.setattr(sentinel, 'Sentinel', FakeSentinel)
+    backend = RedisSentinelCacheBackend(
+        ['localhost'], 'mymaster', pool_minsize=1, pool_maxsize=2,
+    )
+
+    await asyncio.gather(*(backend.set(number, number) for number in range(20)))
+    assert await backend.get_many(*range(20)) == [str(n) for n in range(20)]
+
+    pool = backend._pool.connection_pool
+    assert isinstance(pool, BlockingSentinelConnectionPool)
+    assert len(pool._available_connections) <= 2
+
+    await backend.close()
@@ -0,0 +1,87 @@
+import pytest
+
+from fastapi_cache.serializers import (
+    HEADER_PLAIN,
+    HEADER_ZLIB,
+    CompressedSerializer,
+    JsonSerializer,
+    MsgpackSerializer,
+    PickleSerializer,
+    RawSerializer,
+)
+
+TEST_VALUE = {'id': 1, 'items': ['a', 'b'], 'nested': {'ok': True}}
+
+
+@pytest.mark.parametrize('serializer', [
+    PickleSerializer(),
+    JsonSerializer(),
+])
+def test_serializer_round_trip(serializer) -> None:
+    data = serializer.dumps(TEST_VALUE)
+
+    assert isinstance(data, bytes)
+    assert serializer.loads(data) == TEST_VALUE
+
+
+def test_msgpack_serializer_round_trip() -> None:
+    pytest.importorskip('msgpack')
+    serializer = MsgpackSerializer()
+
+    assert serializer.loads(serializer.dumps(TEST_VALUE)) == TEST_VALUE
+
+
+def test_raw_serializer_should_pass_buffers_through() -> None:
+    serializer = RawSerializer()
+
+    assert serializer.dumps(b'raw') == b'raw'
+    assert serializer.dumps(bytearray(b'raw')) == b'raw'
+    assert serializer.dumps(memoryview(b'raw')) == b'raw'
+    assert serializer.loads(b'raw') == b'raw'
+
+
+def test_compressed_serializer_should_skip_small_payloads() -> None:
+    serializer = CompressedSerializer(JsonSerializer(), threshold=1024)
+    data = serializer.dumps(TEST_VALUE)
+
+    assert data[0] == HEADER_PLAIN
+    assert serializer.loads(data) == TEST_VALUE
+
+
+def test_compressed_serializer_should_compress_large_payloads() -> None:
+    value = ['x' * 100] * 100
+    serializer = CompressedSerializer(JsonSerializer(), threshold=1024)
+    data = serializer.dumps(value)
+
+    assert data[0] == HEADER_ZLIB
+    assert len(data) < len(JsonSerializer().dumps(value))
+    assert serializer.loads(data) == value
+    assert serializer.loads(memoryview(bytearray(data))) == value
+
+
+def test_compressed_serializer_lz4() -> None:
+    pytest.importorskip('lz4')
+    value = ['x' * 100] * 100
+    serializer = CompressedSerializer(PickleSerializer(), codec='lz4')
+
+    assert serializer.loads(serializer.dumps(value)) == value
+
+
+def test_compressed_serializer_should_read_other_codecs() -> None:
+    value = ['x' * 100] * 100
+    writer = CompressedSerializer(JsonSerializer(), threshold=0)
+    reader = CompressedSerializer(JsonSerializer(), threshold=10 ** 6)
+
+    assert reader.loads(writer.dumps(value)) == value
+
+
+def test_compressed_serializer_should_reject_unknown_codec() -> None:
+    with pytest.raises(ValueError):
+        CompressedSerializer(JsonSerializer(), codec='brotli')
+
+
+def test_compressed_serializer_should_reject_unknown_header() -> None:
+    serializer = CompressedSerializer(JsonSerializer())
+
+    with pytest.raises(ValueError):
+        serializer.loads(b'\x7f{}')
@@ -0,0 +1,119 @@
+import pytest
+
+from fastapi_cache.backends.memory import InMemoryCacheBackend
+from fastapi_cache.backends.sharded import ShardedCacheBackend
+from fastapi_cache.backends.utils.hashring import HashRing
+
+TEST_KEY = 'constant'
+TEST_VALUE = '0'
+KEYS = ['key:{}'.format(i) for i in range(3000)]
+
+
+@pytest.fixture
+def f_backend() -> ShardedCacheBackend:
+    return ShardedCacheBackend([InMemoryCacheBackend() for _ in range(3)])
+
+
+def test_ring_should_spread_keys_evenly() -> None:
+    ring = HashRing()
+    for node in ('a', 'b', 'c'):
+        ring.add(node)
+
+    owners = [ring.get(key) for key in KEYS]
+    for node in ('a', 'b', 'c'):
+        assert 0.2 < owners.count(node) / len(KEYS) < 0.47
+
+
+def test_ring_should_only_remap_keys_of_changed_node() -> None:
+    ring = HashRing()
+    for node in ('a', 'b', 'c'):
+        ring.add(node)
+    before = {key: ring.get(key) for key in KEYS}
+
+    ring.add('d')
+    moved = [key for key in KEYS if ring.get(key) != before[key]]
+    assert {ring.get(key) for key in moved} == {'d'}
+    assert len(moved) / len(KEYS) < 0.35
+
+    ring.remove('d')
+    assert {key: ring.get(key) for key in KEYS} == before
+    assert len(ring) == 3
+
+    with pytest.raises(NameError):
+        ring.add('a')
+    with pytest.raises(NameError):
+        ring.remove('d')
+
+
+def test_ring_should_hash_keys_by_value() -> None:
+    ring = HashRing()
+    ring.add('a')
+    ring.add('b')
+
+    assert ring.get(('tuple', 1)) == ring.get(('tuple', 1))
+    assert ring.get(b'bytes') == ring.get('bytes')
+
+
+@pytest.mark.asyncio
+async def test_should_store_key_on_its_shard(
+    f_backend: ShardedCacheBackend
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE)
+
+    assert await f_backend.get(TEST_KEY) == TEST_VALUE
+    for shard in f_backend.shards.values():
+        expected = TEST_VALUE if shard is f_backend.get_shard(TEST_KEY) else None
+        assert await shard.get(TEST_KEY) == expected
+
+
+@pytest.mark.asyncio
+async def test_should_fan_out_multi_key_operations(
+    f_backend: ShardedCacheBackend
+) -> None:
+    mapping = {key: key.upper() for key in KEYS[:30]}
+    assert await f_backend.set_many(mapping, ttls={KEYS[0]: 10}) is True
+
+    assert await f_backend.get_many(*KEYS[:30]) == list(mapping.values())
+    assert await f_backend.get_many(KEYS[1], 'missing', default='?') == [
+        KEYS[1].upper(), '?',
+    ]
+    assert (await f_backend.get_with_ttl(KEYS[0]))[1] <= 10
+    assert await f_backend.get_many_with_ttl(KEYS[1], 'missing', default='?') == [
+        (KEYS[1].upper(), None), ('?', None),
+    ]
+    assert all(
+        shard.get_stats()['entries'] > 0
+        for shard in f_backend.shards.values()
+    )
+
+    assert await f_backend.exists('missing', KEYS[2]) is True
+    assert await f_backend.delete_many(*KEYS[:10], 'missing') == 10
+    assert await f_backend.exists(*KEYS[:10]) is False
+
+    await f_backend.flush()
+    assert await f_backend.get_many(*KEYS[:30]) == [None] * 30
+
+
+@pytest.mark.asyncio
+async def test_should_delegate_get_or_set(
+    f_backend: ShardedCacheBackend
+) -> None:
+    async def loader() -> str:
+        return TEST_VALUE
+
+    assert await f_backend.get_or_set(TEST_KEY, loader) == TEST_VALUE
+    assert await f_backend.get_shard(TEST_KEY).get(TEST_KEY) == TEST_VALUE
+
+
+@pytest.mark.asyncio
+async def test_should_add_and_remove_shards() -> None:
+    backend = ShardedCacheBackend({'a': InMemoryCacheBackend()})
+    backend.add_shard('b', InMemoryCacheBackend())
+
+    await backend.set_many({key: key for key in KEYS[:100]})
+    removed = backend.remove_shard('b')
+
+    assert await removed.exists(*KEYS[:100]) is True
+    assert set(backend.shards) == {'a'}
+    with pytest.raises(ValueError):
+        backend.remove_shard('a')
@@ -0,0 +1,109 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from fastapi_cache.backends.shared import SharedMemoryCacheBackend
+from fastapi_cache.serializers import JsonSerializer
+
+TEST_KEY = 'constant'
+TEST_VALUE = '0'
+
+
+@pytest.fixture
+def f_backend(tmp_path: Any) -> SharedMemoryCacheBackend:
+    return SharedMemoryCacheBackend(str(tmp_path / 'cache'), slots=256)
+
+
+@pytest.mark.asyncio
+async def test_should_add_n_get_data(
+    f_backend: SharedMemoryCacheBackend
+) -> None:
+    assert await f_backend.add(TEST_KEY, {'value': TEST_VALUE}) is True
+    assert await f_backend.add(TEST_KEY, TEST_VALUE) is False
+    assert await f_backend.get(TEST_KEY) == {'value': TEST_VALUE}
+    assert await f_backend.get('missing', 'default') == 'default'
+
+    await f_backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_share_entries_between_instances(tmp_path: Any) -> None:
+    path = str(tmp_path / 'cache')
+    first = SharedMemoryCacheBackend(path, serializer=JsonSerializer())
+    second = SharedMemoryCacheBackend(path, serializer=JsonSerializer())
+
+    await first.set_many({'a': 1, ('b', 2): [2]})
+    assert await second.get_many('a', ('b', 2), 'c') == [1, [2], None]
+    assert await second.exists('c', 'a') is True
+
+    assert await second.delete_many('a', 'c') == 1
+    await second.flush()
+    assert await first.exists(('b', 2)) is False
+
+    await first.close()
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_should_expire_entries(
+    f_backend: SharedMemoryCacheBackend
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE, pttl=50)
+    await f_backend.set('other', TEST_VALUE, ttl=10)
+
+    value, ttl = await f_backend.get_with_ttl('other')
+    assert value == TEST_VALUE
+    assert 9 < ttl <= 10
+
+    assert await f_backend.expire('other') is True
+    assert await f_backend.get_with_ttl('other') == (TEST_VALUE, None)
+
+    await asyncio.sleep(0.06)
+    assert await f_backend.get(TEST_KEY) is None
+    assert await f_backend.expire(TEST_KEY, 10) is False
+
+    await f_backend.close()
+
+
+@pytest.mark.asyncio
+async def test_should_clear_namespace(tmp_path: Any) -> None:
+    path = str(tmp_path / 'cache')
+    tenant_a = SharedMemoryCacheBackend(path, prefix='a')
+    tenant_b = SharedMemoryCacheBackend(path, prefix='b')
+    await tenant_a.set(TEST_KEY, 'a')
+    await tenant_b.set(TEST_KEY, 'b')
+
+    assert await tenant_a.clear_namespace() == 1
+    assert await tenant_a.get(TEST_KEY) is None
+    assert await tenant_b.get(TEST_KEY) == 'b'
+
+    with pytest.raises(ValueError):
+        await SharedMemoryCacheBackend(path).bump_version()
+
+    await tenant_a.close()
+    await tenant_b.close()
+
+
+@pytest.mark.asyncio
+async def test_should_not_store_oversized_values(tmp_path: Any) -> None:
+    backend = SharedMemoryCacheBackend(str(tmp_path / 'cache'), slot_size=128)
+
+    assert await backend.set(TEST_KEY, 'x' * 128) is False
+    assert await backend.get(TEST_KEY) is None
+    assert backend.get_stats()['sets'] == 1
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_tags_should_not_be_supported(
+    f_backend: SharedMemoryCacheBackend
+) -> None:
+    with pytest.raises(NotImplementedError):
+        await f_backend.set(TEST_KEY, TEST_VALUE, tags=['tag'])
+
+    with pytest.raises(NotImplementedError):
+        await f_backend.invalidate_tags('tag')
+
+    await f_backend.close()
@@ -0,0 +1,162 @@
+import multiprocessing
+import os
+from typing import Any
+
+import pytest
+
+from fastapi_cache.backends.utils.sharedtable import (
+    COUNTER,
+    HEADER_SIZE,
+    SharedTable,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def f_path(tmp_path: Any) -> str:
+    return str(tmp_path / 'table')
+
+
+def test_should_store_entries_in_shared_file(f_path: str) -> None:
+    writer = SharedTable(f_path, slots=64, slot_size=128)
+    reader = SharedTable(f_path, slots=64, slot_size=128)
+
+    assert writer.set(b'key', b'value') is True
+    assert reader.get(b'key') == b'value'
+    assert writer.add(b'key', b'other') is False
+    assert reader.get_with_ttl(b'key') == (b'value', None)
+
+    assert reader.delete(b'key') is True
+    assert writer.get(b'key') is None
+    assert writer.delete(b'key') is False
+
+    writer.close()
+    reader.close()
+
+
+def test_should_expire_entries_by_clock(f_path: str) -> None:
+    clock = FakeClock()
+    table = SharedTable(f_path, slots=64, slot_size=128, clock=clock)
+    table.set(b'key', b'value', ttl=10)
+
+    clock.now += 4
+    assert table.get_with_ttl(b'key') == (b'value', 6)
+
+    assert table.expire(b'key', 1) is True
+    clock.now += 1
+    assert table.get(b'key') is None
+    assert table.keys() == []
+    assert table.add(b'key', b'new') is True
+
+    table.close()
+
+
+def test_should_evict_oldest_entry_of_probe_window(f_path: str) -> None:
+    clock = FakeClock()
+    table = SharedTable(f_path, slots=4, slot_size=128, max_probes=4, clock=clock)
+    for key in (b'a', b'b', b'c', b'd'):
+        table.set(key, key)
+        clock.now += 1
+
+    table.set(b'a', b'updated')
+    table.set(b'e', b'e')
+
+    assert table.get(b'b') is None
+    assert sorted(table.keys()) == [b'a', b'c', b'd', b'e']
+    assert table.evictions == 1
+
+    table.close()
+
+
+def test_oversized_value_should_remove_previous_one(f_path: str) -> None:
+    table = SharedTable(f_path, slots=8, slot_size=64)
+    table.set(b'key', b'small')
+
+    assert table.set(b'key', b'x' * table.capacity) is False
+    assert table.get(b'key') is None
+
+    table.close()
+
+
+def test_flush_and_version_should_be_shared(f_path: str) -> None:
+    first = SharedTable(f_path, slots=8, slot_size=64)
+    second = SharedTable(f_path, slots=8, slot_size=64)
+    first.set(b'key', b'value')
+
+    second.flush()
+    assert first.get(b'key') is None
+    assert len(first) == 0
+
+    assert second.bump_version(b'app') == 1
+    assert first.get_version(b'app') == 1
+
+    first.close()
+    second.close()
+
+
+def test_reader_should_skip_slot_being_written(f_path: str) -> None:
+    table = SharedTable(f_path, slots=1, slot_size=64)
+    table.set(b'key', b'value')
+    offset = HEADER_SIZE
+
+    # a writer died with the sequence odd
+    segment = table._open()
+    sequence = COUNTER.unpack_from(segment, offset)[0]
+    COUNTER.pack_into(segment, offset, sequence + 1)
+    assert table.get(b'key') is None
+
+    table.set(b'key', b'repaired')
+    assert COUNTER.unpack_from(segment, offset)[0] % 2 == 0
+    assert table.get(b'key') == b'repaired'
+
+    table.close()
+
+
+def test_should_reject_other_layout(f_path: str) -> None:
+    table = SharedTable(f_path, slots=8, slot_size=64)
+    table.set(b'key', b'value')
+
+    with pytest.raises(ValueError):
+        SharedTable(f_path, slots=16, slot_size=64).get(b'key')
+
+    table.close()
+
+
+def _write_many(table: SharedTable, count: int) -> None:
+    for number in range(count):
+        # a single repeated byte, a torn read would mix two of them
+        table.set(b'key', bytes([number % 256]) * 900)
+    table.set(b'done', b'1')
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires fork')
+def test_reads_should_be_consistent_across_processes(f_path: str) -> None:
+    table = SharedTable(f_path, slots=16, slot_size=1024)
+    table.set(b'key', bytes(900))
+
+    # the child inherits an open table and has to reopen it
+    process = multiprocessing.get_context('fork').Process(
+        target=_write_many, args=(table, 5000),
+    )
+    process.start()
+
+    reads = 0
+    while table.get(b'done') is None:
+        value = table.get(b'key')
+        if value is not None:
+            assert value.count(value[:1]) == len(value)
+            reads += 1
+
+    process.join()
+    assert process.exitcode == 0
+    assert table.get(b'key') == bytes([4999 % 256]) * 900
+    assert reads > 0
+
+    table.close()
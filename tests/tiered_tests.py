@@ -0,0 +1,275 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from fastapi_cache.backends.memory import InMemoryCacheBackend
+from fastapi_cache.backends.redis import RedisCacheBackend
+from fastapi_cache.backends.tiered import (
+    CACHE_KEY,
+    WRITE_AROUND,
+    TieredCacheBackend,
+)
+from fastapi_cache.registry import CacheRegistry
+from fastapi_cache.serializers import JsonSerializer
+
+TEST_KEY = 'constant'
+TEST_VALUE = '0'
+
+
+@pytest.fixture
+def f_l2() -> InMemoryCacheBackend:
+    return InMemoryCacheBackend()
+
+
+@pytest.fixture
+def f_backend(f_l2: InMemoryCacheBackend) -> TieredCacheBackend:
+    return TieredCacheBackend(f_l2, l1_ttl=10)
+
+
+@pytest.mark.asyncio
+async def test_should_read_through_l2(
+    f_backend: TieredCacheBackend,
+    f_l2: InMemoryCacheBackend,
+) -> None:
+    await f_l2.set(TEST_KEY, TEST_VALUE)
+
+    assert await f_backend.get(TEST_KEY) == TEST_VALUE
+    assert await f_backend.l1.get(TEST_KEY) == TEST_VALUE
+    assert await f_backend.get(TEST_KEY) == TEST_VALUE
+
+    assert f_backend.stats.l1_hits == 1
+    assert f_backend.stats.l1_misses == 1
+    assert f_backend.stats.l2_hits == 1
+    assert f_backend.stats.l1_hit_ratio == 0.5
+
+
+@pytest.mark.asyncio
+async def test_should_return_default_on_miss(
+    f_backend: TieredCacheBackend,
+) -> None:
+    assert await f_backend.get(TEST_KEY, 'default') == 'default'
+    assert f_backend.stats.l2_misses == 1
+
+
+@pytest.mark.asyncio
+async def test_l1_entry_should_not_outlive_l2(
+    f_backend: TieredCacheBackend,
+    f_l2: InMemoryCacheBackend,
+) -> None:
+    await f_l2.set(TEST_KEY, TEST_VALUE, ttl=0.05)
+    await f_backend.get(TEST_KEY)
+    await asyncio.sleep(0.06)
+
+    assert await f_backend.get(TEST_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_get_many_should_not_keep_l1_entry_beyond_l2(
+    f_backend: TieredCacheBackend,
+    f_l2: InMemoryCacheBackend,
+) -> None:
+    await f_l2.set(TEST_KEY, TEST_VALUE, ttl=0.05)
+    await f_l2.set('other', TEST_VALUE)
+    assert await f_backend.get_many(TEST_KEY, 'other') == [TEST_VALUE] * 2
+    await asyncio.sleep(0.06)
+
+    assert await f_backend.get_many(TEST_KEY, 'other') == [None, TEST_VALUE]
+    assert f_backend.stats.l1_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_get_many_should_batch_l2_reads() -> None:
+    l2 = RedisCacheBackend('redis://localhost')
+    backend = TieredCacheBackend(l2, l1_ttl=10)
+    await l2.set_many({str(number): number for number in range(20)}, ttl=10)
+
+    assert await backend.get_many(*map(str, range(20))) == list(map(str, range(20)))
+    assert await backend.warmup(['1', '2']) == 0
+
+    operations = l2.get_stats()['operations']
+    assert operations['get_many_with_ttl']['calls'] == 2
+    assert operations['get_with_ttl']['calls'] == 0
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_get_with_ttl_should_report_l2_ttl_from_l1(
+    f_l2: InMemoryCacheBackend,
+) -> None:
+    backend = TieredCacheBackend(f_l2, l1_ttl=1)
+    await f_l2.set(TEST_KEY, TEST_VALUE, ttl=60)
+    await f_l2.set('forever', TEST_VALUE)
+
+    for _ in range(2):
+        value, ttl = await backend.get_with_ttl(TEST_KEY)
+        assert value == TEST_VALUE
+        assert 59 < ttl <= 60
+        assert await backend.get_with_ttl('forever') == (TEST_VALUE, None)
+
+    assert await backend.get_with_ttl('missing', 'default') == ('default', None)
+    assert backend.stats.l1_hits == 2
+    assert backend.stats.l2_hits == 2
+    assert backend.stats.l2_misses == 1
+
+
+@pytest.mark.asyncio
+async def test_l1_write_should_respect_pttl(
+    f_backend: TieredCacheBackend,
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE, pttl=50)
+    await asyncio.sleep(0.06)
+
+    assert await f_backend.l1.get(TEST_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_write_through_should_populate_both_tiers(
+    f_backend: TieredCacheBackend,
+    f_l2: InMemoryCacheBackend,
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE)
+
+    assert await f_backend.l1.get(TEST_KEY) == TEST_VALUE
+    assert await f_l2.get(TEST_KEY) == TEST_VALUE
+
+
+@pytest.mark.asyncio
+async def test_value_type_should_not_change_when_l1_expires() -> None:
+    backend = TieredCacheBackend(RedisCacheBackend('redis://localhost'), l1_ttl=0.05)
+    await backend.l2.delete_many(TEST_KEY, 'other')
+    await backend.set(TEST_KEY, 1)
+    await backend.set_many({'other': 2.5})
+    from_l1 = await backend.get_many(TEST_KEY, 'other')
+    await asyncio.sleep(0.06)
+
+    assert from_l1 == ['1', '2.5']
+    assert await backend.get_many(TEST_KEY, 'other') == from_l1
+    assert backend.stats.l1_hits == 2
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_l1_should_hold_serialized_round_trip() -> None:
+    l2 = RedisCacheBackend('redis://localhost', serializer=JsonSerializer())
+    backend = TieredCacheBackend(l2, l1_ttl=10)
+    await l2.delete('json')
+    assert await backend.add('json', ('tuple', 1)) is True
+
+    assert await backend.get('json') == ['tuple', 1]
+    assert await l2.get('json') == ['tuple', 1]
+
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_l2_write_should_drop_l1_copy(
+    f_backend: TieredCacheBackend,
+    f_l2: InMemoryCacheBackend,
+    monkeypatch: Any,
+) -> None:
+    await f_backend.set_many({TEST_KEY: TEST_VALUE, 'other': TEST_VALUE})
+
+    async def fail(*args: Any, **kwargs) -> bool:
+        return False
+
+    monkeypatch.setattr(f_l2, 'set', fail)
+    monkeypatch.setattr(f_l2, 'set_many', fail)
+
+    assert await f_backend.set(TEST_KEY, 'new') is False
+    assert await f_backend.set_many({'other': 'new'}) is False
+    assert await f_backend.l1.exists(TEST_KEY, 'other') is False
+    assert await f_backend.get(TEST_KEY) == TEST_VALUE
+
+
+@pytest.mark.asyncio
+async def test_write_around_should_invalidate_l1(
+    f_l2: InMemoryCacheBackend,
+) -> None:
+    backend = TieredCacheBackend(f_l2, write_mode=WRITE_AROUND)
+    await backend.set(TEST_KEY, 'old')
+    await backend.get(TEST_KEY)
+    await backend.set(TEST_KEY, TEST_VALUE)
+
+    assert await backend.l1.get(TEST_KEY) is None
+    assert await backend.get(TEST_KEY) == TEST_VALUE
+
+
+@pytest.mark.asyncio
+async def test_delete_should_remove_from_both_tiers(
+    f_backend: TieredCacheBackend,
+    f_l2: InMemoryCacheBackend,
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE)
+    await f_backend.delete(TEST_KEY)
+
+    assert await f_backend.exists(TEST_KEY) is False
+    assert await f_l2.exists(TEST_KEY) is False
+
+
+@pytest.mark.asyncio
+async def test_bump_version_should_drop_l1() -> None:
+    backend = TieredCacheBackend(InMemoryCacheBackend(prefix='tenant'))
+    await backend.set(TEST_KEY, TEST_VALUE)
+
+    assert await backend.bump_version() == 1
+    assert await backend.l1.get(TEST_KEY) is None
+    assert await backend.get(TEST_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_should_drop_both_tiers(
+    f_backend: TieredCacheBackend,
+    f_l2: InMemoryCacheBackend,
+) -> None:
+    await f_backend.set(TEST_KEY, TEST_VALUE, tags=['entity'])
+
+    assert await f_backend.invalidate_tags('entity') == 1
+    assert await f_backend.l1.get(TEST_KEY) is None
+    assert await f_l2.get(TEST_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_batch_operations(
+    f_backend: TieredCacheBackend,
+    f_l2: InMemoryCacheBackend,
+) -> None:
+    await f_l2.set('e', '2.71828')
+    await f_backend.set_many({'pi': '3.14159'})
+
+    assert await f_backend.get_many('pi', 'e', 'phi', default='?') == [
+        '3.14159', '2.71828', '?'
+    ]
+    assert await f_backend.l1.get('e') == '2.71828'
+
+    assert await f_backend.delete_many('pi', 'e') == 2
+    assert await f_backend.get_many('pi', 'e') == [None, None]
+
+
+def test_should_reject_unknown_write_mode(f_l2: InMemoryCacheBackend) -> None:
+    with pytest.raises(ValueError, match='Unknown write mode'):
+        TieredCacheBackend(f_l2, write_mode='write_back')
+
+
+def test_should_be_registrable(f_backend: TieredCacheBackend) -> None:
+    CacheRegistry.set(CACHE_KEY, f_backend)
+
+    assert CacheRegistry.get(CACHE_KEY) is f_backend
+    CacheRegistry.remove(CACHE_KEY)
+
+
+@pytest.mark.asyncio
+async def test_warmup_should_fill_l1_from_l2(
+    f_backend: TieredCacheBackend,
+    f_l2: InMemoryCacheBackend,
+) -> None:
+    await f_l2.set(TEST_KEY, TEST_VALUE, ttl=0.5)
+
+    async def loader(key: str) -> str:
+        return key
+
+    assert await f_backend.warmup([TEST_KEY, 'other'], loader) == 1
+    assert await f_backend.l1.get_many(TEST_KEY, 'other') == [TEST_VALUE, 'other']
+    assert (await f_backend.l1.get_with_ttl(TEST_KEY))[1] <= 0.5
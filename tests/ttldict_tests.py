@@ -1,9 +1,10 @@
+import logging
 from typing import Hashable, Any, Tuple
 from unittest import mock
 
 import pytest
 
-from fastapi_cache.backends.utils.ttldict import TTLDict
+from fastapi_cache.backends.utils.ttldict import TTLDict, logging_tracer
 
 MOCKED_DICT = dict()
 
@@ -199,3 +200,208 @@ def test_expire_from_cache(
     ttl_dict.expire(key, ttl)
 
     assert ttl_dict.get(key) == expected
+
+
+@pytest.mark.parametrize('policy', ['lru', 'lfu', 'tinylfu'])
+def test_bounded_dict_should_not_exceed_max_entries(policy: str) -> None:
+    ttl_dict = TTLDict(max_entries=10, eviction_policy=policy)
+    for num in range(100):
+        ttl_dict.set(num, num)
+
+    assert len(ttl_dict) <= 10
+    assert ttl_dict.stats.evictions >= 90
+
+
+def test_lru_should_evict_least_recently_used_key() -> None:
+    ttl_dict = TTLDict(max_entries=2, eviction_policy='lru')
+    ttl_dict.set('a', 1)
+    ttl_dict.set('b', 2)
+    ttl_dict.get('a')
+    ttl_dict.set('c', 3)
+
+    assert ttl_dict.exists('b') is False
+    assert ttl_dict.get('a') == 1
+    assert ttl_dict.get('c') == 3
+
+
+def test_bounded_dict_should_not_exceed_max_bytes() -> None:
+    ttl_dict = TTLDict(max_bytes=100, sizeof=len)
+    for num in range(10):
+        ttl_dict.set(num, 'x' * 30)
+
+    assert ttl_dict.total_bytes <= 100
+    assert len(ttl_dict) == 3
+
+
+def test_delete_should_release_tracked_bytes() -> None:
+    ttl_dict = TTLDict(max_bytes=100, sizeof=len)
+    ttl_dict.set('hello', 'world')
+    ttl_dict.delete('hello')
+
+    assert ttl_dict.total_bytes == 0
+
+
+def test_stats_should_count_hits_and_misses() -> None:
+    ttl_dict = TTLDict()
+    ttl_dict.set('hello', 'world')
+    ttl_dict.get('hello')
+    ttl_dict.get('missing')
+
+    assert ttl_dict.stats.hits == 1
+    assert ttl_dict.stats.misses == 1
+    assert ttl_dict.stats.hit_ratio == 0.5
+
+
+def test_sweep_should_remove_expired_keys() -> None:
+    ttl_dict = TTLDict()
+    for num in range(10):
+        ttl_dict.set(num, num, ttl=0)
+    ttl_dict.set('alive', 'value', ttl=100)
+    ttl_dict.set('forever', 'value')
+
+    assert ttl_dict.sweep() == 10
+    assert len(ttl_dict) == 2
+    assert ttl_dict.stats.expirations == 10
+
+
+def test_sweep_should_respect_limit() -> None:
+    ttl_dict = TTLDict()
+    for num in range(10):
+        ttl_dict.set(num, num, ttl=0)
+
+    assert ttl_dict.sweep(limit=3) == 3
+    assert len(ttl_dict) == 7
+
+
+def test_sweep_should_skip_rewritten_keys() -> None:
+    ttl_dict = TTLDict()
+    ttl_dict.set('hello', 'world', ttl=0)
+    ttl_dict.set('hello', 'world', ttl=100)
+
+    assert ttl_dict.sweep() == 0
+    assert ttl_dict.get('hello') == 'world'
+
+
+def test_exists_should_remove_expired_keys() -> None:
+    ttl_dict = TTLDict()
+    ttl_dict.set('hello', 'world', ttl=0)
+
+    assert ttl_dict.exists('hello') is False
+    assert len(ttl_dict) == 0
+
+
+def test_tracer_should_receive_operations() -> None:
+    calls = []
+    ttl_dict = TTLDict(
+        max_entries=1,
+        tracer=lambda operation, key: calls.append((operation, key)),
+    )
+    ttl_dict.set('hello', 'world')
+    ttl_dict.get('hello')
+    ttl_dict.get('missing')
+    ttl_dict.set('expired', 'value', ttl=0)
+    ttl_dict.get('expired')
+    ttl_dict.set('other', 'value')
+    ttl_dict.delete('other')
+
+    assert calls == [
+        ('set', 'hello'),
+        ('hit', 'hello'),
+        ('miss', 'missing'),
+        ('set', 'expired'),
+        ('evict', 'hello'),
+        ('expire', 'expired'),
+        ('set', 'other'),
+        ('delete', 'other'),
+    ]
+
+
+def test_logging_tracer_should_log_on_debug(caplog) -> None:
+    ttl_dict = TTLDict(tracer=logging_tracer)
+    with caplog.at_level(logging.DEBUG, logger='fastapi_cache.backends.utils.ttldict'):
+        ttl_dict.set('hello', 'world')
+
+    assert "set 'hello'" in caplog.text
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'ttl': 0.25},
+    {'pttl': 250},
+])
+def test_should_support_sub_second_ttl(kwargs: dict) -> None:
+    clock = FakeClock()
+    ttl_dict = TTLDict(clock=clock)
+    ttl_dict.set('hello', 'world', **kwargs)
+
+    clock.now += 0.2
+    assert ttl_dict.get('hello') == 'world'
+
+    clock.now += 0.05
+    assert ttl_dict.get('hello') is None
+
+
+def test_expire_should_accept_pttl() -> None:
+    clock = FakeClock()
+    ttl_dict = TTLDict(clock=clock)
+    ttl_dict.set('hello', 'world')
+    ttl_dict.expire('hello', pttl=100)
+
+    clock.now += 0.1
+    assert ttl_dict.exists('hello') is False
+
+
+def test_batch_operations() -> None:
+    clock = FakeClock()
+    ttl_dict = TTLDict(clock=clock)
+
+    assert ttl_dict.set_many(
+        {'a': 1, 'b': 2, 'c': 3},
+        ttl=10,
+        ttls={'c': 1},
+    ) is True
+    assert ttl_dict.get_many(['a', 'b', 'd'], 'default') == [1, 2, 'default']
+
+    clock.now += 1
+    assert ttl_dict.get_many(['a', 'c']) == [1, None]
+
+    assert ttl_dict.delete_many(['a', 'b', 'd']) == 2
+    assert len(ttl_dict) == 0
+
+
+def test_invalidate_tags_should_remove_tagged_keys() -> None:
+    ttl_dict = TTLDict()
+    ttl_dict.set('profile', 1, tags=['user:1'])
+    ttl_dict.set('feed', 2, tags=['user:1', 'feed'])
+    ttl_dict.add('other', 3, tags=['user:2'])
+
+    assert ttl_dict.invalidate_tags('user:1', 'missing') == 2
+    assert ttl_dict.keys() == ['other']
+    assert ttl_dict.invalidate_tags('feed') == 0
+
+
+def test_tag_index_should_be_cleaned_on_removal() -> None:
+    clock = FakeClock()
+    ttl_dict = TTLDict(max_entries=1, clock=clock)
+    ttl_dict.set('expiring', 1, ttl=1, tags=['a'])
+
+    clock.now += 1
+    assert ttl_dict.sweep() == 1
+
+    ttl_dict.set('evicted', 2, tags=['b'])
+    ttl_dict.set('retagged', 3, tags=['c'])
+    ttl_dict.set('retagged', 3, tags=['d'])
+
+    assert ttl_dict._tags == {'d': {'retagged'}}
+    assert ttl_dict._key_tags == {'retagged': ('d',)}
+
+    ttl_dict.delete('retagged')
+    assert ttl_dict._tags == {}
+    assert ttl_dict._key_tags == {}